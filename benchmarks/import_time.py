@@ -0,0 +1,104 @@
+"""
+Startup-time benchmark of easyfermi.
+
+Each measurement runs in a fresh Python interpreter, so nothing is cached in sys.modules.
+The script reports the time needed to import easyfermi and the time each heavy dependency would
+add if it were imported at module level, as well as which of them were actually loaded by "import easyfermi".
+
+Usage:
+    python benchmarks/import_time.py [--repeat 5]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+HEAVY_MODULES = [
+    "fermipy.gtanalysis",
+    "fermipy.plotting",
+    "gammapy.modeling.models",
+    "astroquery.fermi",
+    "astroquery.simbad",
+    "emcee",
+    "corner",
+    "scipy.interpolate",
+    "matplotlib.pyplot",
+    "PyQt5.QtWidgets",
+]
+
+
+def time_import(statement, repeat):
+
+    """
+    Measures the wall time (in seconds) of a python statement executed in a fresh interpreter.
+
+    Parameters
+    ----------
+    statement: str
+        Python statement to be timed, e.g. "import easyfermi".
+    repeat: int
+        Number of fresh interpreters used for the measurement.
+
+    Returns
+    -------
+    median: float
+        Median of the measured times, or NaN if the statement failed.
+    """
+
+    code = (
+        "import time\n"
+        "t0 = time.perf_counter()\n"
+        f"{statement}\n"
+        "print(time.perf_counter() - t0)\n"
+    )
+    times = []
+    for i in range(repeat):
+        run = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        if run.returncode != 0:
+            return float("nan")
+        times.append(float(run.stdout.strip().split("\n")[-1]))
+
+    return statistics.median(times)
+
+
+def loaded_heavy_modules():
+
+    """
+    Lists the heavy dependencies that end up in sys.modules after "import easyfermi".
+    """
+
+    code = (
+        "import sys, easyfermi\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    run = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if run.returncode != 0:
+        return None
+
+    return [m for m in run.stdout.strip().split(",") if m != ""]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup-time benchmark of easyfermi.")
+    parser.add_argument("--repeat", type=int, default=5, help="number of fresh interpreters per measurement")
+    args = parser.parse_args()
+
+    print(f"{'statement':<45s} {'median time [s]':>16s}")
+    print(f"{'import easyfermi':<45s} {time_import('import easyfermi', args.repeat):>16.3f}")
+    for module in HEAVY_MODULES:
+        statement = f"import {module}"
+        print(f"{statement:<45s} {time_import(statement, args.repeat):>16.3f}")
+
+    loaded = loaded_heavy_modules()
+    if loaded is None:
+        print("\nCould not import easyfermi.")
+    elif len(loaded) == 0:
+        print("\nNo heavy dependency is imported by 'import easyfermi'.")
+    else:
+        print("\nHeavy dependencies imported by 'import easyfermi': " + ", ".join(loaded))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 """The easiest way to analyze Fermi-LAT data."""
 
-from .easyfermi import *
+from .analysis import Analysis
+from .settings import AnalysisSettings
 
+__all__ = ["Analysis", "AnalysisSettings"]
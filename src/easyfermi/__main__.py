@@ -0,0 +1,5 @@
+"""Opens the easyfermi window with ``python -m easyfermi``."""
+
+from .easyfermi import main
+
+main()
@@ -0,0 +1,2356 @@
+"""
+Headless version of the easyfermi analysis pipeline.
+
+The class Analysis defined here runs exactly the same steps as the "Go!" button of the
+graphical interface (setup, optimization, fit, Sun path, relocalization, TS maps, extension,
+SED, MCMC and light curves), but it reads its inputs from a configuration dictionary instead
+of the widgets of the easyfermi window. Importing this module does not import PyQt5.
+"""
+
+import os
+import glob
+import pickle
+import numpy as np
+import astropy.io.fits as pyfits  # We need astropy version 5.2.2 or earlier
+from astropy.time import Time
+import platform
+from astropy import units as u
+from astropy.coordinates import SkyCoord
+from astropy.table import Table, vstack
+from pathlib import Path
+import yaml
+from yaml import Loader
+import warnings
+from .settings import AnalysisSettings, load_settings
+from .ltcube_cache import LtcubeCache, DATA_QUALITY_FILTER, data_coverage
+from . import photon_index
+from .sky import angular_separation
+from . import sed_models
+from . import ebl
+from .figures import import_pyplot, save_figure, managed_figures, peak_figure_memory
+from .spacecraft import SpacecraftFile, proximity_intervals
+
+# The heavy dependencies (fermipy, astroquery, emcee, corner, scipy and matplotlib.pyplot)
+# are imported only inside the steps of the analysis that use them, so that "import easyfermi" stays fast.
+
+warnings.filterwarnings("ignore")
+
+Working_directory = os.getcwd()
+OS_name = platform.system()
+
+os.environ["LANG"] = 'C'
+
+try:
+    os.environ['LC_NAME'] = 'en_IN:en'
+except:
+    print("No 'LC_NAME' entry was found.")
+
+try:
+    os.environ["LANGUAGE"] = 'en_IN:en'
+except:
+    print("No 'LANGUAGE' entry was found.")
+
+try:
+    os.environ['LC_MEASUREMENT'] = 'en_IN:en'
+except:
+    pass
+
+try:
+    os.environ['LC_PAPER'] = 'en_IN:en'
+except:
+    pass
+
+try:
+    os.environ['LC_MONETARY'] = 'en_IN:en'
+except:
+    pass
+
+try:
+    os.environ['LC_ADDRESS'] = 'en_IN:en'
+except:
+    pass
+
+try:
+    os.environ['LC_NUMERIC'] = 'en_IN:en'
+except:
+    pass
+
+try:
+    os.environ['LC_TELEPHONE'] = 'en_IN:en'
+except:
+    pass
+
+try:
+    os.environ['LC_IDENTIFICATION'] = 'en_IN:en'
+except:
+    pass
+
+try:
+    os.environ['LC_TIME'] = 'en_IN:en'
+except:
+    pass
+
+
+
+# Default configuration. The keys are the same saved by the graphical interface in GUI_status.yaml,
+# and the values are the ones shown in the easyfermi window when it is opened.
+DEFAULT_CONFIG = AnalysisSettings().to_dict()
+
+# Attributes of the class Analysis shown in the Log box of the graphical interface (see Ui_mainWindow.reportProgress).
+# They are sent to the graphical interface together with the progress of the analysis when it runs in a separate process.
+PROGRESS_ATTRIBUTES = ["IsThereLtcube", "IsThereLtcube3", "Emin", "Emax", "Time_intervMJD", "OutputDir", "target_spectrum_type",
+                       "freeradiusalert", "fitquality", "Solar_separation", "allow_MCMC", "include_VHE", "AIC", "Compute_LC",
+                       "adaptive", "locRA", "locDec", "locr95", "sourcename", "redshift_error"]
+
+
+
+class Analysis:
+
+    """
+    Class hosting the full easyfermi analysis without any graphical interface.
+
+    Parameters
+    ----------
+    config: AnalysisSettings, dict or str
+        Analysis configuration. It can be an AnalysisSettings, a dictionary or the path to a yaml file (e.g. a GUI_status.yaml
+        saved by the graphical interface), both with the same keys as DEFAULT_CONFIG. Missing keys take the default values.
+        The configuration is frozen in the attribute "settings" and cannot change during the analysis.
+
+    Examples
+    --------
+    >>> from easyfermi import Analysis
+    >>> analysis = Analysis({"Coords": "166.11, 38.21", "spacecraft": "./spacecraft/SC00.fits",
+    ...                      "dir_photon": "./Photons", "diffuse": "./Diffuse", "output": "./Mrk421"})
+    >>> results = analysis.run()
+    """
+
+    def __init__(self, config):
+
+        self.settings = load_settings(config)  # Frozen snapshot, the steps below never read the GUI widgets
+
+        output_dir = Path(self.settings.output)
+        self.OutputDir = str(output_dir.parent.resolve())+'/'+output_dir.name+'/'
+
+        self.recover_coords_from_name = None  # Simbad table, only used if the target is given by name
+        self.adaptive = False
+        self.results = {}
+
+
+    def run(self, progress=None, resume=False):
+
+        """
+        Runs all the steps of the analysis, in the same order used by the graphical interface.
+
+        Parameters
+        ----------
+        progress (optional): callable
+            Function called with an integer number (from 0 to 11) every time a step of the analysis is finished.
+            The graphical interface uses it to report the progress of the analysis in the Log box.
+        resume (optional): bool
+            If True and a previous run with the same settings was interrupted, the ROI and the results of the last completed step are
+            loaded from the directory "checkpoints" (inside the output directory) and the analysis continues from the first incomplete step.
+
+        Returns
+        -------
+        results: dict
+            Main results of the analysis (target name, output directory, fit quality, TS, fluxes, etc).
+        """
+
+        if progress is None:
+            progress = lambda n: None
+
+        self.setFermipy()
+        self.completed_stages = self.load_checkpoint() if resume else []
+        progress(0)  # These numbers 0, 1, 2 etc enter as "n" in the function Ui_mainWindow.reportProgress(self,n)
+        self.run_stage("setup", self.gta.setup)
+        self.update_ltcube_cache()
+        progress(1)
+        self.run_stage("analysisBasics", self.analysisBasics)
+        progress(2)
+        self.run_stage("fit_model", self.fit_model)
+        if self.calculate_Sun:
+            progress(3)
+            self.run_stage("Sun_path", self.Sun_path)
+
+        progress(4)
+        self.run_stage("relocalize_the_target", self.relocalize_the_target)
+        progress(5)
+        self.run_stage("compute_TSmap", self.compute_TSmap)
+        progress(6)
+        self.run_stage("compute_Extension", self.compute_Extension)
+        progress(7)
+        self.run_stage("compute_SED", self.compute_SED)
+        progress(8)
+        self.run_stage("EBL_and_MCMC", self.EBL_and_MCMC)
+        progress(9)
+        self.run_stage("compute_LC", self.compute_LC)
+        with managed_figures("plot_LCs"):
+            self.plot_LCs(adaptive=False)
+        progress(10)
+        for i in range(self.N_iter_adaptive_LC):
+            self.run_stage(f"compute_LC_adaptive_{i}", self.compute_LC_adaptive)
+        with managed_figures("plot_LCs_adaptive"):
+            self.plot_LCs(adaptive=True)
+        progress(11)
+
+        return self.collect_results()
+
+
+    def run_stage(self, stage, function):
+
+        """
+        Runs one step of the analysis and saves a checkpoint when it is done. Steps already completed
+        in a resumed run (see load_checkpoint) are skipped.
+
+        Parameters
+        ----------
+        stage: str
+            Name of the step, used to name its checkpoint.
+        function: callable
+            Method running the step.
+        """
+
+        if stage in self.completed_stages:
+            print(f"Skipping {stage}: already done in a previous run.")
+            return
+
+        with managed_figures(stage):  # Figures left open by the step are closed when it ends
+            function()
+        self.save_checkpoint(stage)
+
+
+    def save_checkpoint(self, stage):
+
+        """
+        Saves the ROI (with gta.write_roi) and the attributes of this class computed so far, then marks the step as completed
+        in the file checkpoints/stages.yaml. The attributes that cannot be pickled are not saved.
+
+        Parameters
+        ----------
+        stage: str
+            Name of the completed step.
+        """
+
+        checkpoint_dir = self.OutputDir+'checkpoints/'
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        self.gta.write_roi(checkpoint_dir+'roi_'+stage, make_plots=False, save_model_map=False)
+
+        state = {}
+        for name, value in self.__dict__.items():
+            if name in ["gta", "settings", "completed_stages"]:
+                continue
+            try:
+                pickle.dumps(value)
+            except Exception:
+                continue
+            state[name] = value
+
+        with open(checkpoint_dir+stage+'.pkl.tmp', 'wb') as f:
+            pickle.dump(state, f)
+        os.replace(checkpoint_dir+stage+'.pkl.tmp', checkpoint_dir+stage+'.pkl')
+
+        self.completed_stages.append(stage)
+        with open(checkpoint_dir+'stages.yaml.tmp', 'w') as f:
+            yaml.dump({"settings": self.settings.to_dict(), "completed_stages": self.completed_stages}, f, default_flow_style=False)
+        os.replace(checkpoint_dir+'stages.yaml.tmp', checkpoint_dir+'stages.yaml')  # The completion marker is only written once the checkpoint is complete
+
+
+    def load_checkpoint(self):
+
+        """
+        Loads the checkpoint of the last completed step of a previous run. The previous run is only resumed if it used the same settings.
+
+        Returns
+        -------
+        completed_stages: list
+            Names of the steps completed in the previous run, or an empty list if there is nothing to resume.
+        """
+
+        checkpoint_dir = self.OutputDir+'checkpoints/'
+        if not os.path.exists(checkpoint_dir+'stages.yaml'):
+            return []
+
+        with open(checkpoint_dir+'stages.yaml', 'r') as f:
+            checkpoint = yaml.load(f, Loader)
+
+        if checkpoint["settings"] != self.settings.to_dict():
+            print("The settings changed since the last run. Starting the analysis from scratch.")
+            return []
+
+        completed_stages = checkpoint["completed_stages"]
+        if len(completed_stages) == 0:
+            return []
+
+        last_stage = completed_stages[-1]
+        with open(checkpoint_dir+last_stage+'.pkl', 'rb') as f:
+            state = pickle.load(f)
+        self.__dict__.update(state)
+
+        self.gta.setup()  # Files already computed in the output directory (ltcube, srcmaps etc) are not computed again
+        self.gta.load_roi(checkpoint_dir+'roi_'+last_stage+'.npy')
+        print(f"Resuming the analysis after the step {last_stage}.")
+
+        return list(completed_stages)
+
+
+    def progress_state(self):
+
+        """
+        Returns the attributes listed in PROGRESS_ATTRIBUTES that were already computed, i.e. what the graphical interface
+        needs to report the progress of the analysis.
+        """
+
+        return {name: getattr(self, name) for name in PROGRESS_ATTRIBUTES if hasattr(self, name)}
+
+
+    def collect_results(self):
+
+        """
+        Collects the main results of the analysis in a dictionary.
+
+        Returns
+        -------
+        results: dict
+            Target name, output directory, fit quality, TS, fluxes, peak memory of the figures (MB) and, if computed, the localization, the MCMC Akaike information criterion
+            and the upper limit on the redshift.
+        """
+
+        target = self.gta.roi[self.sourcename]
+        self.results["sourcename"] = self.sourcename
+        self.results["OutputDir"] = self.OutputDir
+        self.results["fitquality"] = self.fitquality
+        self.results["ts"] = float(target['ts'])
+        self.results["flux"] = float(target['flux'])
+        self.results["flux_err"] = float(target['flux_err'])
+        self.results["eflux"] = float(target['eflux'])
+        self.results["eflux_err"] = float(target['eflux_err'])
+        self.results["flux_ul95"] = float(target['flux_ul95'])
+        self.results["eflux_ul95"] = float(target['eflux_ul95'])
+        if self.settings.reloc:
+            self.results["RA"] = float(self.locRA)
+            self.results["Dec"] = float(self.locDec)
+            self.results["r95"] = float(self.locr95)
+        self.results["peak_figure_memory"] = peak_figure_memory()/1024**2  # MB
+        if getattr(self, "allow_MCMC", False):
+            self.results["AIC"] = float(self.AIC)
+            if self.settings.redshift_scan:
+                self.results["redshift_ul95"] = self.z_ul95
+
+        return self.results
+
+
+    def setFermipy(self):
+
+        """
+        Here we setup the GTAnalysis class using the input information given by the user
+        in the configuration, or in the customized fermipy configuration file.
+        """
+
+        from fermipy.gtanalysis import GTAnalysis
+
+        if not self.settings.Standard:
+            self.OutputDir = str(Path(self.settings.output).resolve())+'/'
+            # fermipy would write to the directory of the configuration file, shared by all the targets of a batch in the same directory:
+            self.gta = GTAnalysis(self.settings.configfile,logging={'verbosity': 3},fileio={'outdir': self.OutputDir})
+            self.roiwidth = self.gta.config.get('binning').get('roiwidth')
+            self.Emin = self.gta.config.get('selection').get('emin')
+            self.Emax = self.gta.config.get('selection').get('emax')
+            self.RA = self.gta.config.get('selection').get('ra')
+            self.Dec = self.gta.config.get('selection').get('dec')
+            self.Time_intervMJD = (self.gta.config.get('selection').get('tmax') - self.gta.config.get('selection').get('tmin'))/86400
+            self.spacecraft_file = self.gta.config.get('data').get('scfile')
+            self.tmin = self.gta.config.get('selection').get('tmin')
+            self.tmax = self.gta.config.get('selection').get('tmax')
+
+        else:
+            self.generateConfig(extend_ltcubes=True)
+            self.gta = GTAnalysis(self.OutputDir+'config.yaml',logging={'verbosity': 3})
+
+        #Get target name:
+        for n,s in enumerate(self.gta.roi.sources):
+            if n == 0:
+                self.sourcename = s.name
+
+
+        #Checking for ltcube:
+        self.IsThereLtcube = self.gta.config.get('data').get('ltcube')
+        if self.IsThereLtcube is None and len(self.gta.components) > 1:
+            self.IsThereLtcube = self.gta.components[0].config.get('data').get('ltcube')  # ltcube given in the block "components" (e.g. from the ltcube cache)
+        self.IsThereLtcube2 = glob.glob(self.OutputDir+'*.fits')
+        self.IsThereLtcube3 = 0
+        if self.OutputDir+'ltcube_00.fits' in self.IsThereLtcube2:
+            self.IsThereLtcube3 = 1
+
+
+    def generateConfig(self, extend_ltcubes=False):
+
+        """
+        This function generates the yaml configuration file required for the analysis.
+
+        Parameters
+        ----------
+        extend_ltcubes (optional): bool
+            If True and the ltcube cache only has an ltcube for the beginning of the time interval (e.g. when a monitored source
+            is analyzed again with a few more days of data), this ltcube is extended to the full time interval with the Fermitools.
+
+        Returns
+        -------
+        config_file: str
+            Path to the file named "config.yaml" saved in the chosen output directory and containing information on RA, Dec, energy range, time range etc.
+
+        """
+
+        output_dir = Path(self.settings.output)
+        self.OutputDir = str(output_dir.parent.resolve())+'/'+output_dir.name+'/'
+
+        if not os.path.exists(self.OutputDir):
+            os.system(f"mkdir {self.OutputDir}")
+
+        date = self.settings.date
+        date2 = self.settings.date2
+        timeStart = ['2008-08-04T15:43:36']
+        tStart = Time(timeStart)
+        self.tStartMJD = tStart.mjd[0]
+        self.METStart = 239557417.0
+        times = [str(date[6:10])+'-'+str(date[3:5])+'-'+str(date[:2])+'T'+str(date[11:19]),    str(date2[6:10])+'-'+str(date2[3:5])+'-'+str(date2[:2])+'T'+str(date2[11:19])              ]
+        t = Time(times)
+        t0 = t.mjd[0]
+        t1 = t.mjd[1]
+        self.tmin = (t0-self.tStartMJD)*86400 + self.METStart
+        self.tmax = (t1-self.tStartMJD)*86400 + self.METStart
+        self.spacecraft_file = self.settings.spacecraft
+
+
+        self.Time_intervMJD = t1-t0
+
+        catalog = self.settings.catalog
+
+        Coords = self.settings.Coords.split(",")
+
+        if len(Coords) == 1:
+            if self.recover_coords_from_name is None:
+                from astroquery.simbad import Simbad
+                self.recover_coords_from_name = Simbad.query_object(Coords[0])
+            recovered_RA = self.recover_coords_from_name["RA"][0]
+            recovered_Dec = self.recover_coords_from_name["DEC"][0]
+            c = SkyCoord(recovered_RA+' '+recovered_Dec, unit=(u.hourangle, u.deg))
+            self.RA = str(c.ra.value)
+            self.Dec = str(c.dec.value)
+        else:
+            self.RA = Coords[0]
+            self.Dec = Coords[1]
+
+        Energies = self.settings.Energ.split(',')
+
+        self.Emin = float(Energies[0])
+        self.Emax = float(Energies[1])
+        if self.Emin < 100:
+            zmax = 80
+            self.roiwidth = 17
+        elif 100 <= self.Emin < 500:
+            zmax = 90
+            self.roiwidth = 15
+        elif 500 <= self.Emin < 1000:
+            zmax = 100
+            self.roiwidth = 12
+        else:
+            zmax = 105
+            self.roiwidth = 10
+
+        if self.settings.High_resolution:
+            evtype = 48
+        else:
+            evtype = 3
+
+        components = self.selection_components()
+
+        # Good time intervals: by default fermipy runs no gtmktime (selection.filter = None). Optionally, we exclude the times when the Sun or the Moon
+        # is close to the target, together with the data quality cut. gtmktime applies the same cuts to every row of the spacecraft file, so they
+        # hold for the setup, the SED and every light curve bin. The same filter (or None) identifies the ltcubes in the cache.
+        self.selection_filter = None
+        if self.settings.Exclude_Sun_Moon:
+            self.compute_Sun_Moon_GTIs()
+            self.selection_filter = DATA_QUALITY_FILTER + (f" && ANGSEP(RA_SUN,DEC_SUN,{self.RA},{self.Dec})>{self.settings.Sun_exclusion_angle}"
+                                      f" && ANGSEP(RA_MOON,DEC_MOON,{self.RA},{self.Dec})>{self.settings.Moon_exclusion_angle}")
+
+        # Livetime cubes: external ltcubes given by the user, or ltcubes computed in previous analyses with the same parameters (see ltcube_cache.py)
+        if len(components) > 0:
+            ltcube_selections = [(component["zmax"], component["evtype"]) for component in components]
+        else:
+            ltcube_selections = [(zmax, evtype)]
+        ltcube_files = [None]*len(ltcube_selections)
+        self.ltcube_cache_parameters = []
+        if self.settings.Use_external_ltcube:
+            ltcube_list = np.loadtxt(self.settings.external_ltcube,ndmin=2,dtype=str)
+            ltcube_list = ltcube_list[:,0]
+            if len(components) > 0:
+                ltcube_files = list(ltcube_list)
+            elif len(ltcube_list) == 1:
+                ltcube_files = [ltcube_list[0]]
+        elif self.settings.Use_ltcube_cache:
+            ltcube_cache = self.open_ltcube_cache()
+            for i, (zmax_i, evtype_i) in enumerate(ltcube_selections):
+                parameters = ltcube_cache.parameters(self.spacecraft_file, int(self.tmin), int(self.tmax), zmax_i, evtype_i, filter=self.selection_filter)
+                ltcube_files[i] = ltcube_cache.lookup(parameters)
+                if ltcube_files[i] is None and extend_ltcubes:
+                    os.system('ls '+self.settings.dir_photon+'/*PH*.fits > '+self.OutputDir+'list.txt')
+                    ltcube_files[i] = ltcube_cache.extend(parameters, self.spacecraft_file, '@'+self.OutputDir+'list.txt', self.OutputDir)
+                    if ltcube_files[i] is None and self.settings.Use_ltcube_tiles:
+                        ltcube_files[i] = ltcube_cache.tiled(parameters, self.spacecraft_file, '@'+self.OutputDir+'list.txt', self.OutputDir)
+                self.ltcube_cache_parameters.append(parameters)
+
+        f = open(self.OutputDir+'config.yaml','w')
+        f.write('data:\n')
+        os.system('ls '+self.settings.dir_photon+'/*PH*.fits > '+self.OutputDir+'list.txt')
+        f.write('  evfile : '+self.OutputDir+'list.txt\n')
+        f.write('  scfile : '+self.spacecraft_file+'\n')
+        if len(components) == 0 and ltcube_files[0] is not None:
+            f.write('  ltcube : '+ltcube_files[0]+'\n')
+
+        f.write('\nbinning:\n')
+        f.write('  roiwidth   : '+str(self.roiwidth)+'\n')
+        f.write('  binsz      : 0.1\n')
+        f.write('  binsperdec : 8\n\n')
+        f.write('selection :\n')
+        f.write('  emin : '+str(self.Emin)+'\n')
+        f.write('  emax : '+str(self.Emax)+'\n')
+        f.write('  zmax    : '+str(zmax)+'\n')
+        f.write('  evclass : 128\n')
+        f.write('  evtype  : '+str(evtype)+'\n')
+        f.write('  ra: '+self.RA+'\n')
+        f.write('  dec: '+self.Dec+'\n')
+        f.write('  tmin: '+str(int(self.tmin))+'\n')
+        f.write('  tmax: '+str(int(self.tmax))+'\n')
+        if self.selection_filter is not None:
+            f.write('  filter: "'+self.selection_filter+'"\n')
+        f.write('\n')
+        f.write('gtlike:\n')
+        f.write('  edisp : True\n')
+        f.write("  irfs : 'P8R3_SOURCE_V3'\n")
+        f.write("  edisp_disable : ['isodiff']\n")
+        f.write('  edisp_bins : -2\n\n')
+        f.write('model:\n')
+        f.write('  src_roiwidth : '+str(self.roiwidth+10)+'\n')
+        f.write("  galdiff  : '"+self.settings.diffuse+"/gll_iem_v07.fits'\n")
+        f.write("  isodiff  : '"+self.settings.diffuse+"/iso_P8R3_SOURCE_V3_v1.txt'\n")
+        f.write("  catalogs : ['"+catalog+"']\n")
+
+        if self.settings.cataloged == "No":
+            f.write("  sources  :\n")
+            f.write("    - { name: '"+self.settings.nickname+"', ra : "+self.RA+", dec : "+self.Dec+", SpectrumType : 'PowerLaw', SpatialModel: 'PointSource' }")
+
+
+        if len(components) > 0:
+            f.write('\ncomponents:\n')
+            for i, component in enumerate(components):
+                f.write("  - model:\n")
+                f.write("      galdiff  : '"+self.settings.diffuse+"/gll_iem_v07.fits'\n")
+                f.write("      isodiff  : '"+self.settings.diffuse+"/iso_P8R3_SOURCE_V3_v1.txt'\n")
+                f.write('    selection:\n')
+                f.write(f'      emin : {component["emin"]}\n')
+                f.write(f'      emax : {component["emax"]}\n')
+                f.write(f'      zmax : {component["zmax"]}\n')
+                f.write(f'      evtype : {component["evtype"]}\n')
+                if ltcube_files[i] is not None:
+                    f.write('    data:\n')
+                    f.write(f'      ltcube : {ltcube_files[i]}\n')
+
+
+
+        f.close()
+        return self.OutputDir+'config.yaml'
+
+
+    def selection_components(self):
+
+        """
+        Splits the energy range in components with different zenith angle cuts and event types when the
+        "high sensitivity" option is checked (see the configuration section "components" of fermipy).
+
+        Returns
+        -------
+        components: list
+            One dictionary (with keys emin, emax, zmax and evtype) per component, or an empty list if the analysis has a single component.
+        """
+
+        if not self.settings.High_sensitivity:
+            return []
+
+        if self.Emax < 500:
+            n_components = 1
+        elif self.Emin < 500 and 500 <= self.Emax < 1000:
+            n_components = 2
+            emin = [self.Emin,500]
+            emax = [500,self.Emax]
+            if self.settings.High_resolution:
+                evtype = [48,56]
+            else:
+                evtype = [3,3]
+
+            if self.Emin < 100:
+                zmax = [80,100]
+            else:
+                zmax = [90,100]
+
+        elif 500 <= self.Emin < 1000 and self.Emax > 1000:
+            n_components = 2
+            emin = [self.Emin,1000]
+            emax = [1000,self.Emax]
+            zmax = [100,105]
+            if self.settings.High_resolution:
+                evtype = [56,3]
+            else:
+                evtype = [3,3]
+        elif self.Emin < 500 and self.Emax > 1000:
+            n_components = 3
+            emin = [self.Emin,500,1000]
+            emax = [500,1000,self.Emax]
+            if self.settings.High_resolution:
+                evtype = [48,56,3]
+            else:
+                evtype = [3,3,3]
+
+            if self.Emin < 100:
+                zmax = [80,100,105]
+            else:
+                zmax = [90,100,105]
+        else:
+            n_components = 1
+
+        if n_components == 1:
+            return []
+
+        return [{"emin": emin[i], "emax": emax[i], "zmax": zmax[i], "evtype": evtype[i]} for i in range(n_components)]
+
+
+    def open_ltcube_cache(self):
+
+        """
+        Returns the shared ltcube cache, in the directory and with the maximum size (GB) given in the settings.
+        A maximum size <= 0 means no limit.
+        """
+
+        max_size = self.settings.ltcube_cache_size if self.settings.ltcube_cache_size > 0 else None
+        return LtcubeCache(self.settings.ltcube_cache_directory or None, max_size=max_size)
+
+
+    def update_ltcube_cache(self):
+
+        """
+        Copies the ltcubes computed by fermipy during the setup (ltcube_00.fits, ltcube_01.fits etc) to the shared ltcube cache,
+        so that later analyses with the same spacecraft file, time interval, zenith angle cut and event type can reuse them.
+        """
+
+        coverage = None
+        for i, parameters in enumerate(getattr(self, "ltcube_cache_parameters", [])):
+            ltcube_file = self.OutputDir+f'ltcube_{i:02d}.fits'
+            if os.path.exists(ltcube_file):
+                try:
+                    if coverage is None:
+                        coverage = data_coverage(self.spacecraft_file, glob.glob(self.settings.dir_photon+'/*PH*.fits'))
+                    self.open_ltcube_cache().store(parameters, ltcube_file, coverage=coverage)
+                except OSError as error:
+                    print(f"The ltcube {ltcube_file} could not be saved in the ltcube cache: {error}")
+
+
+    def find_nearest(self,array, value):
+
+        """
+        This function finds the nearest value in a numpy array.
+
+        Parameters
+        ----------
+        array: numpy array
+            Integer or float array
+        value: float
+            The number that you are looking for.
+
+        Returns
+        -------
+        idx: int
+            the index corresponding to the element in the 'array' which is closest to 'value'
+        """
+
+        array = np.asarray(array)
+        idx = (np.abs(array - value)).argmin()
+        return idx
+
+    def Sun_path(self):
+
+        """
+        Function that calculates the target-Sun distance over
+        the time window set in the main window of easyfermi.
+
+        Returns
+        -------
+        Quickplot_Sun: pdf
+            pdf plot in the output directory.
+
+        """
+
+        plt = import_pyplot()
+        from matplotlib.ticker import AutoMinorLocator
+
+        timeStart = ['2008-08-04T15:43:36']
+        tStart = Time(timeStart)
+        self.tStartMJD = tStart.mjd[0]
+        self.METStart = 239557417.0
+
+        output_format = self.settings.output_format
+
+        # Only one every 1000 rows (~8 h) of the spacecraft file within the chosen time window is read from the disk:
+        with SpacecraftFile(self.spacecraft_file) as spacecraft_data_file:
+            time_window_min_index, time_window_max_index = spacecraft_data_file.window(self.tmin, self.tmax)
+            rows = spacecraft_data_file.read(["RA_SUN", "DEC_SUN"], time_window_min_index, time_window_max_index, step=1000)
+            START_min = spacecraft_data_file.data.field("START")[time_window_min_index]
+            STOP_max = spacecraft_data_file.data.field("STOP")[time_window_max_index]
+
+        # Selecting the Sun RA and Dec within the chosen time window:
+        Sun_RA = rows["RA_SUN"]
+        Sun_DEC = rows["DEC_SUN"]
+        target_RA = float(self.RA)
+        target_Dec = float(self.Dec)
+
+        self.Solar_separation = angular_separation(Sun_RA, Sun_DEC, target_RA, target_Dec)
+
+        t0_MJD = self.tStartMJD + (START_min - self.METStart)/86400  # Computing the MJD in the beginning of observations
+        t1_MJD = self.tStartMJD + (STOP_max - self.METStart)/86400
+
+        if len(self.Solar_separation) >= 10:
+            time_range = np.linspace(t0_MJD,t1_MJD,len(self.Solar_separation))
+
+            f = plt.figure(figsize=(9,4),dpi=250)
+            ax = f.add_subplot(1,1,1)
+            ax.xaxis.set_minor_locator(AutoMinorLocator(2))
+            ax.yaxis.set_minor_locator(AutoMinorLocator(2))
+            ax.tick_params(which='major', length=5, direction='in')
+            ax.tick_params(which='minor', length=2.5, direction='in',bottom=True, top=True, left=True, right=True)
+            ax.tick_params(bottom=True, top=True, left=True, right=True)
+            ax.grid(linestyle=':',which='both')
+
+            plt.plot(time_range,15*np.ones(len(time_range)))
+            plt.plot(time_range,self.Solar_separation)
+            plt.fill_between(time_range,15,alpha=0.4,color="gray")
+            shift = t1_MJD - t0_MJD
+            shift = 0.05*shift
+            plt.text(t0_MJD + shift,15,"Solar contamination is possible below this line")
+            plt.xlabel('Time [MJD]')
+            plt.ylabel('Angular separation [$^{\circ}$]')
+            plt.title('Angular separation between '+self.sourcename+' and the Sun',fontsize=11)
+
+            plt.xlim(time_range[0],time_range[-1])
+            plt.ylim(0,None)
+            plt.tight_layout()
+            save_figure(self.OutputDir+'Quickplot_Sun.'+output_format)
+
+            # Saving data:
+            np.savetxt(self.OutputDir+'Solar_ang_separation.csv', np.transpose([time_range,self.Solar_separation]),delimiter=",",header="Time [MJD], Angular separation [deg]")
+
+        else:
+            print("Time window is too short for computing the target-Sun separation plot. Minimum window is 4 days.")
+
+
+
+
+
+
+
+    def compute_Sun_Moon_GTIs(self):
+
+        """
+        Finds the good time intervals when both the Sun and the Moon are farther from the target than the angles chosen
+        in the settings (Sun_exclusion_angle and Moon_exclusion_angle), using all the rows (30 s each) of the spacecraft file.
+
+        Returns
+        -------
+        Sun_Moon_GTI.fits: data file saved in the output directory.
+            Extension "GTI" with the good time intervals and extension "EXCLUDED" with the intervals removed from the analysis (both in MET).
+        """
+
+        good, excluded = proximity_intervals(self.spacecraft_file, self.tmin, self.tmax, float(self.RA), float(self.Dec),
+                                             sun_angle=self.settings.Sun_exclusion_angle, moon_angle=self.settings.Moon_exclusion_angle)
+        self.Sun_Moon_excluded_time = float(np.sum(excluded[1] - excluded[0]))/86400  # days
+
+        hdus = [pyfits.PrimaryHDU()]
+        for name, (start, stop) in [("GTI", good), ("EXCLUDED", excluded)]:
+            hdu = pyfits.BinTableHDU.from_columns([pyfits.Column(name="START", array=start, format="D", unit="s"),
+                                                   pyfits.Column(name="STOP", array=stop, format="D", unit="s")], name=name)
+            hdu.header["RA_TARG"] = float(self.RA)
+            hdu.header["DEC_TARG"] = float(self.Dec)
+            hdu.header["SUN_ANG"] = (self.settings.Sun_exclusion_angle, "Minimum target-Sun separation [deg]")
+            hdu.header["MOON_ANG"] = (self.settings.Moon_exclusion_angle, "Minimum target-Moon separation [deg]")
+            hdus.append(hdu)
+        pyfits.HDUList(hdus).writeto(self.OutputDir+'Sun_Moon_GTI.fits', overwrite=True)
+        print(f"Sun and Moon cuts: {self.Sun_Moon_excluded_time:.2f} days excluded from the analysis.")
+
+
+    def analysisBasics(self):
+
+        """
+        This function calls fermipy to optimize the RoI model in the Fermi-LAT data after the setup is done (i.e. after the computation
+        of ltcube, exposure map, srcmaps etc). This function is also in charge of generating a counts map, changing the target model
+        (if requested by the user), and deleting sources from the model (if requested).
+
+        Parameters
+        ----------
+        self: instance of the class Analysis
+            This parameter contains the analysis configuration and the intermediate results.
+
+        Returns
+        -------
+        cmap.fits: data file saved in the output directory.
+            This is the counts map centered on the target.
+        """
+
+        #Cmap:
+        h = pyfits.open(self.OutputDir+'ccube.fits')
+        counts = h[0].data
+        counts.shape
+        h[0].data = np.sum(counts,axis=0)
+        h.writeto(self.OutputDir+'cmap.fits',overwrite=True)
+
+        #Change model if requested:
+        if self.settings.change_model:
+            aux = self.settings.which_model
+            if aux == 'Select...':
+                pass
+            elif aux == 'Power-law':
+                aux = 'PowerLaw'
+            elif aux == 'Power-law2':
+                aux = 'PowerLaw2'
+            elif aux == 'LogPar':
+                aux = 'LogParabola'
+            elif aux == 'PLEC':
+                aux = 'PLSuperExpCutoff'
+            elif aux == 'PLEC2':
+                aux = 'PLSuperExpCutoff2'
+            elif aux == 'PLEC3':
+                aux = 'PLSuperExpCutoff3'
+            elif aux == 'PLEC4':
+                aux = 'PLSuperExpCutoff4'
+            elif aux == 'BPL':
+                aux = 'BrokenPowerLaw'
+            elif aux == 'ExpCutOff-EBL':
+                aux = 'ExpCutoff'
+
+            if aux != 'Select...':
+                self.gta.delete_source(self.sourcename)
+                skip_list = list(self.gta.roi.create_source_table()["source_name"])
+                self.gta.add_source(self.sourcename, src_dict={'ra' : float(self.RA), 'dec' : float(self.Dec) , 'SpatialModel' : 'PointSource', 'SpectrumType' : aux})
+                self.gta.optimize(skip=skip_list, npred_frac=0)  # We optimize only the new source added above. All other sources are skipped.
+
+        # Optimizing RoI:
+        self.gta.optimize(npred_threshold=50,shape_ts_threshold=30)
+
+        if self.settings.find_sources:
+            self.gta.find_sources(sqrt_ts_threshold=self.settings.min_sig, min_separation=self.settings.min_sep, multithread=True)
+
+        #Delete sources:
+        if self.settings.delete_sources:
+            a = self.settings.which_sources_deleted.split(',')
+            if a[0] == '':
+                pass
+            else:
+                for i in a:
+                    self.gta.delete_source(i)
+
+
+        self.freeradius = self.roiwidth/2.
+        self.freeradiusalert = 'ok'
+        if self.settings.Free_radius_custom:
+            if self.settings.free_radius != '':
+                self.freeradius = float(self.settings.free_radius)
+            else:
+                self.freeradiusalert = '- No free source radius available. Using default free source radius: '+str(self.freeradius)+"°."
+
+            if self.settings.Only_norm:
+                """Free only the normalizations:"""
+                self.gta.free_sources(distance=self.freeradius,pars='norm')
+            else:
+                self.gta.free_sources(distance=self.freeradius)
+
+            if self.settings.Freeze_Gal:
+                """Freeze Galactic diffuse model:"""
+                self.gta.free_source('galdiff',free=False)
+            else:
+                pass
+
+            if self.settings.Freeze_Iso:
+                """Freeze Isotropic diffuse model:"""
+                self.gta.free_source('isodiff',free=False)
+            else:
+                pass
+        else:
+            self.gta.free_sources(distance=self.freeradius)
+            #self.gta.free_source('galdiff')
+            #self.gta.free_source('isodiff')
+            #self.gta.free_source(self.sourcename)
+
+        if self.settings.Freeze_targ_shape:
+            self.gta.free_source(self.sourcename,free=False)
+            self.gta.free_source(self.sourcename,pars='norm')
+
+        N_iter_adaptive_LC = self.settings.N_iter
+        self.N_iter_adaptive_LC = N_iter_adaptive_LC
+        self.target_spectrum_type = self.gta.roi.sources[0]['SpectrumType']
+
+        return N_iter_adaptive_LC
+
+    def fit_model(self):
+
+        """
+        This function calls fermipy to fit the RoI model in the Fermi-LAT data after the optimization is done.
+        Furthermore, it also generates the diagnostic plots (if requested by the user).
+
+        Parameters
+        ----------
+        self: instance of the class Analysis
+            This parameter contains the analysis configuration and the intermediate results.
+
+        Returns
+        -------
+        do_diagnostic_plots: boolean
+            This is the status of the diagnostic plot check box. If True, the Solar separation will be computed in the Class Worker.
+
+        Target_results.txt: data file saved in the output directory.
+            This file contains the results of the RoI fit only for the target, such that the user can have a quick look at it.
+        Results.fits and Results.npy: data files saved in the output directory.
+            These files contain the same information. They give the user the full set of results regarding the fit of the RoI.
+        """
+
+        if self.settings.change_minimizer:
+            optimizer = self.settings.which_minimizer
+        else:
+            optimizer = 'NEWMINUIT'
+
+        fit_results = self.gta.fit(optimizer=optimizer, min_fit_quality=2)
+        original_fit_quality = fit_results['fit_quality']
+
+        try:
+            TS_fit_cut = float(self.settings.fit_TS_cut)  # If the fit does not converge, we delete the sources with TS < TS_fit_cut (more details in the documentation).
+        except:
+            TS_fit_cut = 16
+            print("Fit TS cut is not a valid float. Resetting TS_cut = 16.")
+
+        if original_fit_quality == 3:
+            self.fitquality = '- Fit quality: 3. Excellent fit! Full accurate covariance matrix.'
+        else:
+            if self.gta.get_sources()[0]["ts"] < TS_fit_cut:
+                self.gta.delete_sources(minmax_ts=[None,0.99*self.gta.get_sources()[0]["ts"]])  # Here we delete the sources that have TS < TS_target and refit the model
+                fit_results = self.gta.fit(optimizer=optimizer)
+                if fit_results['fit_quality'] == 3:
+                    self.fitquality = f'- Original fit quality: {original_fit_quality}. As the TS of the target was only {self.gta.get_sources()[0]["ts"]}, we deleted all sources with TS < {self.gta.get_sources()[0]["ts"]} and performed the fit again.\n- Fit quality of the second try: 3. Excellent fit! Full accurate covariance matrix.'
+                elif fit_results['fit_quality'] == 2:
+                    self.fitquality = f'- Original fit quality: {original_fit_quality}. As the TS of the target was only {self.gta.get_sources()[0]["ts"]}, we deleted all sources with TS < {self.gta.get_sources()[0]["ts"]} and performed the fit again.\n- Fit quality of the second try: 2. Reasonable fit. Full matrix, but forced positive-definite (i.e. not accurate).'
+                elif fit_results['fit_quality'] == 1:
+                    self.fitquality = f'- Original fit quality: {original_fit_quality}. As the TS of the target was only {self.gta.get_sources()[0]["ts"]}, we deleted all sources with TS < {self.gta.get_sources()[0]["ts"]} and performed the fit again.\n- Fit quality of the second try: 1. Poor fit. Diagonal approximation only, not accurate.'
+                else:
+                    self.fitquality = f'- Original fit quality: {original_fit_quality}. As the TS of the target was only {self.gta.get_sources()[0]["ts"]}, we deleted all sources with TS < {self.gta.get_sources()[0]["ts"]} and performed the fit again.\n- Fit quality of the second try: 0. Bad fit. Error matrix not calculated.'
+
+            else:
+                self.gta.delete_sources(minmax_ts=[None,TS_fit_cut])  # Here we delete the sources that have TS < TS_fit_cut and refit the model
+                fit_results = self.gta.fit(optimizer=optimizer)
+                if fit_results['fit_quality'] == 3:
+                    self.fitquality = f'- Original fit quality: {original_fit_quality}. We deleted all sources with TS < {TS_fit_cut} and performed the fit again.\n- Fit quality of the second try: 3. Excellent fit! Full accurate covariance matrix.'
+                elif fit_results['fit_quality'] == 2:
+                    self.fitquality = f'- Original fit quality: {original_fit_quality}. We deleted all sources with TS < {TS_fit_cut} and performed the fit again.\n- Fit quality of the second try: 2. Reasonable fit. Full matrix, but forced positive-definite (i.e. not accurate).'
+                elif fit_results['fit_quality'] == 1:
+                    self.fitquality = f'- Original fit quality: {original_fit_quality}. We deleted all sources with TS < {TS_fit_cut} and performed the fit again.\n- Fit quality of the second try: 1. Poor fit. Diagonal approximation only, not accurate.'
+                else:
+                    self.fitquality = f'- Original fit quality: {original_fit_quality}. We deleted all sources with TS < {TS_fit_cut} and performed the fit again.\n- Fit quality of the second try: 0. Bad fit. Error matrix not calculated.'
+
+
+        #Do plots:
+        do_diagnostic_plots = self.settings.diagnostic
+        if do_diagnostic_plots:
+            self.gta.write_roi('Results',make_plots=True)
+        else:
+            self.gta.write_roi('Results',make_plots=False)
+
+        #Saving results
+        f = open(self.OutputDir+'Target_results.txt','w')
+        f.write(str(self.gta.roi[self.sourcename]))
+        f.write('\nEnergy flux upper limit (MeV cm-2 s-1): '+str(self.gta.roi.sources[0]['eflux_ul95']))
+        f.write('\nPhoton flux upper limit (cm-2 s-1): '+str(self.gta.roi.sources[0]['flux_ul95']))
+        f.close()
+
+        self.calculate_Sun = do_diagnostic_plots
+        return do_diagnostic_plots
+
+
+    def relocalize_the_target(self):
+
+        """This function finds the best-fit position for the gamma-ray target.
+
+        Parameters
+        ----------
+        self: instance of the class Analysis
+            This parameter contains the analysis configuration and the intermediate results.
+
+        Returns
+        -------
+        TARGET_NAME_loc.fits:
+            Table containing the old and new coordinates of the gamma-ray target, as well as the r68, r95, and r99 uncertainty radii. File is saved in the output directory.
+        TARGET_NAME_loc.npy:
+            Same as above but in the npy format.
+        TARGET_NAME_localize.png and TARGET_NAME_localize_peak.png:
+            A couple of plots showing the shift in the target coordinates.
+
+        """
+
+        if self.settings.reloc:
+            loc = self.gta.localize(self.sourcename, make_plots=True,update=True)
+            self.locRA = loc['ra']
+            self.locDec = loc['dec']
+            self.locr68 = loc['pos_r68']
+            self.locr95 = loc['pos_r95']
+            #print("New position. RA = ",self.locRA,", Dec = ",self.locDec,", r_68 = ",self.locr68,", r_95 = ",self.locr95)
+            #self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"Localization results saved in the file "+self.sourcename+"_loc.fits\n")
+
+            #Saving results
+            f = open(self.OutputDir+'Target_results.txt','w')
+            f.write(str(self.gta.roi[self.sourcename]))
+            f.write('\nEnergy flux upper limit (MeV cm-2 s-1): '+str(self.gta.roi.sources[0]['eflux_ul95']))
+            f.write('\nPhoton flux upper limit (cm-2 s-1): '+str(self.gta.roi.sources[0]['flux_ul95']))
+            f.close()
+
+    def compute_TSmap(self):
+
+        """This function computes the TS maps.
+
+        Parameters
+        ----------
+        self: instance of the class Analysis
+            This parameter contains the analysis configuration and the intermediate results.
+
+        Returns
+        -------
+        Target_TS_map_pointsource_powerlaw_2.00_tsmap.fits:
+            TS map highlighting the target significance computed for a point-source with power-law index defined by the user (default = 2). File is saved in the output directory.
+        Residuals_TS_map__pointsource_powerlaw_2.00_tsmap.fits:
+            Residuals TS map assuming the power-law index defined by the user (default = 2). File is saved in the output directory.
+
+        """
+
+        plt = import_pyplot()
+        from fermipy.plotting import ROIPlotter
+
+        output_format = self.settings.output_format
+
+        if self.settings.TS_map:
+            model = {'Index' : self.settings.test_source_index, 'SpatialModel' : 'PointSource'}
+            if self.settings.remove_targ_from_model:
+                TSmap_res = self.gta.tsmap('Residuals_TS_map_', model=model)
+                plt.figure(figsize=(8,8))
+                ROIPlotter(TSmap_res['sqrt_ts'],roi=self.gta.roi).plot(vmin=0,vmax=5,levels=[3,5,7,9],subplot=111,cmap='magma')
+                plt.gca().set_title('sqrt(TS)')
+                save_figure(self.OutputDir+'TSmap_residuals.'+output_format)
+
+
+            TSmap = self.gta.tsmap('Target_TS_map_', model=model, exclude=self.sourcename)
+            plt.figure(figsize=(8,8))
+            ROIPlotter(TSmap['sqrt_ts'],roi=self.gta.roi).plot(vmin=0,vmax=5,levels=[3,5,7,9],subplot=111,cmap='magma')
+            plt.gca().set_title('sqrt(TS)')
+            save_figure(self.OutputDir+'TSmap_target_highlighted.'+output_format)
+
+            #Below we compute the excess, significance, model, and data maps:
+            self.gta.residmap('Excess_'+self.sourcename,model=model,make_plots=True, write_fits=True, write_npy=False)
+
+
+    def compute_SED(self):
+
+        """This function computes the SED for the target.
+
+        Parameters
+        ----------
+        self: instance of the class Analysis
+            This parameter contains the analysis configuration and the intermediate results.
+
+        Returns
+        -------
+        TARGET_NAME_sed.fits
+            Table containing the SED data. File is saved in the output directory.
+        Quickplot_SED.png or Quickplot_SED.pdf:
+            A plot of the SED for quick visualization. File is saved in the output directory.
+
+        """
+
+        plt = import_pyplot()
+        from matplotlib.ticker import AutoMinorLocator
+
+        output_format = self.settings.output_format
+        if self.settings.SED:
+
+            try:
+                self.redshift = float(self.settings.redshift_value)
+            except:
+                print("- WARNING: easyfermi could not read the redshift. Please insert a valid float number. Setting redshift to 0.0.\n")
+                self.redshift = 0.0
+                self.redshift_error = "- WARNING: easyfermi could not read the redshift. Please insert a valid float number. Setting redshift to 0.0.\n"
+
+            c = np.load(self.OutputDir+'Results.npy',allow_pickle=True).flat[0]
+            self.E = np.array(c['sources'][self.sourcename]['model_flux']['energies'])
+            self.dnde = np.array(c['sources'][self.sourcename]['model_flux']['dnde'])
+            dnde_hi = np.array(c['sources'][self.sourcename]['model_flux']['dnde_hi'])
+            dnde_lo = np.array(c['sources'][self.sourcename]['model_flux']['dnde_lo'])
+            TSmin = 9
+
+            Nbins = self.settings.SED_Nbins + 1
+            ebins = np.linspace(np.log10(self.Emin),np.log10(self.Emax),num=Nbins)
+            ebins = ebins.tolist()
+
+            use_local_index = False
+            if self.settings.use_local_index:
+                use_local_index = True
+
+            self.sed = self.gta.sed(self.sourcename,loge_bins=ebins,make_plots=False,use_local_index=use_local_index,write_npy=False)
+
+            #########################################################
+            ########### Looking for SED bins with less than 5 photons
+            #########################################################
+
+            # If the analysis goes over 10 GeV, we check the total number of photons per SED bin within a radius of 0.25 deg from the RoI center:
+            ebins_array = np.asarray(ebins)
+            ebins_array = ebins_array[ebins_array > 4]
+            if len(ebins_array) > 0:
+                # One memory-mapped read of the photons above 10 GeV in all the photon files, then a vectorized separation and histogram:
+                photon_energies = []
+                photon_RA = []
+                photon_DEC = []
+                photon_files = np.sort(glob.glob(self.settings.output+"/ft1*.fits"))
+                photon_files_summary = photon_index.photon_files_index(photon_files)
+                for photon_file in photon_files:
+                    if photon_files_summary[photon_file]["emax"] <= 10000:
+                        continue  # No photon above 10 GeV in this file
+                    with pyfits.open(photon_file, memmap=True) as hdul:
+                        data = hdul[1].data
+                        high_energy = data["ENERGY"] > 10000
+                        photon_energies.append(np.array(data["ENERGY"][high_energy]))
+                        photon_RA.append(np.array(data["RA"][high_energy]))
+                        photon_DEC.append(np.array(data["DEC"][high_energy]))
+                        del data
+                if len(photon_energies) > 0:
+                    photon_energies = np.concatenate(photon_energies)
+                    photon_RA = np.concatenate(photon_RA)
+                    photon_DEC = np.concatenate(photon_DEC)
+                else:
+                    photon_energies = np.zeros(0)
+                    photon_RA = np.zeros(0)
+                    photon_DEC = np.zeros(0)
+
+                photon_separation = angular_separation(photon_RA, photon_DEC, float(self.RA), float(self.Dec))  # Separation in degrees
+                if len(ebins_array) > 1:
+                    selected_energies = photon_energies[photon_separation < 0.5][:,None]
+                    ebins_edges = 10**ebins_array
+                    photons_per_bin = np.sum((selected_energies > ebins_edges[:-1]) & (selected_energies < ebins_edges[1:]), axis=0)  # Open bins, photons at the edges are not counted
+                    self.few_photons_warning = (photons_per_bin < 5).astype(float)  # This warns that we have less than 5 photons in this bin.
+                else:
+                    self.few_photons_warning = np.zeros(0)
+
+                self.few_photons_warning = np.concatenate([np.zeros(len(ebins)-len(ebins_array)),self.few_photons_warning])
+
+                SED_file = glob.glob(self.OutputDir+"*_sed.fits")[0]
+                hdul = pyfits.open(SED_file)
+                original_data_cols = hdul[1].data.columns
+                new_col_warnings = pyfits.Column(name="Warning_few_photons",array=self.few_photons_warning,format="D",unit="")
+                all_cols = pyfits.BinTableHDU.from_columns(original_data_cols + new_col_warnings)
+                hdul[1].data = all_cols.data
+                hdul[1].name = "SED"
+                hdul.writeto(SED_file,overwrite=True)
+                hdul.close()
+
+            #########################################################
+
+
+
+            # The block of code below is useful only to fix an error in the Mac OS, where the TS column of the sed.fits file is empty.
+            NaNs_TSs = self.sed['ts'][np.isnan(self.sed['ts'])]
+            if len(NaNs_TSs) > 0:
+                for i in range(len(self.sed['ts'])):
+                    self.sed["ts"][i] = -2*self.sed['dloglike_scan'][i][1]
+
+                SED_file = glob.glob(self.OutputDir+"*_sed.fits")[0]
+                hdul = pyfits.open(SED_file)
+                hdul[1].data["ts"] = self.sed["ts"]
+                hdul.writeto(SED_file,overwrite=True)
+                hdul.close()
+
+            # data points:
+            self.Energy_data_points = self.sed['e_ctr'][self.sed['ts']>TSmin]
+            self.e2dnde_data_points = self.sed['e2dnde'][self.sed['ts']>TSmin]
+            self.xerr_data_points = [self.sed['e_ctr'][self.sed['ts']>TSmin] - self.sed['e_min'][self.sed['ts']>TSmin], self.sed['e_max'][self.sed['ts']>TSmin] - self.sed['e_ctr'][self.sed['ts']>TSmin]]
+            self.yerr_data_points = self.sed['e2dnde_err'][self.sed['ts']>TSmin]
+            # Upper limits:
+            self.Energy_uplims = self.sed['e_ctr'][self.sed['ts']<=TSmin]
+            self.e2dnde_uplims = self.sed['e2dnde_ul95'][self.sed['ts']<=TSmin]
+            self.xerr_uplims = [self.sed['e_ctr'][self.sed['ts']<=TSmin] - self.sed['e_min'][self.sed['ts']<=TSmin], self.sed['e_max'][self.sed['ts']<=TSmin] - self.sed['e_ctr'][self.sed['ts']<=TSmin]]
+            self.yerr_uplims = 0.3*self.sed['e2dnde_ul95'][self.sed['ts']<=TSmin]
+            # Warnings:
+            if len(ebins_array) > 0:
+                self.few_photons_warning = self.few_photons_warning[self.sed['ts']>TSmin]
+                self.energy_SED_warning = self.Energy_data_points[self.few_photons_warning > 0]
+                self.e2dnde_SED_warning = self.e2dnde_data_points[self.few_photons_warning > 0]
+            else:
+                self.energy_SED_warning = np.zeros(0)
+                self.e2dnde_SED_warning = np.zeros(0)
+                self.few_photons_warning = np.zeros(0)
+
+
+
+            f = plt.figure(figsize=(6,5),dpi=250)
+            ax = f.add_subplot(1,1,1)
+            ax.xaxis.set_minor_locator(AutoMinorLocator(2))
+            ax.yaxis.set_minor_locator(AutoMinorLocator(2))
+            ax.tick_params(which='major', length=5, direction='in')
+            ax.tick_params(which='minor', length=2.5, direction='in',bottom=True, top=True, left=True, right=True)
+            ax.tick_params(bottom=True, top=True, left=True, right=True)
+            ax.grid(linestyle=':',which='both')
+
+            plt.loglog(self.E, (self.E**2)*self.dnde, 'k--')
+            plt.loglog(self.E, (self.E**2)*dnde_hi, 'k')
+            plt.loglog(self.E, (self.E**2)*dnde_lo, 'k')
+            plt.errorbar(self.Energy_data_points, self.e2dnde_data_points, xerr = self.xerr_data_points, yerr = self.yerr_data_points, color = "C0", markeredgecolor='black', fmt ='o', capsize=4)
+            plt.errorbar(self.Energy_uplims, self.e2dnde_uplims, xerr = self.xerr_uplims, yerr = self.yerr_uplims, markeredgecolor='black', fmt='o', uplims=True, color='C0', capsize=4)
+            if len(self.energy_SED_warning) > 0:
+                plt.plot(self.energy_SED_warning,self.e2dnde_SED_warning,"mo",zorder=100,label="Less than 5 photons")
+            plt.xlabel('Energy [MeV]')
+            plt.ylabel(r'E$^{2}$ dN/dE [MeV cm$^{-2}$ s$^{-1}$]')
+            plt.title(self.sourcename+' - SED')
+
+            if len(self.sed['e2dnde'][self.sed['ts']>TSmin]) > 0:
+                ymax = 2*(self.sed['e2dnde'][self.sed['ts']>TSmin] + self.sed['e2dnde_err'][self.sed['ts']>TSmin]).max()
+                ymin = 0.5*(self.sed['e2dnde'][self.sed['ts']>TSmin] - self.sed['e2dnde_err'][self.sed['ts']>TSmin]).min()
+                if ymax > 4*self.sed['e2dnde'][self.sed['ts']>TSmin].max():
+                    ymax = 4*self.sed['e2dnde'][self.sed['ts']>TSmin].max()
+
+                if ymin < self.sed['e2dnde'][self.sed['ts']>TSmin].min()/5.0:
+                    ymin = self.sed['e2dnde'][self.sed['ts']>TSmin].min()/5.0
+
+                if len(self.sed['e2dnde_ul95'][self.sed['ts']<=TSmin]) > 0:
+                    yaux = (self.sed['e2dnde_ul95'][self.sed['ts']<=TSmin]).max()
+                    if yaux > ymax:
+                        ymax = 2*yaux
+
+                    yaux = (self.sed['e2dnde_ul95'][self.sed['ts']<=TSmin]).min()
+                    if yaux < ymin:
+                        ymin = 0.5*yaux
+            else:
+                ymax = 2*self.sed['e2dnde_ul95'][self.sed['ts']<=TSmin].max()
+                ymin = 0.5*self.sed['e2dnde_ul95'][self.sed['ts']<=TSmin].min()
+
+
+            plt.ylim(ymin,ymax)
+            plt.xlim(self.Emin*0.8,self.Emax*1.2)
+            plt.legend()
+            plt.tight_layout()
+            save_figure(self.OutputDir+'Quickplot_SED_fermipy.'+output_format)
+
+
+    def EBL_and_MCMC(self):
+
+        """This function corrects the data for EBL absorption and applies a MCMC to the corrected data.
+           If the redshift is 0.0, the MCMC is applied to the non-corrected LAT data.
+
+        Parameters
+        ----------
+        self: instance of the class Analysis
+            This parameter contains the analysis configuration and the intermediate results.
+
+        Returns
+        -------
+        TARGET_NAME_sed.fits
+            Table containing the SED data + MCMC results. File is saved in the output directory.
+        Quickplot_SED_MCMC.png or Quickplot_SED_MCMC.pdf:
+            A plot of the SED for quick visualization. File is saved in the output directory.
+
+        """
+
+        plt = import_pyplot()
+        from matplotlib.ticker import AutoMinorLocator
+
+        TSmin = 9
+        self.include_VHE = False
+        self.allow_MCMC = False
+        if self.settings.SED:
+            if len(self.Energy_data_points) > 2:
+                self.allow_MCMC = True
+            else:
+                self.allow_MCMC = False
+
+        if self.allow_MCMC:
+            MCMC_model = self.settings.which_MCMC_model
+            import corner  # Version: 2.2.2
+
+            if self.settings.VHE.split('.')[-1] == 'fits':
+                try:
+                    self.include_VHE = True
+                    VHE = pyfits.open(self.settings.VHE)[1].data
+
+                    energy_VHE = VHE["e_ref"] * 1000000  # TeV to MeV
+                    energy_VHE_min = VHE["e_min"] * 1000000
+                    energy_VHE_max = VHE["e_max"] * 1000000
+                    e2dnde_VHE = VHE["e2dnde"] * 1e6  # TeV cm-2 s-1 to MeV cm-2 s-1
+                    e2dnde_err_VHE = VHE["e2dnde_err"] * 1e6
+                    e2dnde_UL_VHE = VHE["e2dnde_ul"] * 1e6
+                    TS_VHE = VHE["ts"]
+
+                    delete_nan_elements = np.isnan(e2dnde_UL_VHE)
+
+                    TS_VHE = np.delete(TS_VHE, delete_nan_elements)
+                    e2dnde_UL_VHE = np.delete(e2dnde_UL_VHE, delete_nan_elements)[TS_VHE <= TSmin]
+                    energy_UL_VHE = np.delete(energy_VHE, delete_nan_elements)[TS_VHE <= TSmin]
+                    energy_UL_VHE_min = np.delete(energy_VHE_min, delete_nan_elements)[TS_VHE <= TSmin]
+                    energy_UL_VHE_max = np.delete(energy_VHE_max, delete_nan_elements)[TS_VHE <= TSmin]
+                    energy_VHE = np.delete(energy_VHE, delete_nan_elements)[TS_VHE > TSmin]
+                    energy_VHE_min = np.delete(energy_VHE_min, delete_nan_elements)[TS_VHE > TSmin]
+                    energy_VHE_max = np.delete(energy_VHE_max, delete_nan_elements)[TS_VHE > TSmin]
+                    e2dnde_VHE = np.delete(e2dnde_VHE, delete_nan_elements)[TS_VHE > TSmin]
+                    e2dnde_err_VHE = np.delete(e2dnde_err_VHE, delete_nan_elements)[TS_VHE > TSmin]
+
+                    x_err_VHE = [energy_VHE - energy_VHE_min, energy_VHE_max - energy_VHE]
+                    x_err_UL_VHE =  [energy_UL_VHE - energy_UL_VHE_min, energy_UL_VHE_max - energy_UL_VHE]
+
+                except:
+                    self.include_VHE = False
+            else:
+                self.include_VHE = False
+
+            if self.include_VHE:
+                Energy_SED = np.concatenate([self.Energy_data_points, energy_VHE])
+                Energy_err_SED = [np.concatenate([self.xerr_data_points[0],x_err_VHE[0]]), np.concatenate([self.xerr_data_points[1],x_err_VHE[1]])]
+                dnde_SED = np.concatenate([self.e2dnde_data_points, e2dnde_VHE]) / (Energy_SED**2)  # y in dnde
+                dnde_err_SED = np.concatenate([self.yerr_data_points, e2dnde_err_VHE]) / (Energy_SED**2)  # yerr in dnde
+                self.Energy_uplims = np.concatenate([self.Energy_uplims, energy_UL_VHE])
+                self.xerr_uplims = [np.concatenate([self.xerr_uplims[0],x_err_UL_VHE[0]]), np.concatenate([self.xerr_uplims[1],x_err_UL_VHE[1]])]
+                self.e2dnde_uplims = np.concatenate([self.e2dnde_uplims, e2dnde_UL_VHE])
+                self.yerr_uplims = np.concatenate([self.yerr_uplims, 0.3*e2dnde_UL_VHE])
+                N_bins_VHE = len(energy_VHE)
+                N_bins_VHE_UL = len(energy_UL_VHE)
+            else:
+                Energy_SED = self.Energy_data_points
+                Energy_err_SED = self.xerr_data_points
+                dnde_SED = self.e2dnde_data_points / (Energy_SED**2)
+                dnde_err_SED = self.yerr_data_points / (Energy_SED**2)
+
+            if self.redshift > 0.0:
+                # Here we compute the EBL absorption model for a given redshift (the tables are read only once and then cached):
+                absorption = ebl.load(self.settings.EBL_model)
+                abs_data = absorption(Energy_SED, self.redshift)
+                dnde_data_points_deabsorbed = dnde_SED/abs_data
+                dnde_error_deabsorbed = dnde_err_SED/abs_data
+
+
+                abs_uplims = absorption(self.Energy_uplims, self.redshift)
+                e2dnde_uplims_deabsorbed = self.e2dnde_uplims/abs_uplims
+                yerr_uplims_deabsorbed = self.yerr_uplims/abs_uplims
+
+                Energy_SED_deabsorbed_log = np.log10(Energy_SED)
+                dnde_data_points_deabsorbed_log = np.log10(dnde_data_points_deabsorbed)
+                dnde_error_deabsorbed_log = (1 / np.log(10)) * (1 / dnde_data_points_deabsorbed) * dnde_error_deabsorbed  # converting the errors to log scale
+
+                # data to be saved later:
+                absorption_all_data = absorption(self.sed['e_ctr'], self.redshift)
+                e2dnde_all_data_unabsorbed = self.sed['e2dnde']/absorption_all_data
+                e2dnde_all_data_errors_unabsorbed = self.sed['e2dnde_err']/absorption_all_data
+                e2dnde_all_ul95_unabsorbed = self.sed['e2dnde_ul95']/absorption_all_data
+            else:
+                Energy_SED_log = np.log10(Energy_SED)
+                dnde_data_points_log = np.log10(dnde_SED)
+                dnde_error_log = (1 / np.log(10)) * (1 / dnde_SED) * dnde_err_SED  # converting the errors to log scale
+
+
+            def plotter(band, x):
+
+                """
+                Function to plot the distribution of possible models around the maximum likelihood model.
+
+                Parameters
+                ----------
+                band: array
+                    E^2dN/dE of the models in the posterior distribution, at the quantiles 2.5%, 16%, 50%, 84% and 97.5% (see sed_models.posterior_band).
+                x: array
+                    the x-axis of the SED to be plotted.
+
+                Returns
+                -------
+                """
+
+                plt.fill_between(10**x, band[0], band[4], color="r", alpha=0.15, linewidth=0, zorder=0, label="95% posterior band")
+                plt.fill_between(10**x, band[1], band[3], color="r", alpha=0.3, linewidth=0, zorder=0, label="68% posterior band")
+                plt.ticklabel_format(style="sci", axis="x", scilimits=(0, 0))
+                plt.xlabel("Energy [MeV]")
+                plt.ylabel("E$^2dN/dE$ [MeV cm$^{-2}$ s$^{-1}$]")
+                plt.grid(linestyle=":")
+                plt.legend()
+
+            # Log10 of the pivot energy of the models that do not fit it (PowerLaw, LogPar, PLEC and PLEC_bfix):
+            Ep = np.log10(self.Emin)
+
+            def spectral_model(theta, x):
+                return sed_models.SPECTRAL_MODELS[MCMC_model](theta, x, Ep)
+
+            if self.redshift > 0.0:
+                log_data = (Energy_SED_deabsorbed_log, dnde_data_points_deabsorbed_log, dnde_error_deabsorbed_log)
+            else:
+                log_data = (Energy_SED_log, dnde_data_points_log, dnde_error_log)
+
+            MCMC_options = {"nwalkers": 300, "niter": 500, "burnin": self.settings.MCMC_burnin, "quick_fit": self.settings.MCMC_quick_fit,
+                            "adaptive": self.settings.MCMC_adaptive, "tau_factor": self.settings.MCMC_tau_factor, "max_steps": self.settings.MCMC_max_steps}
+            if self.settings.MCMC_reuse_chains:
+                MCMC_options["chain_directory"] = self.OutputDir+"MCMC_chains"  # Chains are reused (or extended) when the analysis runs again with the same data
+            if self.settings.MCMC_all_models:
+                # All the models are fitted to the same data in a pool of LC_Ncores processes (the cores chosen for the light curve) and ranked by their AIC:
+                MCMC_fits = sed_models.fit_models(list(sed_models.SPECTRAL_MODELS), *log_data, Ep, processes=min(self.settings.LC_Ncores, len(sed_models.SPECTRAL_MODELS)), **MCMC_options)
+                self.MCMC_ranking = sed_models.aic_ranking(MCMC_fits)
+            else:
+                MCMC_fits = {MCMC_model: sed_models.fit(MCMC_model, *log_data, Ep, **MCMC_options)}
+                self.MCMC_ranking = None
+
+            MCMC_fit = MCMC_fits[MCMC_model]
+            samples = MCMC_fit["samples"]
+            theta_max = MCMC_fit["theta_max"]
+            self.AIC = MCMC_fit["AIC"]
+            self.MCMC_quick_fit = MCMC_fit["quick_fit"]
+            self.MCMC_steps = MCMC_fit["steps"]
+            self.MCMC_burnin = MCMC_fit["burnin"]
+            self.MCMC_converged = MCMC_fit["converged"]
+            self.MCMC_ESS = MCMC_fit["ESS"]
+            self.MCMC_reused_chain = MCMC_fit["reused_chain"]
+
+            # Setting the x limits:
+            xmin = np.log10(Energy_SED[0]-Energy_err_SED[0][0])
+            xmax = np.log10(Energy_SED[-1]+Energy_err_SED[1][-1])
+
+            try:
+                xmin2 = np.log10(self.Energy_uplims[0]-self.xerr_uplims[0][0])
+                if xmin2 < xmin:
+                    xmin = xmin2
+            except:
+                pass
+            try:
+                xmax2 = np.log10(self.Energy_uplims[-1]+self.xerr_uplims[1][-1])
+                if xmax2 > xmax:
+                    xmax = xmax2
+            except:
+                pass
+
+            x = np.linspace(xmin, xmax, 1000)  # defining a high resolution x for the plots
+            band = sed_models.posterior_band(MCMC_model, samples, x, Ep)  # Median and 68%/95% bands of the models in the posterior distribution
+
+            # Saving MCMC parameters and data points corrected for EBL:
+            SED_file = glob.glob(self.OutputDir+"*_sed.fits")[0]
+            hdul = pyfits.open(SED_file)
+            if self.redshift > 0.0:
+                original_data_cols = hdul[1].data.columns
+                new_col_e2dnde_unabsorbed_data = pyfits.Column(name="e2dnde_EBL_corrected",array=e2dnde_all_data_unabsorbed,format="D",unit="cm-2 MeV s-1")
+                new_col_e2dnde_unabsorbed_errors = pyfits.Column(name="e2dnde_err_EBL_corrected",array=e2dnde_all_data_errors_unabsorbed,format="D",unit="cm-2 MeV s-1")
+                new_col_e2dnde_ul95_unabsorbed = pyfits.Column(name="e2dnde_ul95_EBL_corrected",array=e2dnde_all_ul95_unabsorbed,format="D",unit="cm-2 MeV s-1")
+                all_cols = pyfits.BinTableHDU.from_columns(original_data_cols + new_col_e2dnde_unabsorbed_data + new_col_e2dnde_unabsorbed_errors + new_col_e2dnde_ul95_unabsorbed)
+                hdul[1].data = all_cols.data
+                hdul[1].name = "SED"
+
+                if self.settings.VHE.split('.')[-1] == 'fits':
+
+                    VHE_col_energy = VHE["e_ref"] * 1000000  # in MeV
+                    VHE_col_energy = np.delete(VHE_col_energy, delete_nan_elements)
+                    VHE_absorption = absorption(VHE_col_energy, self.redshift)
+                    VHE_col_energy = pyfits.Column(name="energy",array= VHE_col_energy,format="D",unit="MeV")
+
+                    VHE_col_energy_min = VHE["e_min"] * 1000000
+                    VHE_col_energy_min = np.delete(VHE_col_energy_min, delete_nan_elements)
+                    VHE_col_energy_min = pyfits.Column(name="energy_min",array= VHE_col_energy_min,format="D",unit="MeV")
+
+                    VHE_col_energy_max = VHE["e_max"] * 1000000
+                    VHE_col_energy_max = np.delete(VHE_col_energy_max, delete_nan_elements)
+                    VHE_col_energy_max = pyfits.Column(name="energy_max",array= VHE_col_energy_max,format="D",unit="MeV")
+
+                    VHE_col_e2dnde = VHE["e2dnde"] * 1e6  # TeV cm-2 s-1 to MeV cm-2 s-1
+                    VHE_col_e2dnde = np.delete(VHE_col_e2dnde, delete_nan_elements)/VHE_absorption  # Correcting for EBL absorption
+                    VHE_col_e2dnde = pyfits.Column(name="e2dnde_VHE",array= VHE_col_e2dnde,format="D",unit="MeV cm-2 s-1")
+
+                    VHE_col_e2dnde_err = VHE["e2dnde_err"] * 1e6
+                    VHE_col_e2dnde_err = np.delete(VHE_col_e2dnde_err, delete_nan_elements)/VHE_absorption  # Correcting for EBL absorption
+                    VHE_col_e2dnde_err = pyfits.Column(name="e2dnde_VHE_err",array= VHE_col_e2dnde_err,format="D",unit="MeV cm-2 s-1")
+
+                    VHE_col_e2dnde_UL = VHE["e2dnde_ul"] * 1e6
+                    VHE_col_e2dnde_UL = np.delete(VHE_col_e2dnde_UL, delete_nan_elements)/VHE_absorption  # Correcting for EBL absorption
+                    VHE_col_e2dnde_UL = pyfits.Column(name="e2dnde_VHE_UL95",array= VHE_col_e2dnde_UL,format="D",unit="MeV cm-2 s-1")
+
+                    VHE_col_TS = VHE["ts"]
+                    VHE_col_TS = np.delete(VHE_col_TS, delete_nan_elements)
+                    VHE_col_TS = pyfits.Column(name="TS",array= VHE_col_TS,format="D")
+
+                    VHE_table_EBL = pyfits.BinTableHDU.from_columns([VHE_col_energy, VHE_col_energy_min, VHE_col_energy_max, VHE_col_e2dnde, VHE_col_e2dnde_err, VHE_col_e2dnde_UL, VHE_col_TS])
+
+            add_results = open(self.OutputDir+"Target_results.txt","a")
+            add_results.write("\n\nMCMC results:\n")
+            add_results.write("Model: "+MCMC_model+"\n")
+            if self.MCMC_quick_fit:
+                add_results.write("Quick fit: maximum likelihood parameters with Gaussian errors (no MCMC)\n")
+            else:
+                add_results.write(f"Steps per walker: {self.MCMC_steps} (burn-in: {self.MCMC_burnin}")
+                if self.MCMC_converged is not None:
+                    add_results.write(f", converged: {self.MCMC_converged}")
+                add_results.write(")\n")
+                add_results.write("Effective sample size: "+", ".join([f"{ess:.0f}" for ess in self.MCMC_ESS])+" (one value per parameter)\n")
+                if self.MCMC_reused_chain:
+                    add_results.write("Chain reused from a previous run (see the directory MCMC_chains)\n")
+
+            if MCMC_model == "LogPar":
+                best_fit_model = spectral_model(theta_max, x)
+                N0 = np.quantile(samples[:,0],q=[0.16,0.5,0.84])
+                Alpha = np.quantile(samples[:,1],q=[0.16,0.5,0.84])
+                Beta = np.quantile(samples[:,2],q=[0.16,0.5,0.84])
+                add_results.write(f"N0 (log scale): {N0[1]} - {N0[1]-N0[0]} + {N0[2]-N0[1]}\n")
+                add_results.write(f"Alpha: {Alpha[1]} - {Alpha[1]-Alpha[0]} + {Alpha[2]-Alpha[1]}\n")
+                add_results.write(f"Beta: {Beta[1]} - {Beta[1]-Beta[0]} + {Beta[2]-Beta[1]}\n")
+                add_results.write(f"Akaike information criterion: {self.AIC}\n")
+                c1 = np.array(["N0 (log scale)","Alpha","Beta","Ep=Emin (log scale)", "Akaike_IC"])
+                c2 = np.array([N0[1],Alpha[1],Beta[1],np.log10(self.Emin),self.AIC])
+                c3 = np.array([N0[1]-N0[0],Alpha[1]-Alpha[0],Beta[1]-Beta[0],0,0])
+                c4 = np.array([N0[2]-N0[1],Alpha[2]-Alpha[1],Beta[2]-Beta[1],0,0])
+                c1 = pyfits.Column(name='Parameter', array=c1, format='22A')
+                c2 = pyfits.Column(name='Value', array=c2, format='D')
+                c3 = pyfits.Column(name='error_minus', array=c3, format='D')
+                c4 = pyfits.Column(name='error_plus', array=c4, format='D')
+                table_hdu = pyfits.BinTableHDU.from_columns([c1, c2, c3, c4])
+                c1_posterior = pyfits.Column(name='N0 distribution (log scale)', array=samples[:,0], format='D')
+                c2_posterior = pyfits.Column(name='Alpha distribution', array=samples[:,1], format='D')
+                c3_posterior = pyfits.Column(name='Beta distribution', array=samples[:,2], format='D')
+                table_hdu_posterior = pyfits.BinTableHDU.from_columns([c1_posterior, c2_posterior, c3_posterior])
+
+            elif MCMC_model == "LogPar_MTT":
+                best_fit_model = spectral_model(theta_max, x)
+                N0 = np.quantile(samples[:,0],q=[0.16,0.5,0.84])
+                Alpha = np.quantile(samples[:,1],q=[0.16,0.5,0.84])
+                Ep_quantiles = np.quantile(samples[:,2],q=[0.16,0.5,0.84])
+                add_results.write(f"N0 (log scale): {N0[1]} - {N0[1]-N0[0]} + {N0[2]-N0[1]}\n")
+                add_results.write(f"Alpha: {Alpha[1]} - {Alpha[1]-Alpha[0]} + {Alpha[2]-Alpha[1]}\n")
+                add_results.write(f"Ep (log scale): {Ep_quantiles[1]} - {Ep_quantiles[1]-Ep_quantiles[0]} + {Ep_quantiles[2]-Ep_quantiles[1]}\n")
+                add_results.write(f"Akaike information criterion: {self.AIC}\n")
+                c1 = np.array(["N0 (log scale)","Alpha","Ep (log scale)", "Akaike_IC"])
+                c2 = np.array([N0[1],Alpha[1],Ep_quantiles[1],self.AIC])
+                c3 = np.array([N0[1]-N0[0],Alpha[1]-Alpha[0],Ep_quantiles[1]-Ep_quantiles[0],0])
+                c4 = np.array([N0[2]-N0[1],Alpha[2]-Alpha[1],Ep_quantiles[2]-Ep_quantiles[1],0])
+                c1 = pyfits.Column(name='Parameter', array=c1, format='22A')
+                c2 = pyfits.Column(name='Value', array=c2, format='D')
+                c3 = pyfits.Column(name='error_minus', array=c3, format='D')
+                c4 = pyfits.Column(name='error_plus', array=c4, format='D')
+                table_hdu = pyfits.BinTableHDU.from_columns([c1, c2, c3, c4])
+                c1_posterior = pyfits.Column(name='N0 distribution (log scale)', array=samples[:,0], format='D')
+                c2_posterior = pyfits.Column(name='Alpha distribution', array=samples[:,1], format='D')
+                c3_posterior = pyfits.Column(name='Ep distribution', array=samples[:,2], format='D')
+                table_hdu_posterior = pyfits.BinTableHDU.from_columns([c1_posterior, c2_posterior, c3_posterior])
+
+            elif MCMC_model == "PLEC":
+                best_fit_model = spectral_model(theta_max, x)
+                N0 = np.quantile(samples[:,0],q=[0.16,0.5,0.84])
+                Alpha = np.quantile(samples[:,1],q=[0.16,0.5,0.84])
+                Ec = np.quantile(samples[:,2],q=[0.16,0.5,0.84])
+                b = np.quantile(samples[:,3],q=[0.16,0.5,0.84])
+                add_results.write(f"N0 (log scale): {N0[1]} - {N0[1]-N0[0]} + {N0[2]-N0[1]}\n")
+                add_results.write(f"Alpha: {Alpha[1]} - {Alpha[1]-Alpha[0]} + {Alpha[2]-Alpha[1]}\n")
+                add_results.write(f"Ec: {Ec[1]} - {Ec[1]-Ec[0]} + {Ec[2]-Ec[1]}\n")
+                add_results.write(f"b: {b[1]} - {b[1]-b[0]} + {b[2]-b[1]}\n")
+                add_results.write(f"Akaike information criterion: {self.AIC}\n")
+                c1 = np.array(["N0 (log scale)","Alpha","Ec","b","Ep=Emin (log scale)", "Akaike_IC"])
+                c2 = np.array([N0[1],Alpha[1],Ec[1],b[1],np.log10(self.Emin),self.AIC])
+                c3 = np.array([N0[1]-N0[0],Alpha[1]-Alpha[0],Ec[1]-Ec[0],b[1]-b[0],0,0])
+                c4 = np.array([N0[2]-N0[1],Alpha[2]-Alpha[1],Ec[2]-Ec[1],b[2]-b[1],0,0])
+                c1 = pyfits.Column(name='Parameter', array=c1, format='22A')
+                c2 = pyfits.Column(name='Value', array=c2, format='D')
+                c3 = pyfits.Column(name='error_minus', array=c3, format='D')
+                c4 = pyfits.Column(name='error_plus', array=c4, format='D')
+                table_hdu = pyfits.BinTableHDU.from_columns([c1, c2, c3, c4])
+                c1_posterior = pyfits.Column(name='N0 distribution (log scale)', array=samples[:,0], format='D')
+                c2_posterior = pyfits.Column(name='Alpha distribution', array=samples[:,1], format='D')
+                c3_posterior = pyfits.Column(name='Ec distribution', array=samples[:,2], format='D')
+                c4_posterior = pyfits.Column(name='b distribution', array=samples[:,3], format='D')
+                table_hdu_posterior = pyfits.BinTableHDU.from_columns([c1_posterior, c2_posterior, c3_posterior, c4_posterior])
+
+            elif MCMC_model == "PLEC_bfix":
+                best_fit_model = spectral_model(theta_max, x)
+                N0 = np.quantile(samples[:,0],q=[0.16,0.5,0.84])
+                Alpha = np.quantile(samples[:,1],q=[0.16,0.5,0.84])
+                Ec = np.quantile(samples[:,2],q=[0.16,0.5,0.84])
+                add_results.write(f"N0 (log scale): {N0[1]} - {N0[1]-N0[0]} + {N0[2]-N0[1]}\n")
+                add_results.write(f"Alpha: {Alpha[1]} - {Alpha[1]-Alpha[0]} + {Alpha[2]-Alpha[1]}\n")
+                add_results.write(f"Ec: {Ec[1]} - {Ec[1]-Ec[0]} + {Ec[2]-Ec[1]}\n")
+                add_results.write("b: 1\n")
+                add_results.write(f"Akaike information criterion: {self.AIC}\n")
+                c1 = np.array(["N0 (log scale)","Alpha","Ec","b","Ep=Emin (log scale)", "Akaike_IC"])
+                c2 = np.array([N0[1],Alpha[1],Ec[1],1,np.log10(self.Emin),self.AIC])
+                c3 = np.array([N0[1]-N0[0],Alpha[1]-Alpha[0],Ec[1]-Ec[0],0,0,0])
+                c4 = np.array([N0[2]-N0[1],Alpha[2]-Alpha[1],Ec[2]-Ec[1],0,0,0])
+                c1 = pyfits.Column(name='Parameter', array=c1, format='22A')
+                c2 = pyfits.Column(name='Value', array=c2, format='D')
+                c3 = pyfits.Column(name='error_minus', array=c3, format='D')
+                c4 = pyfits.Column(name='error_plus', array=c4, format='D')
+                table_hdu = pyfits.BinTableHDU.from_columns([c1, c2, c3, c4])
+                c1_posterior = pyfits.Column(name='N0 distribution (log scale)', array=samples[:,0], format='D')
+                c2_posterior = pyfits.Column(name='Alpha distribution', array=samples[:,1], format='D')
+                c3_posterior = pyfits.Column(name='Ec distribution', array=samples[:,2], format='D')
+                table_hdu_posterior = pyfits.BinTableHDU.from_columns([c1_posterior, c2_posterior, c3_posterior])
+
+            elif MCMC_model == "PLEC_deMenezes":
+                best_fit_model = spectral_model(theta_max, x)
+                Sp = np.quantile(samples[:,0],q=[0.16,0.5,0.84])
+                Alpha = np.quantile(samples[:,1],q=[0.16,0.5,0.84])
+                Ep_quantiles = np.quantile(samples[:,2],q=[0.16,0.5,0.84])
+                b = np.quantile(samples[:,3],q=[0.16,0.5,0.84])
+                add_results.write(f"Sp (log scale): {Sp[1]} - {Sp[1]-Sp[0]} + {Sp[2]-Sp[1]}\n")
+                add_results.write(f"Alpha: {Alpha[1]} - {Alpha[1]-Alpha[0]} + {Alpha[2]-Alpha[1]}\n")
+                add_results.write(f"Ep: {Ep_quantiles[1]} - {Ep_quantiles[1]-Ep_quantiles[0]} + {Ep_quantiles[2]-Ep_quantiles[1]}\n")
+                add_results.write(f"b: {b[1]} - {b[1]-b[0]} + {b[2]-b[1]}\n")
+                add_results.write(f"Akaike information criterion: {self.AIC}\n")
+                c1 = np.array(["Sp (log scale)","Alpha","Ep","b", "Akaike_IC"])
+                c2 = np.array([Sp[1],Alpha[1],Ep_quantiles[1],b[1],self.AIC])
+                c3 = np.array([Sp[1]-Sp[0],Alpha[1]-Alpha[0],Ep_quantiles[1]-Ep_quantiles[0],b[1]-b[0],0])
+                c4 = np.array([Sp[2]-Sp[1],Alpha[2]-Alpha[1],Ep_quantiles[2]-Ep_quantiles[1],b[2]-b[1],0])
+                c1 = pyfits.Column(name='Parameter', array=c1, format='22A')
+                c2 = pyfits.Column(name='Value', array=c2, format='D')
+                c3 = pyfits.Column(name='error_minus', array=c3, format='D')
+                c4 = pyfits.Column(name='error_plus', array=c4, format='D')
+                table_hdu = pyfits.BinTableHDU.from_columns([c1, c2, c3, c4])
+                c1_posterior = pyfits.Column(name='Sp distribution (log scale)', array=samples[:,0], format='D')
+                c2_posterior = pyfits.Column(name='Alpha distribution', array=samples[:,1], format='D')
+                c3_posterior = pyfits.Column(name='Ep distribution', array=samples[:,2], format='D')
+                c4_posterior = pyfits.Column(name='b distribution', array=samples[:,3], format='D')
+                table_hdu_posterior = pyfits.BinTableHDU.from_columns([c1_posterior, c2_posterior, c3_posterior, c4_posterior])
+
+            elif MCMC_model == "PowerLaw":
+                best_fit_model = spectral_model(theta_max, x)
+                N0 = np.quantile(samples[:,0],q=[0.16,0.5,0.84])
+                Alpha = np.quantile(samples[:,1],q=[0.16,0.5,0.84])
+                add_results.write(f"N0 (log scale): {N0[1]} - {N0[1]-N0[0]} + {N0[2]-N0[1]}\n")
+                add_results.write(f"Alpha: {Alpha[1]} - {Alpha[1]-Alpha[0]} + {Alpha[2]-Alpha[1]}\n")
+                add_results.write(f"Akaike information criterion: {self.AIC}\n")
+                c1 = np.array(["N0 (log scale)","Alpha","Ep=Emin (log scale)", "Akaike_IC"])
+                c2 = np.array([N0[1],Alpha[1],np.log10(self.Emin),self.AIC])
+                c3 = np.array([N0[1]-N0[0],Alpha[1]-Alpha[0],0,0])
+                c4 = np.array([N0[2]-N0[1],Alpha[2]-Alpha[1],0,0])
+                c1 = pyfits.Column(name='Parameter', array=c1, format='22A')
+                c2 = pyfits.Column(name='Value', array=c2, format='D')
+                c3 = pyfits.Column(name='error_minus', array=c3, format='D')
+                c4 = pyfits.Column(name='error_plus', array=c4, format='D')
+                table_hdu = pyfits.BinTableHDU.from_columns([c1, c2, c3, c4])
+                c1_posterior = pyfits.Column(name='N0 distribution (log scale)', array=samples[:,0], format='D')
+                c2_posterior = pyfits.Column(name='Alpha distribution', array=samples[:,1], format='D')
+                table_hdu_posterior = pyfits.BinTableHDU.from_columns([c1_posterior, c2_posterior])
+
+            if self.MCMC_ranking is not None:
+                # Summary of every model and ranking by the Akaike information criterion (lower is better):
+                add_results.write("\nModel ranking (Akaike information criterion):\n")
+                for rank, (name, aic, delta_aic) in enumerate(self.MCMC_ranking):
+                    add_results.write(f"{rank+1}. {name}: AIC = {aic}, Delta AIC = {delta_aic}\n")
+
+                models, parameters, values, errors_minus, errors_plus = [], [], [], [], []
+                for name, aic, delta_aic in self.MCMC_ranking:
+                    quantiles = np.quantile(MCMC_fits[name]["samples"], q=[0.16,0.5,0.84], axis=0)
+                    for n, parameter in enumerate(sed_models.PARAMETER_NAMES[name]):
+                        models.append(name)
+                        parameters.append(parameter)
+                        values.append(quantiles[1][n])
+                        errors_minus.append(quantiles[1][n]-quantiles[0][n])
+                        errors_plus.append(quantiles[2][n]-quantiles[1][n])
+
+                ranking_hdu = pyfits.BinTableHDU.from_columns([pyfits.Column(name='Model', array=np.array([r[0] for r in self.MCMC_ranking]), format='22A'),
+                                                               pyfits.Column(name='N_parameters', array=np.array([len(sed_models.PARAMETER_NAMES[r[0]]) for r in self.MCMC_ranking]), format='K'),
+                                                               pyfits.Column(name='Akaike_IC', array=np.array([r[1] for r in self.MCMC_ranking]), format='D'),
+                                                               pyfits.Column(name='Delta_Akaike_IC', array=np.array([r[2] for r in self.MCMC_ranking]), format='D')])
+                all_models_hdu = pyfits.BinTableHDU.from_columns([pyfits.Column(name='Model', array=np.array(models), format='22A'),
+                                                                  pyfits.Column(name='Parameter', array=np.array(parameters), format='22A'),
+                                                                  pyfits.Column(name='Value', array=np.array(values), format='D'),
+                                                                  pyfits.Column(name='error_minus', array=np.array(errors_minus), format='D'),
+                                                                  pyfits.Column(name='error_plus', array=np.array(errors_plus), format='D')])
+
+            add_results.close()
+            hdul.append(table_hdu)
+            hdul[4].name = "MCMC Parameters"
+            hdul.append(table_hdu_posterior)
+            hdul[5].name = "MCMC Posterior dist."
+            if self.redshift > 0.0 and self.settings.VHE.split('.')[-1] == 'fits':
+                hdul.append(VHE_table_EBL)
+                hdul[6].name = "VHE data corrected for EBL"
+            if self.MCMC_ranking is not None:
+                hdul.append(ranking_hdu)
+                hdul[-1].name = "MCMC Model ranking"
+                hdul.append(all_models_hdu)
+                hdul[-1].name = "MCMC All models"
+
+            band_hdu = pyfits.BinTableHDU.from_columns([pyfits.Column(name='energy', array=10**x, format='D', unit='MeV'),
+                                                        pyfits.Column(name='e2dnde_q025', array=band[0], format='D', unit='MeV cm-2 s-1'),
+                                                        pyfits.Column(name='e2dnde_q16', array=band[1], format='D', unit='MeV cm-2 s-1'),
+                                                        pyfits.Column(name='e2dnde_median', array=band[2], format='D', unit='MeV cm-2 s-1'),
+                                                        pyfits.Column(name='e2dnde_q84', array=band[3], format='D', unit='MeV cm-2 s-1'),
+                                                        pyfits.Column(name='e2dnde_q975', array=band[4], format='D', unit='MeV cm-2 s-1')])
+            hdul.append(band_hdu)
+            hdul[-1].name = "MCMC Model band"
+
+            hdul.writeto(SED_file,overwrite=True)
+            hdul.close()
+
+
+            # Corner plot:
+            labels = sed_models.PARAMETER_NAMES[MCMC_model]
+
+            corner.corner(
+                samples,
+                show_titles=True,
+                labels=labels,
+                plot_datapoints=True,
+                quantiles=[0.16, 0.5, 0.84],
+            )
+
+            save_figure(self.OutputDir+'Quickplot_MCMC_SED_pars.png')
+
+            # SED plot:
+            f = plt.figure(figsize=(6,5),dpi=250)
+            ax = f.add_subplot(1,1,1)
+            ax.xaxis.set_minor_locator(AutoMinorLocator(2))
+            ax.yaxis.set_minor_locator(AutoMinorLocator(2))
+            ax.tick_params(which='major', length=5, direction='in')
+            ax.tick_params(which='minor', length=2.5, direction='in',bottom=True, top=True, left=True, right=True)
+            ax.tick_params(bottom=True, top=True, left=True, right=True)
+            ax.grid(linestyle=':',which='both')
+
+
+            alpha_original_data = 1
+            color_original_data = "C0"
+            color_original_VHE_data = "C1"
+            if self.redshift > 0.0:
+                # Warnings:
+                if self.include_VHE:
+                    self.e2dnde_SED_warning = dnde_data_points_deabsorbed[:-N_bins_VHE][self.few_photons_warning > 0]
+                else:
+                    self.e2dnde_SED_warning = dnde_data_points_deabsorbed[self.few_photons_warning > 0]
+                # Plots:
+                plt.errorbar(Energy_SED, dnde_data_points_deabsorbed*(Energy_SED**2), xerr=Energy_err_SED, yerr=dnde_error_deabsorbed*(Energy_SED**2), color="C0", markeredgecolor="black", ecolor="black", zorder = 130, fmt="o", label="Fermi-LAT EBL corrected")
+                plt.errorbar(self.Energy_uplims, e2dnde_uplims_deabsorbed, xerr=self.xerr_uplims, yerr=yerr_uplims_deabsorbed, uplims=True, color="C0", markeredgecolor="black", ecolor="black", zorder = 130, fmt="o")
+                if len(self.energy_SED_warning) > 0.0:
+                    plt.plot(self.energy_SED_warning,self.e2dnde_SED_warning*(self.energy_SED_warning**2),"mo", zorder = 131,label="Less than 5 photons")
+                if self.include_VHE:
+                    plt.errorbar(Energy_SED[-N_bins_VHE:], dnde_data_points_deabsorbed[-N_bins_VHE:]*(Energy_SED[-N_bins_VHE:]**2), xerr=[Energy_err_SED[0][-N_bins_VHE:], Energy_err_SED[1][-N_bins_VHE:]], yerr=dnde_error_deabsorbed[-N_bins_VHE:]*(Energy_SED[-N_bins_VHE:]**2), color="C1", markeredgecolor="black", ecolor="black", zorder = 130, fmt="o", label="VHE EBL corrected")
+                    plt.errorbar(self.Energy_uplims[-N_bins_VHE_UL:], e2dnde_uplims_deabsorbed[-N_bins_VHE_UL:], xerr=[self.xerr_uplims[0][-N_bins_VHE_UL:], self.xerr_uplims[1][-N_bins_VHE_UL:]], yerr=yerr_uplims_deabsorbed[-N_bins_VHE_UL:], uplims=True, color="C1", markeredgecolor="black", ecolor="black", zorder = 130, fmt="o")
+
+                alpha_original_data = 0.4
+                #color_original_data = "gray"
+                #color_original_VHE_data = "gray"
+
+            plt.errorbar(Energy_SED, dnde_SED*(Energy_SED**2), xerr=Energy_err_SED, yerr=dnde_err_SED*(Energy_SED**2), color=color_original_data, alpha = alpha_original_data, zorder = 120, fmt="o", label="Fermi-LAT")
+            if self.include_VHE:
+                plt.errorbar(Energy_SED[-N_bins_VHE:], dnde_SED[-N_bins_VHE:]*(Energy_SED[-N_bins_VHE:]**2), xerr=[Energy_err_SED[0][-N_bins_VHE:], Energy_err_SED[1][-N_bins_VHE:]], yerr=dnde_err_SED[-N_bins_VHE:]*(Energy_SED[-N_bins_VHE:]**2), color=color_original_VHE_data, alpha = alpha_original_data, zorder = 120, fmt="o", label="VHE instrument")
+            if self.redshift == 0.0:
+                if len(self.energy_SED_warning) > 0.0:
+                    plt.plot(self.energy_SED_warning,self.e2dnde_SED_warning,"mo", zorder = 131,label="Less than 5 photons")
+
+
+            plt.errorbar(self.Energy_uplims, self.e2dnde_uplims, xerr=self.xerr_uplims, yerr=self.yerr_uplims, uplims=True, color=color_original_data, alpha = alpha_original_data, zorder = 120, fmt="o")
+            if self.include_VHE:
+                plt.errorbar(self.Energy_uplims[-N_bins_VHE_UL:], self.e2dnde_uplims[-N_bins_VHE_UL:], xerr=[self.xerr_uplims[0][-N_bins_VHE_UL:], self.xerr_uplims[1][-N_bins_VHE_UL:]], yerr=self.yerr_uplims[-N_bins_VHE_UL:], uplims=True, color=color_original_VHE_data, alpha = alpha_original_data, zorder = 120, fmt="o")
+
+            plotter(band,x)
+
+            plt.plot(self.E, self.dnde*(self.E**2), color="gray",alpha=0.9, zorder = 119, label="Fermipy fit")
+            if MCMC_model == "LogPar_MTT" or MCMC_model == "PLEC_deMenezes":
+                plt.plot(10**x, 10 ** best_fit_model, color="black", zorder = 119, label="Highest Likelihood MCMC")
+            else:
+                plt.plot(10**x, 10 ** (2 * x + best_fit_model), color="black", zorder = 119, label="Highest Likelihood MCMC")
+
+            plt.xscale("log")
+            plt.yscale("log")
+            plt.xlabel("Energy [MeV]")
+            plt.ylabel("E$^2dN/dE$ [MeV cm$^{-2}$ s$^{-1}$]")
+            plt.title(self.sourcename+' - SED - MCMC - '+MCMC_model)
+            plt.grid(which="both", linestyle=":")
+
+            if len(dnde_SED) > 0:
+                ymax = 2*((dnde_SED + dnde_err_SED)*(Energy_SED**2)).max()
+                ymin = 0.5*((dnde_SED - dnde_err_SED)*(Energy_SED**2)).min()
+                if ymax > 4*(dnde_SED*(Energy_SED**2)).max():
+                    ymax = 4*(dnde_SED*(Energy_SED**2)).max()
+
+                if self.redshift > 0.0:
+                    EBL_corrected_max = 2*np.max(dnde_data_points_deabsorbed*(Energy_SED**2) + dnde_error_deabsorbed*(Energy_SED**2))
+                    if EBL_corrected_max > ymax:
+                        ymax = EBL_corrected_max
+
+                if ymin < (dnde_SED*(Energy_SED**2)).min()/5.0:
+                    ymin = (dnde_SED*(Energy_SED**2)).min()/5.0
+
+                if len(self.e2dnde_uplims) > 0:
+                    if self.redshift > 0.0:
+                        yaux = e2dnde_uplims_deabsorbed.max()
+                    else:
+                        yaux = self.e2dnde_uplims.max()
+                    if yaux > ymax:
+                        ymax = 2*yaux
+
+                    yaux = self.e2dnde_uplims.min()
+                    if yaux < ymin:
+                        ymin = 0.5*yaux
+            else:
+                ymax = 2*self.e2dnde_uplims.max()
+                ymin = 0.5*self.e2dnde_uplims.min()
+
+
+            plt.ylim(ymin,ymax)
+            plt.xlim(0.8 * 10**x.min(),1.2 * 10**x.max())
+            plt.legend(fontsize=11)
+            plt.tight_layout()
+            save_figure(self.OutputDir+'Quickplot_SED_MCMC.'+self.settings.output_format)
+
+            if self.settings.redshift_scan:
+                self.compute_redshift_scan(MCMC_model, Energy_SED, dnde_SED, dnde_err_SED)
+
+            if self.settings.EBL_comparison and self.redshift > 0.0:
+                self.compare_EBL_models(MCMC_model, Energy_SED, Energy_err_SED, dnde_SED, dnde_err_SED, MCMC_options, x)
+
+
+    def compare_EBL_models(self, MCMC_model, energy, energy_err, dnde, dnde_err, MCMC_options, x):
+
+        """This function corrects the SED with all the EBL models bundled with easyfermi and applies the MCMC to each corrected SED,
+           with one process per EBL model, so that the systematic uncertainty due to the EBL model can be estimated from a single run.
+
+        Parameters
+        ----------
+        MCMC_model: str
+            Intrinsic spectral model.
+        energy, energy_err, dnde, dnde_err: array
+            SED data points with TS > 9 (energies and their errors in MeV, observed fluxes and errors in cm-2 s-1 MeV-1).
+        MCMC_options: dict
+            Options of the MCMC (see sed_models.fit).
+        x: array
+            Log10 of the energies (MeV) used to plot the models.
+
+        Returns
+        -------
+        EBL_comparison.fits:
+            Table with the SED corrected by each EBL model (extension "EBL corrected SED") and the MCMC parameters obtained
+            with each EBL model (extension "MCMC Parameters"). File is saved in the output directory.
+        Quickplot_EBL_comparison.png or Quickplot_EBL_comparison.pdf:
+            A plot of the corrected SEDs and of the highest likelihood models. File is saved in the output directory.
+        """
+
+        plt = import_pyplot()
+
+        EBL_models = list(ebl.EBL_FILES)
+        absorption = np.array([ebl.load(EBL_model)(energy, self.redshift) for EBL_model in EBL_models])  # Shape (N EBL models, N energies)
+        dnde_deabsorbed = dnde/absorption
+        dnde_err_deabsorbed = dnde_err/absorption
+        log_dnde_err = (1 / np.log(10)) * (1 / dnde) * dnde_err  # The same for all EBL models, since the correction scales fluxes and errors in the same way
+        Ep = np.log10(self.Emin)
+
+        print("Running MCMC for all EBL models...")
+        tasks = [(MCMC_model, np.log10(energy), np.log10(dnde_deabsorbed[i]), log_dnde_err, Ep) for i in range(len(EBL_models))]
+        fits = sed_models.fit_in_pool(tasks, processes=min(self.settings.LC_Ncores, len(EBL_models)), **MCMC_options)  # Uses the cores chosen for the light curve
+
+        # Saving all the corrected SEDs and the MCMC parameters in a single file:
+        n_energies = len(energy)
+        sed_hdu = pyfits.BinTableHDU.from_columns([pyfits.Column(name="EBL_model", array=np.repeat(EBL_models, n_energies), format="20A"),
+                                                   pyfits.Column(name="energy", array=np.tile(energy, len(EBL_models)), format="D", unit="MeV"),
+                                                   pyfits.Column(name="absorption", array=absorption.ravel(), format="D"),
+                                                   pyfits.Column(name="e2dnde_EBL_corrected", array=(dnde_deabsorbed*energy**2).ravel(), format="D", unit="MeV cm-2 s-1"),
+                                                   pyfits.Column(name="e2dnde_err_EBL_corrected", array=(dnde_err_deabsorbed*energy**2).ravel(), format="D", unit="MeV cm-2 s-1")],
+                                                  name="EBL corrected SED")
+        sed_hdu.header["REDSHIFT"] = self.redshift
+
+        add_results = open(self.OutputDir+"Target_results.txt","a")
+        add_results.write("\n\nMCMC results for all EBL models (model: "+MCMC_model+"):\n")
+        names, parameters, values, errors_minus, errors_plus, AICs = [], [], [], [], [], []
+        for EBL_model, fit in zip(EBL_models, fits):
+            quantiles = np.quantile(fit["samples"], q=[0.16,0.5,0.84], axis=0)
+            add_results.write(EBL_model+": ")
+            for n, parameter in enumerate(sed_models.PARAMETER_NAMES[MCMC_model]):
+                names.append(EBL_model)
+                parameters.append(parameter)
+                values.append(quantiles[1][n])
+                errors_minus.append(quantiles[1][n]-quantiles[0][n])
+                errors_plus.append(quantiles[2][n]-quantiles[1][n])
+                AICs.append(fit["AIC"])
+                add_results.write(f"{parameter} = {quantiles[1][n]} - {quantiles[1][n]-quantiles[0][n]} + {quantiles[2][n]-quantiles[1][n]}; ")
+            add_results.write(f"Akaike information criterion = {fit['AIC']}\n")
+        add_results.close()
+
+        parameters_hdu = pyfits.BinTableHDU.from_columns([pyfits.Column(name="EBL_model", array=np.array(names), format="20A"),
+                                                          pyfits.Column(name="Parameter", array=np.array(parameters), format="22A"),
+                                                          pyfits.Column(name="Value", array=np.array(values), format="D"),
+                                                          pyfits.Column(name="error_minus", array=np.array(errors_minus), format="D"),
+                                                          pyfits.Column(name="error_plus", array=np.array(errors_plus), format="D"),
+                                                          pyfits.Column(name="Akaike_IC", array=np.array(AICs), format="D")],
+                                                         name="MCMC Parameters")
+        pyfits.HDUList([pyfits.PrimaryHDU(), sed_hdu, parameters_hdu]).writeto(self.OutputDir+'EBL_comparison.fits', overwrite=True)
+
+        # Overlay plot:
+        plt.figure(figsize=(6,5),dpi=250)
+        plt.errorbar(energy, dnde*energy**2, xerr=energy_err, yerr=dnde_err*energy**2, color="gray", alpha=0.5, fmt="o", label="Observed")
+        for i, (EBL_model, fit) in enumerate(zip(EBL_models, fits)):
+            plt.errorbar(energy, dnde_deabsorbed[i]*energy**2, yerr=dnde_err_deabsorbed[i]*energy**2, color=f"C{i}", markeredgecolor="black", fmt="o", markersize=4, label=EBL_model)
+            model = sed_models.SPECTRAL_MODELS[MCMC_model](fit["theta_max"], x, Ep)
+            if MCMC_model not in sed_models.E2DNDE_MODELS:
+                model = 2*x + model
+            plt.plot(10**x, 10**model, color=f"C{i}")
+        plt.xscale("log")
+        plt.yscale("log")
+        plt.ylim(0.2*np.min(dnde*energy**2), 5*np.max(dnde_deabsorbed*energy**2))
+        plt.xlabel("Energy [MeV]")
+        plt.ylabel("E$^2dN/dE$ [MeV cm$^{-2}$ s$^{-1}$]")
+        plt.title(self.sourcename+' - EBL models - '+MCMC_model)
+        plt.grid(which="both", linestyle=":")
+        plt.legend(fontsize=9)
+        plt.tight_layout()
+        save_figure(self.OutputDir+'Quickplot_EBL_comparison.'+self.settings.output_format)
+
+
+    def compute_redshift_scan(self, MCMC_model, energy, dnde, dnde_err):
+
+        """This function constrains the redshift of the target with the EBL absorption of its SED (Fermi-LAT + VHE data).
+           The SED is corrected for the EBL at all the redshifts of a grid and the intrinsic spectral model is fitted at each
+           redshift, giving a likelihood profile and a 95% upper limit on the redshift.
+
+        Parameters
+        ----------
+        MCMC_model: str
+            Intrinsic spectral model.
+        energy, dnde, dnde_err: array
+            SED data points with TS > 9 (energies in MeV, observed fluxes and errors in cm-2 s-1 MeV-1).
+
+        Returns
+        -------
+        Redshift_scan.fits:
+            Table with the redshift grid, the maximum log-likelihood and -2 Delta log-likelihood at each redshift. File is saved in the output directory.
+        Quickplot_redshift_scan.png or Quickplot_redshift_scan.pdf:
+            A plot of the likelihood profile. File is saved in the output directory.
+        """
+
+        plt = import_pyplot()
+
+        redshifts = np.arange(0.0, self.settings.redshift_scan_max + self.settings.redshift_scan_step/2, self.settings.redshift_scan_step)
+        profile = sed_models.redshift_profile(MCMC_model, energy, dnde, dnde_err, np.log10(self.Emin), ebl.load(self.settings.EBL_model), redshifts)
+        self.z_best = float(profile["z_best"])
+        self.z_ul95 = float(profile["z_ul95"])
+        ts = 2*(np.nanmax(profile["lnL"]) - profile["lnL"]) if np.any(np.isfinite(profile["lnL"])) else profile["lnL"]
+
+        hdu = pyfits.BinTableHDU.from_columns([pyfits.Column(name="redshift", array=redshifts, format="D"),
+                                               pyfits.Column(name="lnL", array=profile["lnL"], format="D"),
+                                               pyfits.Column(name="minus_2_delta_lnL", array=ts, format="D")], name="REDSHIFT_SCAN")
+        hdu.header["MODEL"] = MCMC_model
+        hdu.header["EBL"] = self.settings.EBL_model
+        hdu.header["Z_BEST"] = (self.z_best, "Redshift of the highest likelihood")
+        hdu.header["Z_UL95"] = (self.z_ul95, "95% upper limit on the redshift")
+        hdu.writeto(self.OutputDir+'Redshift_scan.fits', overwrite=True)
+
+        add_results = open(self.OutputDir+"Target_results.txt","a")
+        add_results.write("\n\nRedshift scan ("+MCMC_model+", "+self.settings.EBL_model+"):\n")
+        add_results.write(f"Highest likelihood redshift: {self.z_best}\n")
+        add_results.write(f"Redshift upper limit (95%): {self.z_ul95}\n")
+        add_results.close()
+
+        plt.figure(figsize=(6,4),dpi=250)
+        plt.plot(redshifts, ts, color="black")
+        plt.axhline(2.71, color="gray", linestyle="--", label="95% upper limit")
+        if np.isfinite(self.z_ul95):
+            plt.axvline(self.z_ul95, color="C3", linestyle=":", label=f"z < {self.z_ul95:.3f}")
+        plt.xlabel("Redshift")
+        plt.ylabel(r"$-2\Delta\ln\mathcal{L}$")
+        plt.title(self.sourcename+' - Redshift scan - '+MCMC_model)
+        plt.grid(linestyle=":")
+        plt.legend()
+        plt.tight_layout()
+        save_figure(self.OutputDir+'Quickplot_redshift_scan.'+self.settings.output_format)
+
+
+    def compute_Extension(self):
+
+        """This function searches for extended gamma-ray emission from the target. It can use a disk or a 2D Gaussian model.
+
+        Parameters
+        ----------
+        self: instance of the class Analysis
+            This parameter contains the analysis configuration and the intermediate results.
+
+        Returns
+        -------
+        TARGET_NAME_ext.fits
+            Table containing the extendend emission fit results. File is saved in the output directory.
+        TARGET_NAME_ext.npy:
+            Same as above but in the npy format.
+        Quickplot_extension.png or Quickplot_extension.pdf:
+            A plot for quick visualization of the extension radius. File is saved in the output directory.
+
+        """
+
+        plt = import_pyplot()
+        from matplotlib.ticker import AutoMinorLocator
+
+        output_format = self.settings.output_format
+
+        #Extension:
+        if self.settings.extension:
+            self.gta.config['extension']['width_min'] = 0.01
+            if self.settings.Disk:
+                exten = self.gta.extension(self.sourcename,width=np.linspace(0.01,self.settings.max_size,20).tolist(), spatial_model='RadialDisk')
+            else:
+                exten = self.gta.extension(self.sourcename,width=np.linspace(0.01,self.settings.max_size,20).tolist(), spatial_model='RadialGaussian')
+
+            self.gta.write_roi(self.sourcename+'_extension')
+            f = plt.figure(figsize=(6,5),dpi=250)
+            ax = f.add_subplot(1,1,1)
+            ax.xaxis.set_minor_locator(AutoMinorLocator(2))
+            ax.yaxis.set_minor_locator(AutoMinorLocator(2))
+            ax.tick_params(which='major', length=5, direction='in')
+            ax.tick_params(which='minor', length=2.5, direction='in',bottom=True, top=True, left=True, right=True)
+            ax.tick_params(bottom=True, top=True, left=True, right=True)
+            ax.grid(linestyle=':',which='both')
+
+            plt.plot(exten['width'],exten['dloglike'],marker='o', markeredgecolor='black')
+            plt.grid(linestyle=':',which='both')
+            plt.gca().set_xlabel('Radius [$^{\circ}$]')
+            plt.gca().set_ylabel('Delta Log-Likelihood')
+            plt.gca().axvline(exten['ext'], color='black', label='Extension radius')
+            plt.gca().axvspan(exten['ext']-exten['ext_err_lo'],exten['ext']+exten['ext_err_hi'], alpha=0.2,color='b')
+
+            plt.annotate(' TS$_{\mathrm{ext}}$ = %.2f\n R$_{68}$ = %.3f $\pm$ %.3f'%
+                (exten['ts_ext'],exten['ext'],exten['ext_err']),xy=(0.05,0.05),xycoords='axes fraction')
+            plt.gca().legend(frameon=False)
+            plt.title(self.sourcename+' - Extension')
+            plt.tight_layout()
+            save_figure(self.OutputDir+'Quickplot_extension.'+output_format)
+
+
+    def compute_LC(self):
+
+        """
+        This function calls fermipy to compute the target light curve (under request by the user).
+
+        Parameters
+        ----------
+        self: instance of the class Analysis
+            This parameter contains the analysis configuration and the intermediate results.
+
+        Returns
+        -------
+        TARGET_NAME_lightcurve.fits and TARGET_NAME_lightcurve.npy:
+            Data files with all the information regarding the energy-flux and photon-flux light curves.
+
+        """
+
+        self.Compute_LC = True
+
+        if os.path.exists(self.OutputDir+"Light_curve_001"):
+            last_LC_directory = np.sort(glob.glob(self.OutputDir+"Light_curve_*"))[-1]
+            last_number_of_bins = np.sort(glob.glob(last_LC_directory+"/lightcurve_*"))
+            if len(last_number_of_bins) == self.settings.LC_Nbins:
+                self.Compute_LC = False
+
+
+
+        if self.settings.LC and self.Compute_LC:
+            #Running the LC in parallel cores is possible only in Linux systems:
+            if OS_name != "Darwin":
+                self.gta.lightcurve(self.sourcename, nbins=self.settings.LC_Nbins, free_radius=self.freeradius,use_local_ltcube=True, use_scaled_srcmap=True, free_params=['norm','shape'], shape_ts_threshold=9, multithread=True, nthread=self.settings.LC_Ncores)
+            else:
+                self.gta.lightcurve(self.sourcename, nbins=self.settings.LC_Nbins, free_radius=self.freeradius,use_local_ltcube=True, use_scaled_srcmap=True, free_params=['norm','shape'], shape_ts_threshold=9, multithread=False)
+
+            if not os.path.exists(self.OutputDir+"Light_curve_001"):
+                os.mkdir(self.OutputDir+"Light_curve_001")
+                os.system(f"mv {self.OutputDir}*lightcurve* {self.OutputDir}Light_curve_001")
+            else:
+                last_LC = int(np.sort(glob.glob(self.OutputDir+"Light_curve_*"))[-1].split("_")[-1]) + 1  # Taking the number corresponding to the last light curve computed and adding 1
+                last_LC = "{:03d}".format(last_LC)
+                os.mkdir(self.OutputDir+f"Light_curve_{last_LC}")
+                os.system(f"mv {self.OutputDir}*lightcurve* {self.OutputDir}Light_curve_{last_LC}")
+
+
+    def compute_LC_adaptive(self):
+
+        """
+        This function calls fermipy to compute the target light curve with adaptive binning.
+
+        Parameters
+        ----------
+        self: instance of the class Analysis
+            This parameter contains the analysis configuration and the intermediate results.
+
+        Returns
+        -------
+        Adaptive-binning_lightcurve.fits:
+            Data file with all the information regarding the energy-flux and photon-flux adaptive-binning light curves.
+
+        """
+
+        from fermipy.gtanalysis import GTAnalysis
+
+
+        if self.settings.adaptive_binning and self.settings.LC:
+            try:
+                TS_Threshold = float(self.settings.TS_threshold)
+                if TS_Threshold > 0.0:
+                    self.adaptive = True
+            except:
+                print("Invalid TS threshold value.")
+        else:
+            self.adaptive = False
+
+
+        if self.adaptive:
+
+            Adaptive_binning_LC_tables = {}
+
+            if os.path.exists(self.OutputDir+"Adaptive-binning_light_curve_001"):
+                last_LC_directory = np.sort(glob.glob(self.OutputDir+"Adaptive-binning_light_curve_*"))[-1]
+            else:
+                last_LC_directory = np.sort(glob.glob(self.OutputDir+"Light_curve_*"))[-1]
+
+            last_LC_bins_directories = np.sort(glob.glob(last_LC_directory+"/lightcurve_*"))
+
+            LC_last_data_file = glob.glob(last_LC_directory+"/*_lightcurve.fits")[0]
+            hdul = pyfits.open(LC_last_data_file)
+            TS_at_each_time_bin = hdul[1].data["ts"]
+            High_TS_bins = np.where(TS_at_each_time_bin > 2*TS_Threshold)[0]
+            if len(High_TS_bins) > 0:
+                for high_TS_index in High_TS_bins:
+                    number_of_subBins = int(TS_at_each_time_bin[high_TS_index]/TS_Threshold)
+                    if number_of_subBins > 1:
+                        os.chdir(last_LC_bins_directories[high_TS_index])  # Here we enter in the directory of each LC bin with TS > 2*TS_Threshold
+                        stream = open("./config.yaml", 'r')
+                        data = yaml.load(stream,Loader)
+                        data["fileio"]["workdir"] = "./"
+                        data["fileio"]["outdir"] = "./Output"
+                        data["fileio"]["logfile"] = "./Output"
+                        data["components"][0]["gtlike"]["srcmap_base"] = "./srcmap_00.fits"
+                        data["components"][0]["gtlike"]["bexpmap_roi_base"] = "./bexpmap_roi_00.fits"
+                        data["components"][0]["gtlike"]["bexpmap_base"] = "./bexpmap_00.fits"
+                        data["components"][0]["data"]["evfile"] = "./ft1_00.fits"
+                        with open("./config.yaml", 'w') as yaml_file:
+                            yaml_file.write( yaml.dump(data, default_flow_style=False))
+
+                        gta = GTAnalysis("./config.yaml",logging={'verbosity': 3})
+                        gta.setup()
+                        if OS_name != "Darwin":
+                            gta.lightcurve(self.sourcename, nbins=number_of_subBins, free_radius=self.roiwidth/2,use_local_ltcube=True,
+                                                     use_scaled_srcmap=True, free_params=['norm','shape'], shape_ts_threshold=9, multithread=True, nthread=self.settings.LC_Ncores)
+                        else:
+                            gta.lightcurve(self.sourcename, nbins=number_of_subBins, free_radius=self.roiwidth/2,use_local_ltcube=True, use_scaled_srcmap=True, free_params=['norm','shape'], shape_ts_threshold=9, multithread=False)
+
+                        os.chdir(Working_directory)
+
+                # Here we copy/move the adaptive bins to the Adaptive-binning_light_curve directory, leaving a copy of the standard LC files in the Light_curve_XXX directory.
+                if not os.path.exists(self.OutputDir+"Adaptive-binning_light_curve_001"):
+                    os.mkdir(self.OutputDir+"Adaptive-binning_light_curve_001")
+                    last_adaptive_LC = "{:03d}".format(1)
+                    for n,new_lc_bins in enumerate(last_LC_bins_directories):
+                        if n in High_TS_bins:
+                            os.system(f"mv {new_lc_bins}/Output/lightcurve_* {self.OutputDir}Adaptive-binning_light_curve_001")
+                            local_lc_table = glob.glob(f"{new_lc_bins}/Output/*_lightcurve.fits")[0]
+                            Adaptive_binning_LC_tables[n] = Table.read(local_lc_table,format="fits", hdu=1)
+                        else:
+                            os.system(f"cp -r {new_lc_bins} {self.OutputDir}Adaptive-binning_light_curve_001")
+                            local_lc_table = glob.glob(f"{last_LC_directory}/*_lightcurve.fits")[0]
+                            Adaptive_binning_LC_tables[n] = Table.read(local_lc_table,format="fits", hdu=1)[n]
+                else:
+                    last_adaptive_LC = int(np.sort(glob.glob(self.OutputDir+"Adaptive-binning_light_curve_*"))[-1].split("_")[-1]) + 1  # Taking the number corresponding to the last adaptive binning light curve computed and adding 1
+                    last_adaptive_LC = "{:03d}".format(last_adaptive_LC)
+                    os.mkdir(self.OutputDir+f"Adaptive-binning_light_curve_{last_adaptive_LC}")
+                    for n,new_lc_bins in enumerate(last_LC_bins_directories):
+                        if n in High_TS_bins:
+                            os.system(f"mv {new_lc_bins}/Output/lightcurve_* {self.OutputDir}Adaptive-binning_light_curve_{last_adaptive_LC}")
+                            local_lc_table = glob.glob(f"{new_lc_bins}/Output/*_lightcurve.fits")[0]
+                            Adaptive_binning_LC_tables[n] = Table.read(local_lc_table,format="fits", hdu=1)
+                        else:
+                            os.system(f"mv {new_lc_bins} {self.OutputDir}Adaptive-binning_light_curve_{last_adaptive_LC}")
+                            local_lc_table = glob.glob(f"{last_LC_directory}/*_lightcurve.fits")[0]
+                            Adaptive_binning_LC_tables[n] = Table.read(local_lc_table,format="fits", hdu=1)[n]
+
+
+                # Saving the final table with the adaptive-binning LC:
+                final_table = Adaptive_binning_LC_tables[0]
+                for n in range((len(Adaptive_binning_LC_tables) - 1)):
+                    final_table = vstack([final_table,Adaptive_binning_LC_tables[n+1]])
+
+                final_table
+                final_table.write(f"{self.OutputDir}Adaptive-binning_light_curve_{last_adaptive_LC}/Adaptive-binning_lightcurve.fits", format="fits",overwrite=True)
+
+
+
+            else:
+                print(f"No time bins with TS > 2x{TS_Threshold}. Current iteration of adaptive binning LC was not performed.")
+
+
+    def plot_LCs(self,adaptive):
+
+        """
+        This function plots the latest light curves computed.
+
+        Parameters
+        ----------
+        self: instance of the class Analysis
+            This parameter contains the analysis configuration and the intermediate results.
+
+        Returns
+        -------
+        Quickplot_adaptive_LC.pdf and Quickplot_adaptive_eLC.pdf:
+            Plots showing the flux light curve and the energy flux light curve. File is saved in the output directory.
+
+
+        """
+
+        plt = import_pyplot()
+        from matplotlib.ticker import AutoMinorLocator
+        from scipy import interpolate
+
+        # Checking if there is something to plot:
+        if adaptive:
+            if os.path.exists(self.OutputDir+"Adaptive-binning_light_curve_001"):
+                last_LC_directory = np.sort(glob.glob(self.OutputDir+"Adaptive-binning_light_curve_*"))[-1]
+                we_can_plot = True
+            else:
+                we_can_plot = False
+        else:
+            if os.path.exists(self.OutputDir+"Light_curve_001"):
+                last_LC_directory = np.sort(glob.glob(self.OutputDir+"Light_curve_*"))[-1]
+                we_can_plot = True
+            else:
+                we_can_plot = False
+
+
+        # Reading the data and plotting:
+        if we_can_plot and self.settings.LC:
+
+            TSmin = 9
+            output_format = self.settings.output_format
+
+            LC_last_data_file = glob.glob(last_LC_directory+"/*_lightcurve.fits")[0]
+            hdul = pyfits.open(LC_last_data_file)
+            lc = hdul[1].data
+
+            ################################################
+            ########## LC energy flux
+            ################################################
+            f = plt.figure(figsize=(9,4),dpi=250)
+            ax = f.add_subplot(1,1,1)
+            ax.xaxis.set_minor_locator(AutoMinorLocator(2))
+            ax.yaxis.set_minor_locator(AutoMinorLocator(2))
+            ax.tick_params(which='major', length=5, direction='in')
+            ax.tick_params(which='minor', length=2.5, direction='in',bottom=True, top=True, left=True, right=True)
+            ax.tick_params(bottom=True, top=True, left=True, right=True)
+            ax.grid(linestyle=':',which='both')
+
+
+            if len(lc['eflux'][lc['ts']>TSmin]) > 0:
+                scale = int(np.log10(lc['eflux'][lc['ts']>TSmin].max())) -2
+            else:
+                scale = int(np.log10(lc['eflux_ul95'].max())) -2
+
+            tmean = (lc['tmin_mjd'] + lc['tmax_mjd'])/2
+
+
+            if len(tmean[lc['ts']>TSmin]) > 9:
+                time_continuum = np.linspace(np.min(lc['tmin_mjd']),np.max(lc['tmax_mjd']),10*len(lc['tmin_mjd']))
+                tck_eflux = interpolate.splrep(tmean[lc['ts']>TSmin], (10**-scale)*lc['eflux'][lc['ts']>TSmin], k=3)
+                tck_eflux_error = interpolate.splrep(tmean[lc['ts']>TSmin], (10**-scale)*lc['eflux_err'][lc['ts']>TSmin],k=3)
+
+                eflux_continuum = interpolate.splev(time_continuum, tck_eflux)
+                eflux_continuum_err = interpolate.splev(time_continuum, tck_eflux_error)
+                ax.plot(time_continuum,eflux_continuum,color="C1", label="Spline")
+
+                # Saving Spline
+                col_time = pyfits.Column(name="time [MJD]",array=time_continuum,format="D",unit="MJD")
+                col_eflux = pyfits.Column(name="eflux_continuum",array=eflux_continuum,format="D",unit="10^"+str(scale)+" MeV cm-2 s-1")
+                col_eflux_err = pyfits.Column(name="eflux_err_continuum",array=eflux_continuum_err,format="D",unit="10^"+str(scale)+" MeV cm-2 s-1")
+
+            plt.errorbar(tmean[lc['ts']>TSmin], (10**-scale)*lc['eflux'][lc['ts']>TSmin], xerr = [ tmean[lc['ts']>TSmin]- lc['tmin_mjd'][lc['ts']>TSmin], lc['tmax_mjd'][lc['ts']>TSmin] - tmean[lc['ts']>TSmin] ], yerr=(10**-scale)*lc['eflux_err'][lc['ts']>TSmin], markeredgecolor='black', fmt='o', capsize=4)
+            plt.errorbar(tmean[lc['ts']<=TSmin], (10**-scale)*lc['eflux_ul95'][lc['ts']<=TSmin], xerr = [ tmean[lc['ts']<=TSmin]- lc['tmin_mjd'][lc['ts']<=TSmin], lc['tmax_mjd'][lc['ts']<=TSmin] - tmean[lc['ts']<=TSmin] ], yerr=5*np.ones(len(lc['eflux_err'][lc['ts']<=TSmin])), markeredgecolor='black', fmt='o', uplims=True, color='orange', capsize=4)
+            plt.ylabel(r'Energy flux [$10^{'+str(scale)+'}$ MeV cm$^{-2}$ s$^{-1}$]')
+            plt.xlabel('Time [MJD]')
+            plt.title(self.sourcename+' - Energy light curve (free shape)')
+
+
+            if len(lc['eflux'][lc['ts']>TSmin]) > 0:
+                y0 = (lc['eflux'][lc['ts']>TSmin]).max()
+                y1 = (lc['eflux'][lc['ts']>TSmin] + lc['eflux_err'][lc['ts']>TSmin]).max()
+                if y1 > 4*y0:
+                    y1 = 4*y0
+
+                if len(lc['eflux_ul95'][lc['ts']<=TSmin]) > 0:
+                    y2 = (lc['eflux_ul95'][lc['ts']<=TSmin]).max()
+                    if y2 > y1:
+                        y1 = y2
+
+            else:
+                y1 = (lc['eflux_ul95'][lc['ts']<=TSmin]).max()
+
+            ymin = -(10**-scale)*0.1*y1
+            plt.ylim(ymin,(10**-scale)*1.1*y1)
+            plt.legend()
+            if adaptive:
+                save_figure(self.OutputDir+f'Quickplot_adaptive-binning_eLC_{len(lc["ts"])}_bins.'+output_format)
+            else:
+                save_figure(self.OutputDir+f'Quickplot_eLC_{len(lc["ts"])}_bins.'+output_format)
+
+
+            ################################################
+            ########## LC photon flux
+            ################################################
+            f = plt.figure(figsize=(9,4),dpi=250)
+            ax = f.add_subplot(1,1,1)
+            ax.xaxis.set_minor_locator(AutoMinorLocator(2))
+            ax.yaxis.set_minor_locator(AutoMinorLocator(2))
+            ax.tick_params(which='major', length=5, direction='in')
+            ax.tick_params(which='minor', length=2.5, direction='in',bottom=True, top=True, left=True, right=True)
+            ax.tick_params(bottom=True, top=True, left=True, right=True)
+            ax.grid(linestyle=':',which='both')
+
+            if len(lc['flux'][lc['ts']>TSmin]) > 0:
+                scale = int(np.log10(lc['flux'][lc['ts']>TSmin].max())) -2
+            else:
+                scale = int(np.log10(lc['flux_ul95'].max())) -2
+
+            if len(tmean[lc['ts']>TSmin]) > 9:
+                tck_flux = interpolate.splrep(tmean[lc['ts']>TSmin], (10**-scale)*lc['flux'][lc['ts']>TSmin], k=3)
+                tck_flux_error = interpolate.splrep(tmean[lc['ts']>TSmin], (10**-scale)*lc['flux_err'][lc['ts']>TSmin],k=3)
+
+                flux_continuum = interpolate.splev(time_continuum, tck_flux)
+                flux_continuum_err = interpolate.splev(time_continuum, tck_flux_error)
+                ax.plot(time_continuum,flux_continuum,color="C1", label="Spline")
+
+                col_flux = pyfits.Column(name="flux_continuum",array=flux_continuum,format="D",unit="10^"+str(scale)+" ph cm-2 s-1")
+                col_flux_err = pyfits.Column(name="flux_err_continuum",array=flux_continuum_err,format="D",unit="10^"+str(scale)+" ph cm-2 s-1")
+                all_cols = pyfits.BinTableHDU.from_columns([col_time, col_eflux, col_eflux_err, col_flux, col_flux_err])
+                if len(hdul) < 3:
+                    hdul.append(all_cols)
+                    hdul[2].name = "LC spline data"
+                    hdul.writeto(LC_last_data_file,overwrite=True)
+                    hdul.close()
+
+
+            plt.errorbar(tmean[lc['ts']>TSmin], (10**-scale)*lc['flux'][lc['ts']>TSmin], xerr = [ tmean[lc['ts']>TSmin]- lc['tmin_mjd'][lc['ts']>TSmin], lc['tmax_mjd'][lc['ts']>TSmin] - tmean[lc['ts']>TSmin] ], yerr=(10**-scale)*lc['flux_err'][lc['ts']>TSmin], markeredgecolor='black', fmt='o', capsize=4)
+            plt.errorbar(tmean[lc['ts']<=TSmin], (10**-scale)*lc['flux_ul95'][lc['ts']<=TSmin], xerr = [ tmean[lc['ts']<=TSmin]- lc['tmin_mjd'][lc['ts']<=TSmin], lc['tmax_mjd'][lc['ts']<=TSmin] - tmean[lc['ts']<=TSmin] ], yerr=5*np.ones(len(lc['flux_err'][lc['ts']<=TSmin])), markeredgecolor='black', fmt='o', uplims=True, color='orange', capsize=4)
+            plt.ylabel(r'Flux [$10^{'+str(scale)+'}$ cm$^{-2}$ s$^{-1}$]')
+            plt.xlabel('Time [MJD]')
+            plt.title(self.sourcename+' - Light curve (free shape)')
+
+
+            if len(lc['flux'][lc['ts']>TSmin]) > 0:
+                y0 = (lc['flux'][lc['ts']>TSmin]).max()
+                y1 = (lc['flux'][lc['ts']>TSmin] + lc['flux_err'][lc['ts']>TSmin]).max()
+                if y1 > 4*y0:
+                    y1 = 4*y0
+
+                if len(lc['flux_ul95'][lc['ts']<=TSmin]) > 0:
+                    y2 = (lc['flux_ul95'][lc['ts']<=TSmin]).max()
+                    if y2 > y1:
+                        y1 = y2
+
+            else:
+                y1 = (lc['flux_ul95'][lc['ts']<=TSmin]).max()
+
+            ymin = -(10**-scale)*0.1*y1
+            plt.ylim(ymin,(10**-scale)*1.1*y1)
+            plt.legend()
+
+            if adaptive:
+                save_figure(self.OutputDir+f'Quickplot_adaptive-binning_LC_{len(lc["ts"])}_bins.'+output_format)
+            else:
+                save_figure(self.OutputDir+f'Quickplot_LC_{len(lc["ts"])}_bins.'+output_format)
+
@@ -0,0 +1,370 @@
+"""
+Batch analysis of many targets without the graphical interface.
+
+The command "easyfermi-batch" runs the full easyfermi analysis (the same steps of the "Go!" button) for every
+target of a table or for every yaml file of a directory, using a bounded number of processes. Each target gets
+its own output directory and log file, and a summary table with the main results is saved when all targets are done.
+
+Examples
+--------
+Analysis of a list of blazars, with 4 targets running at the same time, 2 cores and at most 8 GB of memory per target:
+
+    easyfermi-batch blazars.csv --base-config GUI_status.yaml --output ./Blazars --workers 4 --cores-per-target 2 --memory-limit 8
+
+where "blazars.csv" has a column "name" and, optionally, the columns "ra" and "dec" (in degrees) or any other
+key of GUI_status.yaml (e.g. "redshift_value"). Without "ra" and "dec", the coordinates are recovered from Simbad.
+"""
+
+import os
+import sys
+import glob
+import time
+import queue
+import argparse
+import multiprocessing
+import traceback
+from pathlib import Path
+import numpy as np
+import yaml
+from yaml import Loader
+from astropy.table import Table
+from .settings import AnalysisSettings, load_settings
+
+
+SUMMARY_COLUMNS = ["target", "status", "elapsed_time", "OutputDir", "fitquality", "ts", "flux", "flux_err",
+                   "eflux", "eflux_err", "flux_ul95", "eflux_ul95", "redshift_ul95", "error"]
+
+
+def safe_name(name):
+
+    """
+    Converts a target name to a string that can be used as a directory name, e.g. "PKS 2155-304" -> "PKS_2155-304".
+    """
+
+    return "".join(c if (c.isalnum() or c in "-_.+") else "_" for c in str(name).strip())
+
+
+def output_directory(output, name, used):
+
+    """
+    Returns the output directory of a target, adding a suffix (e.g. "PKS_2155-304_2") if another target of the batch
+    already uses the same directory, so that no target overwrites the results or the log of another one.
+
+    Parameters
+    ----------
+    output: str
+        Parent directory of the output directories of the targets.
+    name: str
+        Target name.
+    used: set
+        Directory names already taken in this batch. The returned name is added to it.
+    """
+
+    directory = safe_name(name)
+    n = 2
+    while directory.lower() in used:  # lower(): case-insensitive file systems
+        directory = f"{safe_name(name)}_{n}"
+        n += 1
+    used.add(directory.lower())
+
+    return str(Path(output) / directory)
+
+
+def targets_from_table(path, base_config, output):
+
+    """
+    Reads a table of targets and builds one configuration per row.
+
+    Parameters
+    ----------
+    path: str
+        Any table readable by astropy (csv, ecsv, fits etc). It must have a column "name" (or "nickname") and may have
+        the columns "ra" and "dec" in degrees. Any other column named as a key of GUI_status.yaml overrides the base configuration.
+    base_config: dict
+        Configuration shared by all targets.
+    output: str
+        Parent directory of the output directories of the targets.
+
+    Returns
+    -------
+    targets: list
+        List of tuples (target name, configuration dictionary).
+    """
+
+    table = Table.read(path, format="ascii") if Path(path).suffix in [".csv", ".txt", ".dat"] else Table.read(path)
+    colnames = {c.lower(): c for c in table.colnames}
+    if "name" in colnames:
+        name_column = colnames["name"]
+    elif "nickname" in colnames:
+        name_column = colnames["nickname"]
+    else:
+        raise ValueError(f"The table {path} must have a column named 'name'.")
+
+    keys = set(AnalysisSettings().to_dict())
+    targets = []
+    used = set()
+    for row in table:
+        name = str(row[name_column]).strip()
+        config = dict(base_config)
+        for column in table.colnames:
+            if column in keys:
+                config[column] = row[column].item() if isinstance(row[column], np.generic) else row[column]
+
+        if "ra" in colnames and "dec" in colnames:
+            config["Coords"] = f"{float(row[colnames['ra']])}, {float(row[colnames['dec']])}"
+        elif "Coords" not in table.colnames:
+            config["Coords"] = name  # Coordinates recovered from Simbad
+
+        config["Standard"] = True
+        config["nickname"] = name
+        config["output"] = output_directory(output, name, used)
+        targets.append((name, config))
+
+    return targets
+
+
+def targets_from_directory(path, base_config, output):
+
+    """
+    Builds one configuration per yaml file found in a directory.
+
+    A yaml file with the keys of GUI_status.yaml is used as the configuration of the target.
+    Any other yaml file is taken as a fermipy configuration file (i.e. as in the "Custom" mode of the graphical interface).
+    The target name is the name of the file without extension.
+
+    Returns
+    -------
+    targets: list
+        List of tuples (target name, configuration dictionary).
+    """
+
+    keys = set(AnalysisSettings().to_dict())
+    targets = []
+    used = set()
+    for yaml_file in sorted(glob.glob(os.path.join(path, "*.yaml")) + glob.glob(os.path.join(path, "*.yml"))):
+        name = Path(yaml_file).stem
+        with open(yaml_file, 'r') as stream:
+            content = yaml.load(stream, Loader) or {}
+
+        config = dict(base_config)
+        if set(content) <= keys:
+            config.update(content)
+        else:
+            config["Standard"] = False
+            config["configfile"] = str(Path(yaml_file).resolve())
+
+        config["output"] = output_directory(output, name, used)
+        targets.append((name, config))
+
+    return targets
+
+
+def limit_resources(cores_per_target, memory_limit):
+
+    """
+    Called at the start of the process of each target. It limits the number of threads used by the numerical libraries
+    and the memory (in GB) available to each target.
+    """
+
+    if cores_per_target is not None:
+        for variable in ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS"]:
+            os.environ[variable] = str(cores_per_target)
+
+    if memory_limit is not None:
+        try:
+            import resource
+            limit = int(memory_limit * 1024**3)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            print("The memory limit is not supported on this system and will be ignored.")
+
+
+def run_target(target):
+
+    """
+    Runs the full easyfermi analysis for one target. This function is executed inside the process of the target (see target_process).
+
+    Parameters
+    ----------
+    target: tuple
+        Target name, configuration dictionary and resume flag (see Analysis.run).
+
+    Returns
+    -------
+    summary: dict
+        One row of the summary table.
+    """
+
+    name, config, resume = target
+    summary = {"target": name, "status": "failed", "OutputDir": config["output"], "error": ""}
+    start = time.time()
+
+    os.makedirs(config["output"], exist_ok=True)
+    log = open(os.path.join(config["output"], "easyfermi_batch.log"), "w")
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.dup2(log.fileno(), 1)  # The output of fermipy and of the Fermitools is saved in the log file of the target
+    os.dup2(log.fileno(), 2)
+
+    try:
+        from .analysis import Analysis
+        analysis = Analysis(config)
+        results = analysis.run(resume=resume)
+        summary.update(results)
+        summary["status"] = "done"
+    except MemoryError:
+        summary["error"] = "Memory limit exceeded"
+    except Exception as error:
+        summary["error"] = f"{type(error).__name__}: {error}"
+        traceback.print_exc()
+    finally:
+        summary["elapsed_time"] = time.time() - start
+        sys.stdout.flush()
+        sys.stderr.flush()
+        log.close()
+
+    return summary
+
+
+def target_process(index, target, cores_per_target, memory_limit, results):
+
+    """
+    Entry point of the process of one target: limits its resources, runs the analysis and sends (index, summary) to the queue results.
+    """
+
+    limit_resources(cores_per_target, memory_limit)
+    results.put((index, run_target(target)))
+
+
+def summary_table(summaries):
+
+    """
+    Converts the list of summaries returned by run_target() into an astropy Table.
+    """
+
+    rows = []
+    for summary in summaries:
+        rows.append([summary.get(column, np.nan if column not in ["target", "status", "OutputDir", "error"] else "") for column in SUMMARY_COLUMNS])
+
+    table = Table(rows=rows, names=SUMMARY_COLUMNS) if len(rows) > 0 else Table(names=SUMMARY_COLUMNS)
+    table["elapsed_time"].unit = "s"
+    table["flux"].unit = "cm-2 s-1"
+    table["flux_err"].unit = "cm-2 s-1"
+    table["eflux"].unit = "MeV cm-2 s-1"
+    table["eflux_err"].unit = "MeV cm-2 s-1"
+    table["flux_ul95"].unit = "cm-2 s-1"
+    table["eflux_ul95"].unit = "MeV cm-2 s-1"
+
+    return table
+
+
+def run_batch(targets, workers=1, cores_per_target=None, memory_limit=None, resume=False):
+
+    """
+    Runs the analysis of a list of targets in a bounded number of processes.
+
+    Every target runs in a fresh process, so the memory used by one target is released before the next one starts.
+    The processes are not daemonic (as the workers of multiprocessing.Pool would be), because fermipy starts its own pools
+    of processes (e.g. in find_sources, tsmap and lightcurve with multithread=True).
+
+    Parameters
+    ----------
+    targets: list
+        List of tuples (target name, configuration dictionary), as returned by targets_from_table() or targets_from_directory().
+    workers: int
+        Maximum number of targets analyzed at the same time.
+    cores_per_target (optional): int
+        Number of cores used by each target. It also sets the number of cores used to compute the light curves.
+    memory_limit (optional): float
+        Maximum memory (in GB) used by each target.
+    resume (optional): bool
+        If True, targets interrupted in a previous batch continue from their last completed step.
+
+    Returns
+    -------
+    summary: astropy Table
+        One row per target, with the status of the analysis and its main results.
+    """
+
+    if cores_per_target is not None:
+        targets = [(name, dict(config, LC_Ncores=cores_per_target)) for name, config in targets]
+
+    for name, config in targets:
+        load_settings(config)  # Fails here, before starting the pool, if a configuration is invalid
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    pending = list(enumerate(targets))
+    running = {}  # index: (process, start time)
+    summaries = {}
+
+    def finish(index, summary):
+        process, start = running.pop(index)
+        process.join()
+        summaries[index] = summary
+        print(f"[{len(summaries)}/{len(targets)}] {summary['target']}: {summary['status']} ({summary['elapsed_time']:.0f} s) {summary['error']}")
+
+    while len(pending) > 0 or len(running) > 0:
+        while len(pending) > 0 and len(running) < workers:
+            index, (name, config) = pending.pop(0)
+            process = context.Process(target=target_process, args=(index, (name, config, resume), cores_per_target, memory_limit, results), daemon=False)
+            process.start()
+            running[index] = (process, time.time())
+
+        try:
+            index, summary = results.get(timeout=1)
+            if index in running:
+                finish(index, summary)
+            else:
+                summaries[index] = summary  # Sent just before a non-zero exit code was seen
+        except queue.Empty:
+            # A process that ended without sending its summary was killed (e.g. by the out-of-memory killer of the system):
+            for index, (process, start) in list(running.items()):
+                if not process.is_alive() and process.exitcode != 0:
+                    name, config = targets[index]
+                    finish(index, {"target": name, "status": "failed", "OutputDir": config["output"], "elapsed_time": time.time() - start,
+                                   "error": f"Process ended with exit code {process.exitcode}"})
+
+    return summary_table([summaries[index] for index in range(len(targets))])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="easyfermi-batch", description="Runs the easyfermi analysis for many targets.")
+    parser.add_argument("targets", help="table of targets (csv, ecsv, fits, ...) or directory of yaml configuration files")
+    parser.add_argument("--base-config", default=None, help="GUI_status.yaml-like file with the settings shared by all targets")
+    parser.add_argument("--output", default="./easyfermi_batch", help="parent directory of the output directories of the targets")
+    parser.add_argument("--workers", type=int, default=None, help="number of targets analyzed at the same time")
+    parser.add_argument("--cores-per-target", type=int, default=None, help="number of cores used by each target")
+    parser.add_argument("--memory-limit", type=float, default=None, help="maximum memory per target, in GB")
+    parser.add_argument("--resume", action="store_true", help="continue interrupted targets from their last completed step")
+    args = parser.parse_args(argv)
+
+    base_config = load_settings(args.base_config).to_dict() if args.base_config is not None else {}
+    output = str(Path(args.output).resolve())
+    os.makedirs(output, exist_ok=True)
+
+    if os.path.isdir(args.targets):
+        targets = targets_from_directory(args.targets, base_config, output)
+    else:
+        targets = targets_from_table(args.targets, base_config, output)
+
+    if len(targets) == 0:
+        print(f"No targets found in {args.targets}.")
+        return 1
+
+    workers = args.workers
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 1) // (args.cores_per_target or 1))
+    workers = min(workers, len(targets))
+
+    print(f"Analyzing {len(targets)} targets with {workers} processes. Results will be saved in {output}")
+    summary = run_batch(targets, workers=workers, cores_per_target=args.cores_per_target, memory_limit=args.memory_limit, resume=args.resume)
+    summary.write(os.path.join(output, "batch_summary.ecsv"), format="ascii.ecsv", overwrite=True)
+    summary.pprint(max_lines=-1, max_width=-1)
+    print(f"Summary saved in {os.path.join(output, 'batch_summary.ecsv')}")
+
+    return 0 if np.all(summary["status"] == "done") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,97 +4,33 @@ from PyQt5.QtWidgets import QDialog, QApplication, QFileDialog
 from PyQt5.uic import loadUi
 import sys
 import glob
-import matplotlib.pyplot as plt
-from matplotlib.ticker import AutoMinorLocator
-import matplotlib
 import numpy as np
 import astropy.io.fits as pyfits  # We need astropy version 5.2.2 or earlier
 from astropy.time import Time
-from fermipy.gtanalysis import GTAnalysis
-from fermipy.plotting import ROIPlotter
 import platform
-from astroquery import fermi  # It requires astroquery version 0.4.6
-from astroquery.simbad import Simbad
-from astropy import units as u
-from astropy.coordinates import SkyCoord
-from astropy.table import Table, vstack
 import psutil  # Version: 5.9.8
-from scipy import interpolate
-from gammapy.modeling.models import EBLAbsorptionNormSpectralModel  # Version 0.20.1
-import emcee  # Version: 3.1.4
-import corner  # Version: 2.2.2
 from pathlib import Path
 import yaml
 from yaml import Loader
 import warnings
+from .analysis import Analysis
+from .settings import AnalysisSettings
+from .process import AnalysisProcess
+from . import photon_index
 
 warnings.filterwarnings("ignore")
 
-plt.rcParams.update({'font.size': 12})
 libpath = Path(__file__).parent.resolve() / Path("resources/images")
-EBLpath = Path(__file__).parent.resolve() / Path("resources")
-Working_directory = os.getcwd()
 OS_name = platform.system()
 
-matplotlib.interactive(True)
-os.environ["LANG"] = 'C'
 
-try:
-    os.environ['LC_NAME'] = 'en_IN:en'
-except:
-    print("No 'LC_NAME' entry was found.")
-    
-try:
-    os.environ["LANGUAGE"] = 'en_IN:en'
-except:
-    print("No 'LANGUAGE' entry was found.")
-
-try:
-    os.environ['LC_MEASUREMENT'] = 'en_IN:en'
-except:
-    pass
-
-try:
-    os.environ['LC_PAPER'] = 'en_IN:en'
-except:
-    pass
-    
-try: 
-    os.environ['LC_MONETARY'] = 'en_IN:en'
-except:
-    pass
-    
-try:
-    os.environ['LC_ADDRESS'] = 'en_IN:en'
-except:
-    pass
-    
-try:
-    os.environ['LC_NUMERIC'] = 'en_IN:en'
-except:
-    pass
-    
-try:
-    os.environ['LC_TELEPHONE'] = 'en_IN:en'
-except:
-    pass
-    
-try:
-    os.environ['LC_IDENTIFICATION'] = 'en_IN:en'
-except:
-    pass
-
-try:
-    os.environ['LC_TIME'] = 'en_IN:en'
-except:
-    pass
 
 
 
 class Worker(QtCore.QObject):
 
     """
-    This class is used to run the functions from the main class (i.e. Ui_mainWindow) in a different thread, 
+    This class is used to run the analysis (i.e. an instance of the class Analysis) in a different thread, 
     so avoiding the freezing of the easyfermi window when the analysis is ongoing.
     """
 
@@ -104,41 +40,51 @@ class Worker(QtCore.QObject):
     finished_download_photons = QtCore.pyqtSignal()
     progress = QtCore.pyqtSignal(int)
     
+    def __init__(self, analysis):
+        super().__init__()
+        self.analysis = analysis
     
     def run_gtsetup(self):
         """Long-running task."""
         self.starting.emit()
-        ui.setFermipy()
-        self.progress.emit(0)  # These numbers 0, 1, 2 etc defined by emit() enter as "n" in the function reportProgress(self,n)
-        ui.gta.setup()
-        self.progress.emit(1)
-        N_iter_adaptive_LC = ui.analysisBasics()
-        self.progress.emit(2)
-        calculate_Sun = ui.fit_model()
-        if calculate_Sun:
-            self.progress.emit(3)
-            ui.Sun_path()
-
-        self.progress.emit(4)
-        ui.relocalize_the_target()
-        self.progress.emit(5)
-        ui.compute_TSmap()
-        self.progress.emit(6)
-        ui.compute_Extension()
-        self.progress.emit(7)
-        ui.compute_SED()
-        self.progress.emit(8)
-        ui.EBL_and_MCMC()
-        self.progress.emit(9)
-        ui.compute_LC()
-        ui.plot_LCs(adaptive=False)
-        self.progress.emit(10)
-        for i in range(N_iter_adaptive_LC):
-            ui.compute_LC_adaptive()
-        ui.plot_LCs(adaptive=True)
-        self.progress.emit(11)
+        self.analysis.run(progress=self.progress.emit)  # The numbers 0, 1, 2 etc emitted here enter as "n" in the function reportProgress(self,n)
+        self.finished.emit()
+
+
+class ProcessWorker(QtCore.QObject):
+
+    """
+    This class runs the analysis in a child process (see easyfermi.process.AnalysisProcess) and only listens to its
+    progress messages in a secondary thread, so the analysis never competes with the easyfermi window for the Python interpreter.
+    """
+
+    starting = QtCore.pyqtSignal()
+    finished = QtCore.pyqtSignal()
+    progress = QtCore.pyqtSignal(int, dict)
+    failed = QtCore.pyqtSignal(str)
+    cancelled = QtCore.pyqtSignal()
+
+    def __init__(self, settings):
+        super().__init__()
+        self.process = AnalysisProcess(settings)
+
+    def run_gtsetup(self):
+        """Starts the analysis process and forwards its messages to the easyfermi window."""
+        self.starting.emit()
+        self.process.start()
+        for message in self.process.messages():
+            if message[0] == "progress":
+                self.progress.emit(message[1], message[2])  # Step number and attributes of the analysis read by reportProgress
+            elif message[0] == "failed":
+                self.failed.emit(message[1])
+            elif message[0] == "cancelled":
+                self.cancelled.emit()
         self.finished.emit()
 
+    def cancel(self):
+        """Kills the analysis process."""
+        self.process.cancel()
+
 
 class Downloads(QtCore.QObject):
 
@@ -150,25 +96,29 @@ class Downloads(QtCore.QObject):
     finished_downloads = QtCore.pyqtSignal()
     progress = QtCore.pyqtSignal(int)
     
+    def __init__(self, ui):
+        super().__init__()
+        self.ui = ui
+    
     def run_download_SC(self):
         """Download spacecraft file."""
         self.starting.emit()
         self.progress.emit(-1)
-        ui.download_SC()
+        self.ui.download_SC()
         self.finished_downloads.emit()
     
     def run_download_Photons(self):
         """Download photon files."""
         self.starting.emit()
         self.progress.emit(-2)
-        ui.download_Photons()
+        self.ui.download_Photons()
         self.finished_downloads.emit()
 
     def run_download_Diffuse(self):
         """Download diffuse models."""
         self.starting.emit()
         self.progress.emit(-3)
-        ui.download_Diffuse()
+        self.ui.download_Diffuse()
         self.finished_downloads.emit()
 
 
@@ -1179,20 +1129,20 @@ class Ui_mainWindow(QDialog):
             except:
                 pass
 
-            if (self.IsThereLtcube is None) & (self.IsThereLtcube3==0) & (self.checkBox_External_ltcube.isChecked() is False):
+            if (self.analysis.IsThereLtcube is None) & (self.analysis.IsThereLtcube3==0) & (self.checkBox_External_ltcube.isChecked() is False):
                 if self.checkBox_high_sensitivity.isChecked():
-                    if self.Emin < 500 and self.Emax > 1000:
+                    if self.analysis.Emin < 500 and self.analysis.Emax > 1000:
                         multiplication_factor = 2
-                    elif self.Emin < 500 and 500 <= self.Emax < 1000:
+                    elif self.analysis.Emin < 500 and 500 <= self.analysis.Emax < 1000:
                         multiplication_factor = 2
-                    elif 500 <= self.Emin < 1000 and self.Emax > 1000:
+                    elif 500 <= self.analysis.Emin < 1000 and self.analysis.Emax > 1000:
                         multiplication_factor = 2
                     else:
                         multiplication_factor = 1
                 else:
                     multiplication_factor = 1
         
-                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- It will take about ~"+str(multiplication_factor*int(self.Time_intervMJD*206/(30.0*60)))+" min to run the ltcube.\n")
+                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- It will take about ~"+str(multiplication_factor*int(self.analysis.Time_intervMJD*206/(30.0*60)))+" min to run the ltcube.\n")
                 self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- (Don't worry, this really takes some time...)\n")
                 try:
                     if psutil.sensors_battery()[2] is False:
@@ -1208,13 +1158,9 @@ class Ui_mainWindow(QDialog):
             self.progressBar.setProperty("value", 25)
             self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- Setup finished.\n")
             if not self.checkBox_External_ltcube.isChecked():
-                os.system('ls '+self.OutputDir+'ltcube_*.fits > '+self.OutputDir+'ltcube_list.txt')
+                os.system('ls '+self.analysis.OutputDir+'ltcube_*.fits > '+self.analysis.OutputDir+'ltcube_list.txt')
             list_of_photon_files = glob.glob(self.white_box_output_dir.text()+"/ft1*.fits")
-            max_photon_energy= 0
-            for photon_file in list_of_photon_files:
-                max_energy_in_the_file = pyfits.open(photon_file)[1].data["ENERGY"].max()
-                if max_energy_in_the_file > max_photon_energy:
-                    max_photon_energy = max_energy_in_the_file
+            max_photon_energy = photon_index.max_photon_energy(list_of_photon_files)
             
             highest_energy_photon_RoI = round(max_photon_energy/1000,2)
             self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- Highest energy photon in the RoI: "+str(highest_energy_photon_RoI)+" GeV.\n")
@@ -1223,16 +1169,16 @@ class Ui_mainWindow(QDialog):
         if n == 2:
             self.progressBar.setProperty("value", 30)
             self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- Optimization is done.\n")
-            self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+f"- Target spectral type: {self.gta.roi.sources[0]['SpectrumType']}.\n")
+            self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+f"- Target spectral type: {self.analysis.target_spectrum_type}.\n")
 
-            if self.freeradiusalert != 'ok':
-                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+self.freeradiusalert+"\n")
+            if self.analysis.freeradiusalert != 'ok':
+                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+self.analysis.freeradiusalert+"\n")
 
             self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- Performing the fit...\n")
         
         if n == 3:
             self.progressBar.setProperty("value", 40)
-            self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+self.fitquality+"\n")
+            self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+self.analysis.fitquality+"\n")
             self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- Main results (flux, spectral index, TS, etc) saved in Target_results.txt\n")
             self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- Computing distance from the Sun...\n")
 
@@ -1240,7 +1186,7 @@ class Ui_mainWindow(QDialog):
             self.progressBar.setProperty("value", 50)
 
             if self.checkBox_diagnostic_plots.isChecked():
-                rounded_separation = round(self.Solar_separation.min(),2)
+                rounded_separation = round(self.analysis.Solar_separation.min(),2)
                 if rounded_separation < 15:
                     self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+
                                                           "- Minimum separation between the target and the Sun: "+str(rounded_separation)+
@@ -1249,11 +1195,11 @@ class Ui_mainWindow(QDialog):
                     self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- Minimum separation between the target and the Sun: "+
                                                           str(rounded_separation)+"°.\n")
                 
-                if len(self.Solar_separation) < 10:
+                if len(self.analysis.Solar_separation) < 10:
                     self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+
                                                           '- Time window is too short for computing the target-Sun separation plot. Minimum window required is 4 days.\n')
             else:
-                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+self.fitquality+"\n")
+                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+self.analysis.fitquality+"\n")
                 self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+
                                                       "- Main results (flux, spectral index, TS, etc) saved in Target_results.txt\n")
                     
@@ -1283,17 +1229,17 @@ class Ui_mainWindow(QDialog):
         if n == 9:
             self.progressBar.setProperty("value", 80)
             try:
-                if self.allow_MCMC is False:
+                if self.analysis.allow_MCMC is False:
                     self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+
                                                       "- MCMC not allowed. We require at least 3 LAT data points with TS > 9 in the SED to proceed.\n")
             except:
                 pass
 
-            if self.include_VHE is False:
+            if self.analysis.include_VHE is False:
                 self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- VHE data not available.\n")
 
-            if self.allow_MCMC:
-                AIC = round(float(self.AIC),3)
+            if self.analysis.allow_MCMC:
+                AIC = round(float(self.analysis.AIC),3)
                 self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+f"- Akaike information criterion: {AIC}\n")
 
             if self.checkBox_LC.isChecked():
@@ -1302,33 +1248,33 @@ class Ui_mainWindow(QDialog):
         if n == 10:
             self.progressBar.setProperty("value", 90)
 
-            if self.Compute_LC is False and self.checkBox_LC.isChecked():
+            if self.analysis.Compute_LC is False and self.checkBox_LC.isChecked():
                 self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+f"- A light curve with {self.spinBox_LC_N_time_bins.value()} was already found. Skipping new light curve computation.\n")
 
-            if self.adaptive:
+            if self.analysis.adaptive:
                 self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- Computing adaptive-binning light curve.\n")
                 
         if n == 11:
             self.progressBar.setProperty("value", 99)
             if self.checkBox_relocalize.isChecked():
-                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- New position: RA = "+str(round(self.locRA,3))+
-                                                      ", Dec = "+str(round(self.locDec,3))+", r_95 = "+str(round(self.locr95,3))+"\n")
-                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- Localization results saved in "+self.sourcename+"_loc.fits\n")        
+                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- New position: RA = "+str(round(self.analysis.locRA,3))+
+                                                      ", Dec = "+str(round(self.analysis.locDec,3))+", r_95 = "+str(round(self.analysis.locr95,3))+"\n")
+                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- Localization results saved in "+self.analysis.sourcename+"_loc.fits\n")        
             if self.checkBox_TSmap.isChecked():
                 self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- TS maps saved as figures and fits files.\n")
             if self.checkBox_SED.isChecked():
-                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- SED data saved in "+self.sourcename+"_sed.fits\n")
+                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- SED data saved in "+self.analysis.sourcename+"_sed.fits\n")
                 self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- Preliminar SED shown in figure Quickplot_SED\n")
                 try:
-                    self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+self.redshift_error)
-                    del self.redshift_error
+                    self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+self.analysis.redshift_error)
+                    del self.analysis.redshift_error
                 except:
                     pass
             if self.checkBox_extension.isChecked():
-                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- Extension data saved in "+self.sourcename+"_ext.fits\n")
+                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- Extension data saved in "+self.analysis.sourcename+"_ext.fits\n")
                 self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- Extension is shown in figure Quickplot_extension\n")
             if self.checkBox_LC.isChecked():
-                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- LC saved in file "+self.sourcename+"_lightcurve.fits\n")
+                self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- LC saved in file "+self.analysis.sourcename+"_lightcurve.fits\n")
                 self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- LC is shown in figure Quickplot_LC\n")
                         
         
@@ -1342,13 +1288,22 @@ class Ui_mainWindow(QDialog):
         window active even when the analysis is running.
         """
         
+        if getattr(self, "analysis_running", False):
+            # The "Go!" button works as a "Cancel" button while an analysis is running in a separate process:
+            self.worker.cancel()
+            return
+
         self.save_GUIstate()
 
         can_we_go = self.check_for_erros()
         
         if can_we_go:
+            self.analysis = self.new_analysis()
             self.thread = QtCore.QThread()
-            self.worker = Worker()
+            if getattr(self, "run_in_subprocess", True):
+                self.worker = ProcessWorker(self.analysis.settings)
+            else:
+                self.worker = Worker(self.analysis)
             self.worker.moveToThread(self.thread)
         
             # Standard or custom analysis?
@@ -1361,7 +1316,15 @@ class Ui_mainWindow(QDialog):
             self.worker.finished.connect(self.worker.deleteLater)
             self.thread.finished.connect(self.thread.deleteLater)
             self.worker.starting.connect(self.readytogo)
-            self.worker.progress.connect(self.reportProgress)
+            if isinstance(self.worker, ProcessWorker):
+                self.worker.progress.connect(self.reportProcessProgress)
+                self.worker.failed.connect(self.reportProcessFailure)
+                self.worker.cancelled.connect(  lambda: self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- Analysis cancelled.\n")  )
+                self.worker.starting.connect(self.readytocancel)
+                self.analysis_running = True
+                self.thread.finished.connect(  lambda: setattr(self, "analysis_running", False)  )
+            else:
+                self.worker.progress.connect(self.reportProgress)
         
             # Step 6: Start the thread
             self.thread.start()
@@ -1390,18 +1353,13 @@ class Ui_mainWindow(QDialog):
             self.popup_go()
     
     
-    def save_GUIstate(self):
+    def get_GUIstate(self):
 
         """
-        This function is called only at the end of the analysis.
-        It saves the current state of the GUI in the file GUI_status.npy
-        in the output directory. The user can latter use this file to recover the
-        state of the GUI.
+        This function collects the current state of the GUI in a dictionary.
+        The same dictionary is used as configuration by the class Analysis.
         """
 
-        output_dir = Path(self.white_box_output_dir.text())
-        self.OutputDir = str(output_dir.parent.resolve())+'/'+output_dir.name+'/'
-
         state = {}
 
         state["Standard"] = self.radioButton_Standard.isChecked()
@@ -1464,6 +1422,22 @@ class Ui_mainWindow(QDialog):
         state["remove_targ_from_model"] = self.checkBox_residual_TSmap.isChecked()        
         state["output"] = self.white_box_output_dir.text()
         
+        return state
+        
+        
+    def save_GUIstate(self):
+
+        """
+        This function is called at the beginning and at the end of the analysis.
+        It saves the current state of the GUI in the file GUI_status.yaml
+        in the output directory. The user can latter use this file to recover the
+        state of the GUI.
+        """
+
+        output_dir = Path(self.white_box_output_dir.text())
+        self.OutputDir = str(output_dir.parent.resolve())+'/'+output_dir.name+'/'
+
+        state = self.get_GUIstate()
         
         if not os.path.exists(self.OutputDir):
             os.system(f"mkdir {self.OutputDir}")
@@ -1661,11 +1635,7 @@ class Ui_mainWindow(QDialog):
                     print("No photon files found in the given directory.")
                     self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- No photon files found in the given directory.\n")
                 
-                max_photon_energy= 0
-                for photon_file in list_of_photon_files:
-                    max_energy_in_the_file = pyfits.open(photon_file)[1].data["ENERGY"].max()
-                    if max_energy_in_the_file > max_photon_energy:
-                        max_photon_energy = max_energy_in_the_file
+                max_photon_energy = photon_index.max_photon_energy(list_of_photon_files)  # Read from the photon index, the files are only scanned once
                 
                 if max_photon_energy > 0 and Energ[1] > 1.1*max_photon_energy:
                     check = check + 1
@@ -1674,6 +1644,7 @@ class Ui_mainWindow(QDialog):
 
             try:
                 if len(Coords) == 1:
+                    from astroquery.simbad import Simbad
                     self.recover_coords_from_name = Simbad.query_object(Coords[0])
                     try:
                         if len(self.recover_coords_from_name) == 1:
@@ -1728,6 +1699,46 @@ class Ui_mainWindow(QDialog):
         return answer
     
 
+    def reportProcessProgress(self, n, state):
+
+        """
+        Called when the analysis runs in a separate process (class ProcessWorker). The attributes computed by the
+        analysis process are copied to self.analysis before reporting the progress in the Log box.
+
+        Parameters
+        ----------
+        n: int
+            Step of the analysis, as in reportProgress(self,n).
+        state: dict
+            Attributes of the analysis, see Analysis.progress_state().
+        """
+
+        for name, value in state.items():
+            setattr(self.analysis, name, value)
+        self.reportProgress(n)
+
+
+    def reportProcessFailure(self, message):
+
+        """
+        Prints in the Log box the error raised by the analysis process.
+        """
+
+        print(message)
+        self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"- The analysis failed:\n"+message.strip().split("\n")[-1]+"\n")
+
+
+    def readytocancel(self):
+
+        """
+        While the analysis runs in a separate process, the "Go!" button can be used to cancel it.
+        """
+
+        _translate = QtCore.QCoreApplication.translate
+        self.pushButton_Go.setEnabled(True)
+        self.pushButton_Go.setText(_translate("MainWindow", "Cancel"))
+
+
     def readytogo(self):
 
         """
@@ -1738,32 +1749,7 @@ class Ui_mainWindow(QDialog):
         self.pushButton_Go.setEnabled(False)
         self.pushButton_Go.setText(_translate("MainWindow", "Running..."))
         self.progressBar.setProperty("value", 0)
-        
-        
-    def setFermipy(self):
-        
-        """
-        Here we setup the GTAnalysis class using the input information given by the user
-        in the GUI, or in the customized configuration file.
-        """
-        
-        if self.radioButton_Custom.isChecked(): 
-            self.OutputDir = self.white_box_output_dir.text()+'/'
-            self.gta = GTAnalysis(self.white_box_config_file.text(),logging={'verbosity': 3})
-            self.roiwidth = self.gta.config.get('binning').get('roiwidth')
-            self.Emin = self.gta.config.get('selection').get('emin')
-            self.Emax = self.gta.config.get('selection').get('emax')
-            self.RA = self.gta.config.get('selection').get('ra')
-            self.Dec = self.gta.config.get('selection').get('dec')
-            self.Time_intervMJD = (self.gta.config.get('selection').get('tmax') - self.gta.config.get('selection').get('tmin'))/86400
-            self.spacecraft_file = self.gta.config.get('data').get('scfile')
-            self.tmin = self.gta.config.get('selection').get('tmin')
-            self.tmax = self.gta.config.get('selection').get('tmax')
-            
-        else:
-            self.generateConfig()
-            self.gta = GTAnalysis(self.OutputDir+'config.yaml',logging={'verbosity': 3})
-        
+
         # Making the configuration buttons innactive when the analysis is running:
         self.radioButton_Standard.setEnabled(False)
         self.radioButton_Custom.setEnabled(False)
@@ -1771,20 +1757,7 @@ class Ui_mainWindow(QDialog):
         self.radioButton_Custom.setChecked(False)
         self.activate()
         
-        #Get target name:
-        for n,s in enumerate(self.gta.roi.sources):
-            if n == 0:
-                self.sourcename = s.name
-        
         
-        #Checking for ltcube:
-        self.IsThereLtcube = self.gta.config.get('data').get('ltcube')
-        self.IsThereLtcube2 = glob.glob(self.OutputDir+'*.fits')  
-        self.IsThereLtcube3 = 0
-        if self.OutputDir+'ltcube_00.fits' in self.IsThereLtcube2:
-            self.IsThereLtcube3 = 1
-
-
     def click_to_generateConfig(self):
 
         """
@@ -1800,180 +1773,39 @@ class Ui_mainWindow(QDialog):
     def generateConfig(self):
 
         """
-        This function generates the yaml configuration file required for the analysis.
+        This function checks the inputs given in the main window and generates the yaml configuration file
+        required for the analysis with the class Analysis.
         
         Returns
         -------
-            File named "config.yaml" saved in the chosen output directory and containing information on RA, Dec, energy range, time range etc.
+            A boolean answer set as "True" if the file "config.yaml" was saved in the chosen output directory, or set as "False" if any problem is detected.
 
         """
-        
-        output_dir = Path(self.white_box_output_dir.text())
-        self.OutputDir = str(output_dir.parent.resolve())+'/'+output_dir.name+'/'
-
-        if not os.path.exists(self.OutputDir):
-            os.system(f"mkdir {self.OutputDir}")
 
         can_we_go = self.check_for_erros()
 
         if can_we_go:
-            date = self.dateTimeEdit.text()
-            date2 = self.dateTimeEdit_2.text()
-            timeStart = ['2008-08-04T15:43:36']
-            tStart = Time(timeStart)
-            self.tStartMJD = tStart.mjd[0]
-            self.METStart = 239557417.0
-            times = [str(date[6:10])+'-'+str(date[3:5])+'-'+str(date[:2])+'T'+str(date[11:19]),    str(date2[6:10])+'-'+str(date2[3:5])+'-'+str(date2[:2])+'T'+str(date2[11:19])              ]
-            t = Time(times)
-            t0 = t.mjd[0]
-            t1 = t.mjd[1]
-            self.tmin = (t0-self.tStartMJD)*86400 + self.METStart
-            self.tmax = (t1-self.tStartMJD)*86400 + self.METStart
-            self.spacecraft_file = self.white_box_spacecraft_file.text()
-
-
-            self.Time_intervMJD = t1-t0 
-            
-            catalog = self.comboBox_Catalog.currentText()
-            
-            f = open(self.OutputDir+'config.yaml','w')
-            f.write('data:\n')
-            os.system('ls '+self.white_box_photon_dir.text()+'/*PH*.fits > '+self.OutputDir+'list.txt')
-            f.write('  evfile : '+self.OutputDir+'list.txt\n')   
-            f.write('  scfile : '+self.spacecraft_file+'\n')
-            if self.checkBox_External_ltcube.isChecked():
-                ltcube_list = np.loadtxt(self.white_box_External_ltcube.text(),ndmin=2,dtype=str)
-                ltcube_list = ltcube_list[:,0]
-                if len(ltcube_list) == 1:
-                    f.write('  ltcube : '+ltcube_list[0]+'\n')
-            
-            
-            Coords = self.white_box_RAandDec.text().split(",")
-
-            if len(Coords) == 1:
-                recovered_RA = self.recover_coords_from_name["RA"][0]
-                recovered_Dec = self.recover_coords_from_name["DEC"][0]
-                c = SkyCoord(recovered_RA+' '+recovered_Dec, unit=(u.hourangle, u.deg))
-                self.RA = str(c.ra.value)
-                self.Dec = str(c.dec.value)
-            else:
-                self.RA = Coords[0]
-                self.Dec = Coords[1]
-            
-            Energies = self.white_box_energy.text().split(',')
-            
-            self.Emin = float(Energies[0])
-            self.Emax = float(Energies[1])
-            if self.Emin < 100:
-                zmax = 80
-                self.roiwidth = 17
-            elif 100 <= self.Emin < 500:
-                zmax = 90
-                self.roiwidth = 15
-            elif 500 <= self.Emin < 1000:
-                zmax = 100
-                self.roiwidth = 12
-            else:
-                zmax = 105
-                self.roiwidth = 10
-            
-            f.write('\nbinning:\n')
-            f.write('  roiwidth   : '+str(self.roiwidth)+'\n')
-            f.write('  binsz      : 0.1\n')
-            f.write('  binsperdec : 8\n\n')
-            f.write('selection :\n')
-            f.write('  emin : '+str(self.Emin)+'\n')
-            f.write('  emax : '+str(self.Emax)+'\n')
-            f.write('  zmax    : '+str(zmax)+'\n')
-            f.write('  evclass : 128\n')
-            if self.checkBox_highest_resolution.isChecked():
-                f.write('  evtype  : 48\n')
-            else:
-                f.write('  evtype  : 3\n')
-            f.write('  ra: '+self.RA+'\n')
-            f.write('  dec: '+self.Dec+'\n')
-            f.write('  tmin: '+str(int(self.tmin))+'\n')
-            f.write('  tmax: '+str(int(self.tmax))+'\n\n')
-            f.write('gtlike:\n')
-            f.write('  edisp : True\n')
-            f.write("  irfs : 'P8R3_SOURCE_V3'\n")
-            f.write("  edisp_disable : ['isodiff']\n")
-            f.write('  edisp_bins : -2\n\n')
-            f.write('model:\n')
-            f.write('  src_roiwidth : '+str(self.roiwidth+10)+'\n')
-            f.write("  galdiff  : '"+self.white_box_Diffuse_dir.text()+"/gll_iem_v07.fits'\n")
-            f.write("  isodiff  : '"+self.white_box_Diffuse_dir.text()+"/iso_P8R3_SOURCE_V3_v1.txt'\n")
-            f.write("  catalogs : ['"+catalog+"']\n")            
-            
-            if self.comboBox_is_it_cataloged.currentText() == "No": 
-                f.write("  sources  :\n")
-                f.write("    - { name: '"+self.white_box_target_name.text()+"', ra : "+self.RA+", dec : "+self.Dec+", SpectrumType : 'PowerLaw', SpatialModel: 'PointSource' }")
-
-
-            if self.checkBox_high_sensitivity.isChecked():
-                if self.Emax < 500:
-                    n_components = 1
-                elif self.Emin < 500 and 500 <= self.Emax < 1000:
-                    n_components = 2
-                    emin = [self.Emin,500]
-                    emax = [500,self.Emax]
-                    if self.checkBox_highest_resolution.isChecked():
-                        evtype = [48,56]                        
-                    else:
-                        evtype = [3,3]
-                    
-                    if self.Emin < 100:
-                        zmax = [80,100]
-                    else:
-                        zmax = [90,100]
-
-                elif 500 <= self.Emin < 1000 and self.Emax > 1000:
-                    n_components = 2
-                    emin = [self.Emin,1000]
-                    emax = [1000,self.Emax]
-                    zmax = [100,105]
-                    if self.checkBox_highest_resolution.isChecked():
-                        evtype = [56,3]
-                    else:
-                        evtype = [3,3]
-                elif self.Emin < 500 and self.Emax > 1000:
-                    n_components = 3
-                    emin = [self.Emin,500,1000]
-                    emax = [500,1000,self.Emax]
-                    if self.checkBox_highest_resolution.isChecked():
-                        evtype = [48,56,3]                        
-                    else:
-                        evtype = [3,3,3]
-
-                    if self.Emin < 100:
-                        zmax = [80,100,105]
-                    else:
-                        zmax = [90,100,105]
-                else:
-                    n_components = 1
-
-                if n_components > 1:
-                    f.write('\ncomponents:\n')
-                    for i in range(n_components):
-                        f.write("  - model:\n")
-                        f.write("      galdiff  : '"+self.white_box_Diffuse_dir.text()+"/gll_iem_v07.fits'\n")
-                        f.write("      isodiff  : '"+self.white_box_Diffuse_dir.text()+"/iso_P8R3_SOURCE_V3_v1.txt'\n")
-                        f.write('    selection:\n')
-                        f.write(f'      emin : {emin[i]}\n')
-                        f.write(f'      emax : {emax[i]}\n')
-                        f.write(f'      zmax : {zmax[i]}\n')
-                        f.write(f'      evtype : {evtype[i]}\n')
-                        if self.checkBox_External_ltcube.isChecked():
-                            f.write('    data:\n')
-                            f.write(f'      ltcube : {ltcube_list[i]}\n')
-
-                            
-
-            f.close()
+            self.analysis = self.new_analysis()
+            self.analysis.generateConfig()
+            self.OutputDir = self.analysis.OutputDir
         else:
             self.popup_go()
         
         return can_we_go
+
+
+    def new_analysis(self):
+
+        """
+        Creates an instance of the class Analysis with a frozen snapshot of the current state of the GUI.
+        The analysis (running in the Worker thread) never reads the widgets, so changing them during a run has no effect.
+        """
+
+        analysis = Analysis(AnalysisSettings.from_dict(self.get_GUIstate()))
+        if self.radioButton_Standard.isChecked() and len(self.white_box_RAandDec.text().split(',')) == 1:
+            analysis.recover_coords_from_name = self.recover_coords_from_name  # Simbad query done in check_for_erros()
+
+        return analysis
             
         
     def popup_tutorial(self):
@@ -2055,6 +1887,8 @@ class Ui_mainWindow(QDialog):
         date2 = self.dateTimeEdit_2.text()
         times = [str(date[6:10])+'-'+str(date[3:5])+'-'+str(date[:2])+' '+str(date[11:19]),    str(date2[6:10])+'-'+str(date2[3:5])+'-'+str(date2[:2])+' '+str(date2[11:19])   ]
             
+        from astroquery import fermi  # It requires astroquery version 0.4.6
+
         print("\nQuerying spacecraft data...")
         query = fermi.FermiLAT.query_object(Coords,searchradius="10",
                 obsdates=f'{times[0]}, {times[1]}',LATdatatype="None",spacecraftdata=True)
@@ -2125,7 +1959,7 @@ class Ui_mainWindow(QDialog):
                 if self.yes_or_no == "&Yes":
                     
                     exec(f"self.thread_Download{self.number_of_clicks_to_download} = QtCore.QThread()")
-                    exec(f"self.Download{self.number_of_clicks_to_download} = Downloads()")
+                    exec(f"self.Download{self.number_of_clicks_to_download} = Downloads(self)")
                     exec(f"self.Download{self.number_of_clicks_to_download}.moveToThread(self.thread_Download{self.number_of_clicks_to_download})")
                     exec(f"self.thread_Download{self.number_of_clicks_to_download}.started.connect( self.onAndOff_spacecraft_dowload_button )")
                     exec(f"self.thread_Download{self.number_of_clicks_to_download}.started.connect(self.Download{self.number_of_clicks_to_download}.run_download_SC)")
@@ -2162,6 +1996,8 @@ class Ui_mainWindow(QDialog):
         date2 = self.dateTimeEdit_2.text()
         times = [str(date[6:10])+'-'+str(date[3:5])+'-'+str(date[:2])+' '+str(date[11:19]),    str(date2[6:10])+'-'+str(date2[3:5])+'-'+str(date2[:2])+' '+str(date2[11:19])   ]
             
+        from astroquery import fermi  # It requires astroquery version 0.4.6
+
         print("\nQuerying Photon data...")
         query_photons = fermi.FermiLAT.query_object(Coords,searchradius=f"{radius}", energyrange_MeV=f'{self.Emin}, {self.Emax}',
                 obsdates=f'{times[0]}, {times[1]}',LATdatatype="Photon",spacecraftdata=False)
@@ -2233,7 +2069,7 @@ class Ui_mainWindow(QDialog):
                 if self.yes_or_no == "&Yes":
                     
                     exec(f"self.thread_Download{self.number_of_clicks_to_download} = QtCore.QThread()")
-                    exec(f"self.Download{self.number_of_clicks_to_download} = Downloads()")
+                    exec(f"self.Download{self.number_of_clicks_to_download} = Downloads(self)")
                     exec(f"self.Download{self.number_of_clicks_to_download}.moveToThread(self.thread_Download{self.number_of_clicks_to_download})")
                     exec(f"self.thread_Download{self.number_of_clicks_to_download}.started.connect( self.onAndOff_photon_dowload_button )")
                     exec(f"self.thread_Download{self.number_of_clicks_to_download}.started.connect(self.Download{self.number_of_clicks_to_download}.run_download_Photons)")
@@ -2309,7 +2145,7 @@ class Ui_mainWindow(QDialog):
             if self.yes_or_no == "&Yes":
 
                 exec(f"self.thread_Download{self.number_of_clicks_to_download} = QtCore.QThread()")
-                exec(f"self.Download{self.number_of_clicks_to_download} = Downloads()")
+                exec(f"self.Download{self.number_of_clicks_to_download} = Downloads(self)")
                 exec(f"self.Download{self.number_of_clicks_to_download}.moveToThread(self.thread_Download{self.number_of_clicks_to_download})")
                 exec(f"self.thread_Download{self.number_of_clicks_to_download}.started.connect( self.onAndOff_diffuse_dowload_button )")
                 exec(f"self.thread_Download{self.number_of_clicks_to_download}.started.connect(self.Download{self.number_of_clicks_to_download}.run_download_Diffuse)")
@@ -2578,1610 +2414,22 @@ class Ui_mainWindow(QDialog):
         else:
             self.white_box_target_name.setEnabled(False)
 
-    def find_nearest(self,array, value):
-
-        """
-        This function finds the nearest value in a numpy array.
-        
-        Parameters
-        ----------
-        array: numpy array
-            Integer or float array 
-        value: float
-            The number that you are looking for.
-
-        Returns
-        -------
-        idx: int
-            the index corresponding to the element in the 'array' which is closest to 'value'
-        """
-
-        array = np.asarray(array)
-        idx = (np.abs(array - value)).argmin()
-        return idx
-
-    def Sun_path(self):
-
-        """
-        Function that calculates the target-Sun distance over
-        the time window set in the main window of easyfermi.
-
-        Returns
-        -------
-        Quickplot_Sun: pdf
-            pdf plot in the output directory.
-
-        """
-
-        timeStart = ['2008-08-04T15:43:36']
-        tStart = Time(timeStart)
-        self.tStartMJD = tStart.mjd[0]
-        self.METStart = 239557417.0
-        
-        output_format = self.comboBox_output_format.currentText()
-
-        spacecraft_data_file = pyfits.open(self.spacecraft_file)
-        spacecraft_data_file = spacecraft_data_file[1].data
-
-        START = spacecraft_data_file["START"]
-        STOP = spacecraft_data_file["STOP"]
-        time_window_min_index = self.find_nearest(START, self.tmin)
-        time_window_max_index = self.find_nearest(STOP, self.tmax)
-
-
-        # Selecting the Sun RA and Dec within the chosen time window:
-        Sun_RA = spacecraft_data_file["RA_SUN"][time_window_min_index:time_window_max_index]
-        Sun_DEC = spacecraft_data_file["DEC_SUN"][time_window_min_index:time_window_max_index]
-        Sun_RA = Sun_RA[::1000]
-        Sun_DEC = Sun_DEC[::1000]
-        target_RA = float(self.RA)
-        target_Dec = float(self.Dec)
-
-
-        Coords_Sun = SkyCoord(Sun_RA, Sun_DEC, frame='icrs', unit='deg')
-        Coords_target = SkyCoord(target_RA, target_Dec, frame='icrs', unit='deg')
-        self.Solar_separation = Coords_Sun.separation(Coords_target).value
-
-        t0_MJD = self.tStartMJD + (START[time_window_min_index] - self.METStart)/86400  # Computing the MJD in the beginning of observations
-        t1_MJD = self.tStartMJD + (STOP[time_window_max_index] - self.METStart)/86400
-
-        if len(self.Solar_separation) >= 10:
-            time_range = np.linspace(t0_MJD,t1_MJD,len(self.Solar_separation))
-
-            f = plt.figure(figsize=(9,4),dpi=250) 
-            ax = f.add_subplot(1,1,1)
-            ax.xaxis.set_minor_locator(AutoMinorLocator(2))
-            ax.yaxis.set_minor_locator(AutoMinorLocator(2))
-            ax.tick_params(which='major', length=5, direction='in')
-            ax.tick_params(which='minor', length=2.5, direction='in',bottom=True, top=True, left=True, right=True)
-            ax.tick_params(bottom=True, top=True, left=True, right=True)
-            ax.grid(linestyle=':',which='both')
-            
-            plt.plot(time_range,15*np.ones(len(time_range)))
-            plt.plot(time_range,self.Solar_separation)
-            plt.fill_between(time_range,15,alpha=0.4,color="gray")
-            shift = t1_MJD - t0_MJD
-            shift = 0.05*shift
-            plt.text(t0_MJD + shift,15,"Solar contamination is possible below this line")
-            plt.xlabel('Time [MJD]')
-            plt.ylabel('Angular separation [$^{\circ}$]')
-            plt.title('Angular separation between '+self.sourcename+' and the Sun',fontsize=11)
-            
-            plt.xlim(time_range[0],time_range[-1])
-            plt.ylim(0,None)
-            plt.tight_layout()
-            plt.savefig(self.OutputDir+'Quickplot_Sun.'+output_format,bbox_inches='tight')
-
-            # Saving data:
-            np.savetxt(self.OutputDir+'Solar_ang_separation.csv', np.transpose([time_range,self.Solar_separation]),delimiter=",",header="Time [MJD], Angular separation [deg]")
-
-        else:
-            print("Time window is too short for computing the target-Sun separation plot. Minimum window is 4 days.")
-        
-        
-
-
-
-
-    
-    def analysisBasics(self):
-    
-        """
-        This function calls fermipy to optimize the RoI model in the Fermi-LAT data after the setup is done (i.e. after the computation
-        of ltcube, exposure map, srcmaps etc). This function is also in charge of generating a counts map, changing the target model
-        (if requested by the user), and deleting sources from the model (if requested).
-        
-        Parameters
-        ----------
-        self: instance of the class Ui_mainWindow
-            This parameter contains all the variables read from the Graphical interface.
-
-        Returns
-        -------
-        cmap.fits: data file saved in the output directory.
-            This is the counts map centered on the target.
-        """
-
-        #Cmap:
-        h = pyfits.open(self.OutputDir+'ccube.fits')
-        counts = h[0].data
-        counts.shape
-        h[0].data = np.sum(counts,axis=0)
-        h.writeto(self.OutputDir+'cmap.fits',overwrite=True)
-
-        #Change model if requested:
-        if self.checkBox_change_model.isChecked():
-            aux = self.comboBox_change_model.currentText()
-            if aux == 'Select...':
-                pass
-            elif aux == 'Power-law':
-                aux = 'PowerLaw'
-            elif aux == 'Power-law2':
-                aux = 'PowerLaw2'
-            elif aux == 'LogPar':
-                aux = 'LogParabola'
-            elif aux == 'PLEC':
-                aux = 'PLSuperExpCutoff'
-            elif aux == 'PLEC2':
-                aux = 'PLSuperExpCutoff2'
-            elif aux == 'PLEC3':
-                aux = 'PLSuperExpCutoff3'
-            elif aux == 'PLEC4':
-                aux = 'PLSuperExpCutoff4'
-            elif aux == 'BPL':
-                aux = 'BrokenPowerLaw'
-            elif aux == 'ExpCutOff-EBL':
-                aux = 'ExpCutoff'
-            
-            if aux != 'Select...':    
-                self.gta.delete_source(self.sourcename)
-                skip_list = list(self.gta.roi.create_source_table()["source_name"])
-                self.gta.add_source(self.sourcename, src_dict={'ra' : float(self.RA), 'dec' : float(self.Dec) , 'SpatialModel' : 'PointSource', 'SpectrumType' : aux})
-                self.gta.optimize(skip=skip_list, npred_frac=0)  # We optimize only the new source added above. All other sources are skipped.
-        
-        # Optimizing RoI:
-        self.gta.optimize(npred_threshold=50,shape_ts_threshold=30)
-
-        if self.checkBox_find_extra_sources.isChecked():
-            self.gta.find_sources(sqrt_ts_threshold=self.doubleSpinBox_min_significance.value(), min_separation=self.doubleSpinBox_min_separation.value(), multithread=True)
-        
-        #Delete sources:
-        if self.checkBox_delete_sources.isChecked():
-            a = self.white_box_list_of_sources_to_delete.text().split(',')
-            if a[0] == '':
-                pass
-            else:    
-                for i in a:
-                    self.gta.delete_source(i)
-        
-        
-        self.freeradius = self.roiwidth/2.
-        self.freeradiusalert = 'ok'
-        if self.radioButton_free_source_radius_customized.isChecked():
-            if self.white_box_radius.text() != '':
-                self.freeradius = float(self.white_box_radius.text())
-            else:
-                self.freeradiusalert = '- No free source radius available. Using default free source radius: '+str(self.freeradius)+"°."
-            
-            if self.checkBox_only_norm.isChecked():
-                """Free only the normalizations:"""
-                self.gta.free_sources(distance=self.freeradius,pars='norm')
-            else:
-                self.gta.free_sources(distance=self.freeradius)
-                
-            if self.checkBox_freeze_gal.isChecked():
-                """Freeze Galactic diffuse model:"""
-                self.gta.free_source('galdiff',free=False)
-            else:
-                pass
-                
-            if self.checkBox_freeze_iso.isChecked():
-                """Freeze Isotropic diffuse model:"""
-                self.gta.free_source('isodiff',free=False)
-            else:
-                pass
-        else:    
-            self.gta.free_sources(distance=self.freeradius)
-            #self.gta.free_source('galdiff')
-            #self.gta.free_source('isodiff')
-            #self.gta.free_source(self.sourcename)
-        
-        if self.checkBox_freeze_spec_shape.isChecked():
-            self.gta.free_source(self.sourcename,free=False)
-            self.gta.free_source(self.sourcename,pars='norm')
-
-        N_iter_adaptive_LC = self.spinBox_N_iter.value()
-        
-        return N_iter_adaptive_LC
-        
-    def fit_model(self):
-        
-        """
-        This function calls fermipy to fit the RoI model in the Fermi-LAT data after the optimization is done.
-        Furthermore, it also generates the diagnostic plots (if requested by the user).
-        
-        Parameters
-        ----------
-        self: instance of the class Ui_mainWindow
-            This parameter contains all the variables read from the Graphical interface.
-
-        Returns
-        -------
-        do_diagnostic_plots: boolean
-            This is the status of the diagnostic plot check box. If True, the Solar separation will be computed in the Class Worker.
-        
-        Target_results.txt: data file saved in the output directory.
-            This file contains the results of the RoI fit only for the target, such that the user can have a quick look at it.
-        Results.fits and Results.npy: data files saved in the output directory.
-            These files contain the same information. They give the user the full set of results regarding the fit of the RoI.
-        """
-
-        if self.checkBox_minimizer.isChecked():
-            optimizer = self.comboBox_minimizer.currentText()
-        else:
-            optimizer = 'NEWMINUIT'
-
-        fit_results = self.gta.fit(optimizer=optimizer, min_fit_quality=2)
-        original_fit_quality = fit_results['fit_quality']
-
-        try:
-            TS_fit_cut = float(self.white_box_TS_cut_in_the_fit.text())  # If the fit does not converge, we delete the sources with TS < TS_fit_cut (more details in the documentation).
-        except:
-            TS_fit_cut = 16
-            print("Fit TS cut is not a valid float. Resetting TS_cut = 16.")
-
-        if original_fit_quality == 3:
-            self.fitquality = '- Fit quality: 3. Excellent fit! Full accurate covariance matrix.'
-        else:
-            if self.gta.get_sources()[0]["ts"] < TS_fit_cut:
-                self.gta.delete_sources(minmax_ts=[None,0.99*self.gta.get_sources()[0]["ts"]])  # Here we delete the sources that have TS < TS_target and refit the model
-                fit_results = self.gta.fit(optimizer=optimizer)
-                if fit_results['fit_quality'] == 3:
-                    self.fitquality = f'- Original fit quality: {original_fit_quality}. As the TS of the target was only {self.gta.get_sources()[0]["ts"]}, we deleted all sources with TS < {self.gta.get_sources()[0]["ts"]} and performed the fit again.\n- Fit quality of the second try: 3. Excellent fit! Full accurate covariance matrix.'
-                elif fit_results['fit_quality'] == 2:
-                    self.fitquality = f'- Original fit quality: {original_fit_quality}. As the TS of the target was only {self.gta.get_sources()[0]["ts"]}, we deleted all sources with TS < {self.gta.get_sources()[0]["ts"]} and performed the fit again.\n- Fit quality of the second try: 2. Reasonable fit. Full matrix, but forced positive-definite (i.e. not accurate).'
-                elif fit_results['fit_quality'] == 1:
-                    self.fitquality = f'- Original fit quality: {original_fit_quality}. As the TS of the target was only {self.gta.get_sources()[0]["ts"]}, we deleted all sources with TS < {self.gta.get_sources()[0]["ts"]} and performed the fit again.\n- Fit quality of the second try: 1. Poor fit. Diagonal approximation only, not accurate.'
-                else:
-                    self.fitquality = f'- Original fit quality: {original_fit_quality}. As the TS of the target was only {self.gta.get_sources()[0]["ts"]}, we deleted all sources with TS < {self.gta.get_sources()[0]["ts"]} and performed the fit again.\n- Fit quality of the second try: 0. Bad fit. Error matrix not calculated.'
-                
-            else:
-                self.gta.delete_sources(minmax_ts=[None,TS_fit_cut])  # Here we delete the sources that have TS < TS_fit_cut and refit the model
-                fit_results = self.gta.fit(optimizer=optimizer)
-                if fit_results['fit_quality'] == 3:
-                    self.fitquality = f'- Original fit quality: {original_fit_quality}. We deleted all sources with TS < {TS_fit_cut} and performed the fit again.\n- Fit quality of the second try: 3. Excellent fit! Full accurate covariance matrix.'
-                elif fit_results['fit_quality'] == 2:
-                    self.fitquality = f'- Original fit quality: {original_fit_quality}. We deleted all sources with TS < {TS_fit_cut} and performed the fit again.\n- Fit quality of the second try: 2. Reasonable fit. Full matrix, but forced positive-definite (i.e. not accurate).'
-                elif fit_results['fit_quality'] == 1:
-                    self.fitquality = f'- Original fit quality: {original_fit_quality}. We deleted all sources with TS < {TS_fit_cut} and performed the fit again.\n- Fit quality of the second try: 1. Poor fit. Diagonal approximation only, not accurate.'
-                else:
-                    self.fitquality = f'- Original fit quality: {original_fit_quality}. We deleted all sources with TS < {TS_fit_cut} and performed the fit again.\n- Fit quality of the second try: 0. Bad fit. Error matrix not calculated.'
-                
-
-        #Do plots:
-        do_diagnostic_plots = self.checkBox_diagnostic_plots.isChecked()
-        if do_diagnostic_plots:
-            self.gta.write_roi('Results',make_plots=True)
-        else:
-            self.gta.write_roi('Results',make_plots=False)
-        
-        #Saving results
-        f = open(self.OutputDir+'Target_results.txt','w')
-        f.write(str(self.gta.roi[self.sourcename]))
-        f.write('\nEnergy flux upper limit (MeV cm-2 s-1): '+str(self.gta.roi.sources[0]['eflux_ul95']))
-        f.write('\nPhoton flux upper limit (cm-2 s-1): '+str(self.gta.roi.sources[0]['flux_ul95']))
-        f.close()
-    
-        return do_diagnostic_plots
-    
-
-    def relocalize_the_target(self):
-
-        """This function finds the best-fit position for the gamma-ray target.
-
-        Parameters
-        ----------
-        self: instance of the class Ui_mainWindow
-            This parameter contains all the variables read from the Graphical interface.
-
-        Returns
-        -------
-        TARGET_NAME_loc.fits:
-            Table containing the old and new coordinates of the gamma-ray target, as well as the r68, r95, and r99 uncertainty radii. File is saved in the output directory read from the graphical interface.
-        TARGET_NAME_loc.npy:
-            Same as above but in the npy format.
-        TARGET_NAME_localize.png and TARGET_NAME_localize_peak.png:
-            A couple of plots showing the shift in the target coordinates.
-
-        """
-
-        if self.checkBox_relocalize.isChecked():
-            loc = self.gta.localize(self.sourcename, make_plots=True,update=True)
-            self.locRA = loc['ra']
-            self.locDec = loc['dec']
-            self.locr68 = loc['pos_r68']
-            self.locr95 = loc['pos_r95']
-            #print("New position. RA = ",self.locRA,", Dec = ",self.locDec,", r_68 = ",self.locr68,", r_95 = ",self.locr95)
-            #self.large_white_box_Log.setPlainText(self.large_white_box_Log.toPlainText()+"Localization results saved in the file "+self.sourcename+"_loc.fits\n")
-
-            #Saving results
-            f = open(self.OutputDir+'Target_results.txt','w')
-            f.write(str(self.gta.roi[self.sourcename]))
-            f.write('\nEnergy flux upper limit (MeV cm-2 s-1): '+str(self.gta.roi.sources[0]['eflux_ul95']))
-            f.write('\nPhoton flux upper limit (cm-2 s-1): '+str(self.gta.roi.sources[0]['flux_ul95']))
-            f.close()
-
-    def compute_TSmap(self):
-        
-        """This function computes the TS maps.
-
-        Parameters
-        ----------
-        self: instance of the class Ui_mainWindow
-            This parameter contains all the variables read from the Graphical interface.
-
-        Returns
-        -------
-        Target_TS_map_pointsource_powerlaw_2.00_tsmap.fits:
-            TS map highlighting the target significance computed for a point-source with power-law index defined by the user (default = 2). File is saved in the output directory read from the graphical interface.
-        Residuals_TS_map__pointsource_powerlaw_2.00_tsmap.fits:
-            Residuals TS map assuming the power-law index defined by the user (default = 2). File is saved in the output directory read from the graphical interface.
-        
-        """
-
-        output_format = self.comboBox_output_format.currentText()
-
-        if self.checkBox_TSmap.isChecked():
-            model = {'Index' : self.doubleSpinBox_Photon_index_TS.value(), 'SpatialModel' : 'PointSource'}
-            if self.checkBox_residual_TSmap.isChecked():
-                TSmap_res = self.gta.tsmap('Residuals_TS_map_', model=model)
-                plt.figure(figsize=(8,8))
-                ROIPlotter(TSmap_res['sqrt_ts'],roi=self.gta.roi).plot(vmin=0,vmax=5,levels=[3,5,7,9],subplot=111,cmap='magma')
-                plt.gca().set_title('sqrt(TS)')
-                plt.savefig(self.OutputDir+'TSmap_residuals.'+output_format,bbox_inches='tight')
-                          
-
-            TSmap = self.gta.tsmap('Target_TS_map_', model=model, exclude=self.sourcename)
-            plt.figure(figsize=(8,8))
-            ROIPlotter(TSmap['sqrt_ts'],roi=self.gta.roi).plot(vmin=0,vmax=5,levels=[3,5,7,9],subplot=111,cmap='magma')
-            plt.gca().set_title('sqrt(TS)')
-            plt.savefig(self.OutputDir+'TSmap_target_highlighted.'+output_format,bbox_inches='tight')
-            
-            #Below we compute the excess, significance, model, and data maps:
-            self.gta.residmap('Excess_'+self.sourcename,model=model,make_plots=True, write_fits=True, write_npy=False)
-        
-        
-    def compute_SED(self):
-
-        """This function computes the SED for the target.
-
-        Parameters
-        ----------
-        self: instance of the class Ui_mainWindow
-            This parameter contains all the variables read from the Graphical interface.
-
-        Returns
-        -------
-        TARGET_NAME_sed.fits
-            Table containing the SED data. File is saved in the output directory read from the graphical interface.
-        Quickplot_SED.png or Quickplot_SED.pdf:
-            A plot of the SED for quick visualization. File is saved in the output directory read from the graphical interface.
-
-        """
-
-        output_format = self.comboBox_output_format.currentText()
-        if self.checkBox_SED.isChecked():
-
-            try:
-                self.redshift = float(self.white_box_redshift.text())
-            except:
-                print("- WARNING: easyfermi could not read the redshift. Please insert a valid float number. Setting redshift to 0.0.\n")
-                self.redshift = 0.0
-                self.redshift_error = "- WARNING: easyfermi could not read the redshift. Please insert a valid float number. Setting redshift to 0.0.\n"
-
-            c = np.load(self.OutputDir+'Results.npy',allow_pickle=True).flat[0]
-            self.E = np.array(c['sources'][self.sourcename]['model_flux']['energies'])
-            self.dnde = np.array(c['sources'][self.sourcename]['model_flux']['dnde'])
-            dnde_hi = np.array(c['sources'][self.sourcename]['model_flux']['dnde_hi'])
-            dnde_lo = np.array(c['sources'][self.sourcename]['model_flux']['dnde_lo'])
-            TSmin = 9                
-
-            Nbins = self.spinBox_SED_N_energy_bins.value() + 1
-            ebins = np.linspace(np.log10(self.Emin),np.log10(self.Emax),num=Nbins)
-            ebins = ebins.tolist()
-
-            use_local_index = False
-            if self.checkBox_use_local_index.isChecked():
-                use_local_index = True
-
-            self.sed = self.gta.sed(self.sourcename,loge_bins=ebins,make_plots=False,use_local_index=use_local_index,write_npy=False)
-
-            #########################################################
-            ########### Looking for SED bins with less than 5 photons
-            #########################################################
-
-            # If the analysis goes over 10 GeV, we check the total number of photons per SED bin within a radius of 0.25 deg from the RoI center:
-            ebins_array = np.asarray(ebins)
-            ebins_array = ebins_array[ebins_array > 4]
-            if len(ebins_array) > 0: 
-                self.few_photons_warning = np.zeros(len(ebins_array)-1)
-                photon_file = np.sort(glob.glob(self.white_box_output_dir.text()+"/ft1*.fits"))[-1]  # Selecting only the highest energy photon file (supposing we only have one for E > 10GeV).
-                photon_energies = pyfits.open(photon_file)[1].data["ENERGY"]
-                photon_RA = pyfits.open(photon_file)[1].data["RA"][photon_energies>10000]
-                photon_DEC = pyfits.open(photon_file)[1].data["DEC"][photon_energies>10000]
-                photon_energies = photon_energies[photon_energies>10000]
-
-                target_RA = float(self.RA)
-                target_Dec = float(self.Dec)
-                Coords_target = SkyCoord(target_RA, target_Dec, frame='icrs', unit='deg')
-
-                for n in range(len(ebins_array[:-1])):
-                    indexes = np.where((photon_energies>10**ebins_array[n]) & (photon_energies<10**ebins_array[n+1]) & (photon_DEC > target_Dec-0.6) & (photon_DEC < target_Dec+0.6))[0]
-                    selection_photon_RA = photon_RA[indexes]
-                    selection_photon_DEC = photon_DEC[indexes]
-
-                    Coords_photons = SkyCoord(selection_photon_RA, selection_photon_DEC, frame='icrs', unit='deg')
-                    photon_separation = Coords_photons.separation(Coords_target).value  # Separation in degrees
-                    photon_separation = photon_separation[photon_separation < 0.5]
-                    if len(photon_separation) < 5:
-                        self.few_photons_warning[n] = 1  # This warns taht we have less than 5 photons in this bin.
-                
-                self.few_photons_warning = np.concatenate([np.zeros(len(ebins)-len(ebins_array)),self.few_photons_warning])
-
-                SED_file = glob.glob(self.OutputDir+"*_sed.fits")[0]
-                hdul = pyfits.open(SED_file)
-                original_data_cols = hdul[1].data.columns
-                new_col_warnings = pyfits.Column(name="Warning_few_photons",array=self.few_photons_warning,format="D",unit="")             
-                all_cols = pyfits.BinTableHDU.from_columns(original_data_cols + new_col_warnings)
-                hdul[1].data = all_cols.data
-                hdul[1].name = "SED"
-                hdul.writeto(SED_file,overwrite=True)
-                hdul.close()
-
-            #########################################################
-
-
-
-            # The block of code below is useful only to fix an error in the Mac OS, where the TS column of the sed.fits file is empty.
-            NaNs_TSs = self.sed['ts'][np.isnan(self.sed['ts'])]
-            if len(NaNs_TSs) > 0:
-                for i in range(len(self.sed['ts'])):
-                    self.sed["ts"][i] = -2*self.sed['dloglike_scan'][i][1]
-
-                SED_file = glob.glob(self.OutputDir+"*_sed.fits")[0]
-                hdul = pyfits.open(SED_file)
-                hdul[1].data["ts"] = self.sed["ts"]
-                hdul.writeto(SED_file,overwrite=True)
-                hdul.close()
-
-            # data points:            
-            self.Energy_data_points = self.sed['e_ctr'][self.sed['ts']>TSmin]
-            self.e2dnde_data_points = self.sed['e2dnde'][self.sed['ts']>TSmin]
-            self.xerr_data_points = [self.sed['e_ctr'][self.sed['ts']>TSmin] - self.sed['e_min'][self.sed['ts']>TSmin], self.sed['e_max'][self.sed['ts']>TSmin] - self.sed['e_ctr'][self.sed['ts']>TSmin]]
-            self.yerr_data_points = self.sed['e2dnde_err'][self.sed['ts']>TSmin]
-            # Upper limits:
-            self.Energy_uplims = self.sed['e_ctr'][self.sed['ts']<=TSmin]
-            self.e2dnde_uplims = self.sed['e2dnde_ul95'][self.sed['ts']<=TSmin]
-            self.xerr_uplims = [self.sed['e_ctr'][self.sed['ts']<=TSmin] - self.sed['e_min'][self.sed['ts']<=TSmin], self.sed['e_max'][self.sed['ts']<=TSmin] - self.sed['e_ctr'][self.sed['ts']<=TSmin]]
-            self.yerr_uplims = 0.3*self.sed['e2dnde_ul95'][self.sed['ts']<=TSmin]
-            # Warnings:
-            if len(ebins_array) > 0:
-                self.few_photons_warning = self.few_photons_warning[self.sed['ts']>TSmin]
-                self.energy_SED_warning = self.Energy_data_points[self.few_photons_warning > 0]
-                self.e2dnde_SED_warning = self.e2dnde_data_points[self.few_photons_warning > 0]
-            else:
-                self.energy_SED_warning = np.zeros(0)
-                self.e2dnde_SED_warning = np.zeros(0)
-                self.few_photons_warning = np.zeros(0)
-            
-
-
-            f = plt.figure(figsize=(6,5),dpi=250)
-            ax = f.add_subplot(1,1,1)
-            ax.xaxis.set_minor_locator(AutoMinorLocator(2))
-            ax.yaxis.set_minor_locator(AutoMinorLocator(2))
-            ax.tick_params(which='major', length=5, direction='in')
-            ax.tick_params(which='minor', length=2.5, direction='in',bottom=True, top=True, left=True, right=True)
-            ax.tick_params(bottom=True, top=True, left=True, right=True)
-            ax.grid(linestyle=':',which='both')
-
-            plt.loglog(self.E, (self.E**2)*self.dnde, 'k--')
-            plt.loglog(self.E, (self.E**2)*dnde_hi, 'k')
-            plt.loglog(self.E, (self.E**2)*dnde_lo, 'k')
-            plt.errorbar(self.Energy_data_points, self.e2dnde_data_points, xerr = self.xerr_data_points, yerr = self.yerr_data_points, color = "C0", markeredgecolor='black', fmt ='o', capsize=4)
-            plt.errorbar(self.Energy_uplims, self.e2dnde_uplims, xerr = self.xerr_uplims, yerr = self.yerr_uplims, markeredgecolor='black', fmt='o', uplims=True, color='C0', capsize=4)
-            if len(self.energy_SED_warning) > 0:
-                plt.plot(self.energy_SED_warning,self.e2dnde_SED_warning,"mo",zorder=100,label="Less than 5 photons")
-            plt.xlabel('Energy [MeV]')
-            plt.ylabel(r'E$^{2}$ dN/dE [MeV cm$^{-2}$ s$^{-1}$]')
-            plt.title(self.sourcename+' - SED')
-            
-            if len(self.sed['e2dnde'][self.sed['ts']>TSmin]) > 0:
-                ymax = 2*(self.sed['e2dnde'][self.sed['ts']>TSmin] + self.sed['e2dnde_err'][self.sed['ts']>TSmin]).max()
-                ymin = 0.5*(self.sed['e2dnde'][self.sed['ts']>TSmin] - self.sed['e2dnde_err'][self.sed['ts']>TSmin]).min()
-                if ymax > 4*self.sed['e2dnde'][self.sed['ts']>TSmin].max():
-                    ymax = 4*self.sed['e2dnde'][self.sed['ts']>TSmin].max()
-                
-                if ymin < self.sed['e2dnde'][self.sed['ts']>TSmin].min()/5.0:
-                    ymin = self.sed['e2dnde'][self.sed['ts']>TSmin].min()/5.0
-                    
-                if len(self.sed['e2dnde_ul95'][self.sed['ts']<=TSmin]) > 0:
-                    yaux = (self.sed['e2dnde_ul95'][self.sed['ts']<=TSmin]).max()
-                    if yaux > ymax:
-                        ymax = 2*yaux
-                        
-                    yaux = (self.sed['e2dnde_ul95'][self.sed['ts']<=TSmin]).min()
-                    if yaux < ymin:
-                        ymin = 0.5*yaux
-            else:
-                ymax = 2*self.sed['e2dnde_ul95'][self.sed['ts']<=TSmin].max()
-                ymin = 0.5*self.sed['e2dnde_ul95'][self.sed['ts']<=TSmin].min()
-                
-            
-            plt.ylim(ymin,ymax)
-            plt.xlim(self.Emin*0.8,self.Emax*1.2)
-            plt.legend()
-            plt.tight_layout()
-            plt.savefig(self.OutputDir+'Quickplot_SED_fermipy.'+output_format,bbox_inches='tight')
-
-
-    def EBL_and_MCMC(self):
-
-        """This function corrects the data for EBL absorption and applies a MCMC to the corrected data.
-           If the redshift is 0.0, the MCMC is applied to the non-corrected LAT data.
-
-        Parameters
-        ----------
-        self: instance of the class Ui_mainWindow
-            This parameter contains all the variables read from the Graphical interface.
-
-        Returns
-        -------
-        TARGET_NAME_sed.fits
-            Table containing the SED data + MCMC results. File is saved in the output directory read from the graphical interface.
-        Quickplot_SED_MCMC.png or Quickplot_SED_MCMC.pdf:
-            A plot of the SED for quick visualization. File is saved in the output directory read from the graphical interface.
-
-        """
-
-        TSmin = 9 
-        self.include_VHE = False
-        self.allow_MCMC = False
-        if self.checkBox_SED.isChecked():
-            if len(self.Energy_data_points) > 2:
-                self.allow_MCMC = True
-            else:
-                self.allow_MCMC = False
-
-        if self.allow_MCMC:
-            if self.white_box_VHE.text().split('.')[-1] == 'fits':
-                try:
-                    self.include_VHE = True
-                    VHE = pyfits.open(self.white_box_VHE.text())[1].data
-
-                    energy_VHE = VHE["e_ref"] * 1000000  # TeV to MeV
-                    energy_VHE_min = VHE["e_min"] * 1000000
-                    energy_VHE_max = VHE["e_max"] * 1000000
-                    e2dnde_VHE = VHE["e2dnde"] * 1e6  # TeV cm-2 s-1 to MeV cm-2 s-1
-                    e2dnde_err_VHE = VHE["e2dnde_err"] * 1e6
-                    e2dnde_UL_VHE = VHE["e2dnde_ul"] * 1e6
-                    TS_VHE = VHE["ts"]
-
-                    delete_nan_elements = np.isnan(e2dnde_UL_VHE)
-
-                    TS_VHE = np.delete(TS_VHE, delete_nan_elements)
-                    e2dnde_UL_VHE = np.delete(e2dnde_UL_VHE, delete_nan_elements)[TS_VHE <= TSmin]
-                    energy_UL_VHE = np.delete(energy_VHE, delete_nan_elements)[TS_VHE <= TSmin]
-                    energy_UL_VHE_min = np.delete(energy_VHE_min, delete_nan_elements)[TS_VHE <= TSmin]
-                    energy_UL_VHE_max = np.delete(energy_VHE_max, delete_nan_elements)[TS_VHE <= TSmin]
-                    energy_VHE = np.delete(energy_VHE, delete_nan_elements)[TS_VHE > TSmin]
-                    energy_VHE_min = np.delete(energy_VHE_min, delete_nan_elements)[TS_VHE > TSmin]
-                    energy_VHE_max = np.delete(energy_VHE_max, delete_nan_elements)[TS_VHE > TSmin]
-                    e2dnde_VHE = np.delete(e2dnde_VHE, delete_nan_elements)[TS_VHE > TSmin]
-                    e2dnde_err_VHE = np.delete(e2dnde_err_VHE, delete_nan_elements)[TS_VHE > TSmin]
-
-                    x_err_VHE = [energy_VHE - energy_VHE_min, energy_VHE_max - energy_VHE]
-                    x_err_UL_VHE =  [energy_UL_VHE - energy_UL_VHE_min, energy_UL_VHE_max - energy_UL_VHE]
-
-                except:
-                    self.include_VHE = False
-            else:
-                self.include_VHE = False
-
-            if self.include_VHE:
-                Energy_SED = np.concatenate([self.Energy_data_points, energy_VHE])
-                Energy_err_SED = [np.concatenate([self.xerr_data_points[0],x_err_VHE[0]]), np.concatenate([self.xerr_data_points[1],x_err_VHE[1]])]
-                dnde_SED = np.concatenate([self.e2dnde_data_points, e2dnde_VHE]) / (Energy_SED**2)  # y in dnde
-                dnde_err_SED = np.concatenate([self.yerr_data_points, e2dnde_err_VHE]) / (Energy_SED**2)  # yerr in dnde
-                self.Energy_uplims = np.concatenate([self.Energy_uplims, energy_UL_VHE])
-                self.xerr_uplims = [np.concatenate([self.xerr_uplims[0],x_err_UL_VHE[0]]), np.concatenate([self.xerr_uplims[1],x_err_UL_VHE[1]])]
-                self.e2dnde_uplims = np.concatenate([self.e2dnde_uplims, e2dnde_UL_VHE])
-                self.yerr_uplims = np.concatenate([self.yerr_uplims, 0.3*e2dnde_UL_VHE])
-                N_bins_VHE = len(energy_VHE)
-                N_bins_VHE_UL = len(energy_UL_VHE)
-            else:
-                Energy_SED = self.Energy_data_points
-                Energy_err_SED = self.xerr_data_points
-                dnde_SED = self.e2dnde_data_points / (Energy_SED**2)
-                dnde_err_SED = self.yerr_data_points / (Energy_SED**2)
-
-            if self.redshift > 0.0:
-                # Here we compute the EBL absorption model for a given redshift:
-                EBL_model = self.comboBox_redshift.currentText().split(" ")[0]
-                if EBL_model == "Dominguez":
-                    EBL_model = "dominguez"
-                elif EBL_model == "Franceschini":
-                    if self.comboBox_redshift.currentText().split(" ")[1] == "et":
-                        EBL_model = "franceschini"
-                    else:
-                        EBL_model = "franceschini17"
-                elif EBL_model == "Saldana-Lopez":
-                    EBL_model = "saldana-lopez21"
-                else:
-                    EBL_model = "finke"
-
-                os.environ["GAMMAPY_DATA"] = str(EBLpath)  # gammapy will look for EBL models in this directory
-                absorption = EBLAbsorptionNormSpectralModel.read_builtin(EBL_model, redshift=self.redshift)
-                abs_data = absorption.evaluate(Energy_SED*u.MeV,self.redshift, alpha_norm=1)
-                dnde_data_points_deabsorbed = dnde_SED/abs_data
-                dnde_error_deabsorbed = dnde_err_SED/abs_data
-
-
-                abs_uplims = absorption.evaluate(self.Energy_uplims*u.MeV,self.redshift, alpha_norm=1)
-                e2dnde_uplims_deabsorbed = self.e2dnde_uplims/abs_uplims
-                yerr_uplims_deabsorbed = self.yerr_uplims/abs_uplims
-
-                Energy_SED_deabsorbed_log = np.log10(Energy_SED)
-                dnde_data_points_deabsorbed_log = np.log10(dnde_data_points_deabsorbed)
-                dnde_error_deabsorbed_log = (1 / np.log(10)) * (1 / dnde_data_points_deabsorbed) * dnde_error_deabsorbed  # converting the errors to log scale
-
-                # data to be saved later:
-                absorption_all_data = absorption.evaluate(self.sed['e_ctr']*u.MeV,self.redshift, alpha_norm=1)
-                e2dnde_all_data_unabsorbed = self.sed['e2dnde']/absorption_all_data
-                e2dnde_all_data_errors_unabsorbed = self.sed['e2dnde_err']/absorption_all_data
-                e2dnde_all_ul95_unabsorbed = self.sed['e2dnde_ul95']/absorption_all_data
-            else:
-                Energy_SED_log = np.log10(Energy_SED)
-                dnde_data_points_log = np.log10(dnde_SED)
-                dnde_error_log = (1 / np.log(10)) * (1 / dnde_SED) * dnde_err_SED  # converting the errors to log scale
-
-
-            def plotter(sampler, x):
-
-                """
-                Function to plot the distribution of possible models around the maximum likelihood model.
-                
-                Parameters
-                ----------
-                sampler: array
-                    table where each column contains the distribution of possible values for a given parameter
-                x: array
-                    the x-axis of the SED to be plotted.
-
-                Returns
-                -------
-                """
-
-                samples = sampler.flatchain
-                for theta in samples[np.random.randint(len(samples), size=100)]:
-                    if self.comboBox_MCMC.currentText() == "LogPar":
-                        model = 10 ** (2 * x + LogPar(theta, x))
-                    elif self.comboBox_MCMC.currentText() == "LogPar_MTT":
-                        model = 10 ** LogPar_MTT(theta, x)
-                    elif self.comboBox_MCMC.currentText() == "PLEC":
-                        model = 10 ** (2 * x + PLEC(theta, x))
-                    elif self.comboBox_MCMC.currentText() == "PLEC_bfix":
-                        model = 10 ** (2 * x + PLEC_bfix(theta, x))
-                    elif self.comboBox_MCMC.currentText() == "PLEC_deMenezes":
-                        model = 10 ** PLEC_deMenezes(theta, x)
-                    elif self.comboBox_MCMC.currentText() == "PowerLaw":
-                        model = 10 ** (2 * x + PowerLaw(theta, x))
-                    plt.plot(10**x, model, color="r", zorder=0, alpha=0.1)  # plotting with parameters in the posterior distribution
-                plt.ticklabel_format(style="sci", axis="x", scilimits=(0, 0))
-                plt.xlabel("Energy [MeV]")
-                plt.ylabel("E$^2dN/dE$ [MeV cm$^{-2}$ s$^{-1}$]")
-                plt.grid(linestyle=":")
-                plt.legend()
-
-            def PowerLaw(theta, x):
-                N0, alpha = theta
-                Ep = np.log10(self.Emin)
-                return N0 - alpha*(x - Ep)
-            
-            def LogPar(theta, x):
-                N0, alpha, beta = theta
-                Ep = np.log10(self.Emin)
-                return N0 + (-alpha - beta * np.log((10**x) / (10**Ep))) * (x - Ep)
-            
-            def LogPar_MTT(theta, x):
-                Splog, alpha, Ep = theta
-                return Splog + (-alpha*(np.log10((10**x)/(10**Ep))**2))
-
-            def PLEC(theta, x):
-                Ep = np.log10(self.Emin)
-                N0, alpha, Ec, b = theta
-                # N0, alpha, Ec = theta
-                return N0 - alpha * (x - Ep) + np.log10(np.exp(-((10**x / (10**Ec)) ** b)))
-
-            def PLEC_bfix(theta, x):
-                Ep = np.log10(self.Emin)
-                b = 1
-                N0, alpha, Ec = theta
-                # N0, alpha, Ec = theta
-                return N0 - alpha * (x - Ep) + np.log10(np.exp(-((10**x / (10**Ec)) ** b)))
-
-            ######################################
-            def PLEC_deMenezes(theta, x):
-                Sp, alpha, Ep, b = theta
-                return Sp + (alpha - 2)*(Ep - x) + np.log10(np.exp(((2-alpha)/b)*(1 - ((10**x)/(10**Ep))**b) ))
-
-            def lnlike(theta, x, y, yerr):
-                if self.comboBox_MCMC.currentText() == "LogPar":
-                    likelihood = -0.5 * np.sum(((y - LogPar(theta, x)) / yerr) ** 2)
-                elif self.comboBox_MCMC.currentText() == "LogPar_MTT":
-                    likelihood = -0.5 * np.sum(((y - LogPar_MTT(theta, x)) / yerr) ** 2)
-                elif self.comboBox_MCMC.currentText() == "PLEC":
-                    likelihood = -0.5 * np.sum(((y - PLEC(theta, x)) / yerr) ** 2)
-                elif self.comboBox_MCMC.currentText() == "PLEC_bfix":
-                    likelihood = -0.5 * np.sum(((y - PLEC_bfix(theta, x)) / yerr) ** 2)
-                elif self.comboBox_MCMC.currentText() == "PLEC_deMenezes":
-                    likelihood = -0.5 * np.sum(((y - PLEC_deMenezes(theta, x)) / yerr) ** 2)
-                elif self.comboBox_MCMC.currentText() == "PowerLaw":
-                    likelihood = -0.5 * np.sum(((y - PowerLaw(theta, x)) / yerr) ** 2)
-
-                return likelihood
-
-            def lnprior_PowerLaw(theta):
-                N0, alpha = theta
-                if -15 < N0 < -7 and 0.5 < alpha < 5.0:
-                    return 0.0
-                return -np.inf
-            
-            def lnprior_LogPar(theta):
-                N0, alpha, beta = theta
-                if -15 < N0 < -7 and 1.0 < alpha < 4.0 and -1 < beta < 1.0:
-                    return 0.0
-                return -np.inf
-            
-            def lnprior_LogPar_MTT(theta):
-                Splog, alpha, Ep = theta
-                if -7 < Splog < -1 and -1.0 < alpha < 1.0 and 2 < Ep < 7:
-                    return 0.0
-                return -np.inf
-            
-            def lnprior_PLEC(theta):
-                N0, alpha, Ec, b = theta
-                # N0, alpha, Ec = theta
-                if -15 < N0 < -7 and 1.0 < alpha < 4.0 and 3.0 < Ec < 7.0 and 0.2 < b < 3.0:
-                    return 0.0
-                return -np.inf
-            
-            def lnprior_PLEC_bfix(theta):
-                N0, alpha, Ec = theta
-                # N0, alpha, Ec = theta
-                if -15 < N0 < -7 and 1.0 < alpha < 4.0 and 3.0 < Ec < 7.0:
-                    return 0.0
-                return -np.inf
-
-            def lnprior_PLEC_deMenezes(theta):
-                Sp, alpha, Ep, b = theta
-                if -8 < Sp < -1 and 0 < alpha < 4.0 and 2.0 < Ep < 7.0 and 0.01 < b < 3.0:
-                    return 0.0
-                return -np.inf
-
-            def lnprob(theta, x, y, yerr):
-                if self.comboBox_MCMC.currentText() == "LogPar":
-                    lp = lnprior_LogPar(theta)
-                elif self.comboBox_MCMC.currentText() == "LogPar_MTT":
-                    lp = lnprior_LogPar_MTT(theta)
-                elif self.comboBox_MCMC.currentText() == "PLEC":
-                    lp = lnprior_PLEC(theta)
-                elif self.comboBox_MCMC.currentText() == "PLEC_bfix":
-                    lp = lnprior_PLEC_bfix(theta)
-                elif self.comboBox_MCMC.currentText() == "PLEC_deMenezes":
-                    lp = lnprior_PLEC_deMenezes(theta)
-                elif self.comboBox_MCMC.currentText() == "PowerLaw":
-                    lp = lnprior_PowerLaw(theta)
-
-                if not np.isfinite(lp):
-                    return -np.inf
-                return lp + lnlike(theta, x, y, yerr)
-
-
-            if self.redshift > 0.0:
-                if self.comboBox_MCMC.currentText() == "LogPar_MTT" or self.comboBox_MCMC.currentText() == "PLEC_deMenezes":
-                    e2dnde_err = (1 / np.log(10)) * (1 / (dnde_data_points_deabsorbed*(Energy_SED**2))) * (dnde_error_deabsorbed*(Energy_SED**2))  # converting the errors to log scale
-                    data = (Energy_SED_deabsorbed_log, dnde_data_points_deabsorbed_log + 2*Energy_SED_deabsorbed_log, e2dnde_err)
-                else:
-                    data = (Energy_SED_deabsorbed_log, dnde_data_points_deabsorbed_log, dnde_error_deabsorbed_log)
-            else:
-                if self.comboBox_MCMC.currentText() == "LogPar_MTT" or self.comboBox_MCMC.currentText() == "PLEC_deMenezes":
-                    e2dnde_err = (1 / np.log(10)) * (1 / (dnde_SED*(Energy_SED**2))) * (dnde_err_SED*(Energy_SED**2))  # converting the errors to log scale
-                    data = (Energy_SED_log, dnde_data_points_log + 2*Energy_SED_log, e2dnde_err)
-                else:
-                    data = (Energy_SED_log, dnde_data_points_log, dnde_error_log)
-
-            nwalkers = 300
-            niter = 500
-            if self.comboBox_MCMC.currentText() == "LogPar":
-                initial = np.array([-13, 1.7, 0.2])
-            elif self.comboBox_MCMC.currentText() == "LogPar_MTT":
-                initial = np.array([-4.5, 0.2, 3.5])
-            elif self.comboBox_MCMC.currentText() == "PLEC":
-                initial = np.array([-13, 1.7, 5, 1])
-            elif self.comboBox_MCMC.currentText() == "PLEC_bfix":
-                initial = np.array([-13, 1.7, 5])
-            elif self.comboBox_MCMC.currentText() == "PLEC_deMenezes":
-                initial = np.array([-4, 1.7, 5, 1])
-            elif self.comboBox_MCMC.currentText() == "PowerLaw":
-                initial = np.array([-13, 2.0])
-
-            ndim = len(initial)
-            p0 = [
-                np.array(initial) + 0.3 * np.random.randn(ndim) for i in range(nwalkers)
-            ]  # p0 is the methodology of stepping from one place on a grid to the next.
-
-
-            def main(p0, nwalkers, niter, ndim, lnprob, data):
-                sampler = emcee.EnsembleSampler(nwalkers, ndim, lnprob, args=data)
-
-                print("Running burn-in...")
-                p0, _, _ = sampler.run_mcmc(p0, 100)
-                sampler.reset()
-
-                print("Running production...")
-                pos, prob, state = sampler.run_mcmc(p0, niter)
-
-                return sampler, pos, prob, state
-
-            sampler, pos, prob, state = main(p0, nwalkers, niter, ndim, lnprob, data)
-
-            # Setting the x limits:
-            xmin = np.log10(Energy_SED[0]-Energy_err_SED[0][0])
-            xmax = np.log10(Energy_SED[-1]+Energy_err_SED[1][-1])
-            
-            try:
-                xmin2 = np.log10(self.Energy_uplims[0]-self.xerr_uplims[0][0])
-                if xmin2 < xmin:
-                    xmin = xmin2
-            except:
-                pass
-            try:
-                xmax2 = np.log10(self.Energy_uplims[-1]+self.xerr_uplims[1][-1])
-                if xmax2 > xmax:
-                    xmax = xmax2
-            except:
-                pass
-
-            x = np.linspace(xmin, xmax, 1000)  # defining a high resolution x for the plots
-
-            # Saving MCMC parameters and data points corrected for EBL:
-            SED_file = glob.glob(self.OutputDir+"*_sed.fits")[0]
-            hdul = pyfits.open(SED_file)
-            if self.redshift > 0.0:
-                original_data_cols = hdul[1].data.columns
-                new_col_e2dnde_unabsorbed_data = pyfits.Column(name="e2dnde_EBL_corrected",array=e2dnde_all_data_unabsorbed,format="D",unit="cm-2 MeV s-1")
-                new_col_e2dnde_unabsorbed_errors = pyfits.Column(name="e2dnde_err_EBL_corrected",array=e2dnde_all_data_errors_unabsorbed,format="D",unit="cm-2 MeV s-1")
-                new_col_e2dnde_ul95_unabsorbed = pyfits.Column(name="e2dnde_ul95_EBL_corrected",array=e2dnde_all_ul95_unabsorbed,format="D",unit="cm-2 MeV s-1")                
-                all_cols = pyfits.BinTableHDU.from_columns(original_data_cols + new_col_e2dnde_unabsorbed_data + new_col_e2dnde_unabsorbed_errors + new_col_e2dnde_ul95_unabsorbed)
-                hdul[1].data = all_cols.data
-                hdul[1].name = "SED"
-
-                if self.white_box_VHE.text().split('.')[-1] == 'fits':
-                    
-                    VHE_col_energy = VHE["e_ref"] * 1000000  # in MeV
-                    VHE_col_energy = np.delete(VHE_col_energy, delete_nan_elements)
-                    VHE_absorption = absorption.evaluate(VHE_col_energy*u.MeV,self.redshift, alpha_norm=1)
-                    VHE_col_energy = pyfits.Column(name="energy",array= VHE_col_energy,format="D",unit="MeV")
-
-                    VHE_col_energy_min = VHE["e_min"] * 1000000
-                    VHE_col_energy_min = np.delete(VHE_col_energy_min, delete_nan_elements)
-                    VHE_col_energy_min = pyfits.Column(name="energy_min",array= VHE_col_energy_min,format="D",unit="MeV")
-
-                    VHE_col_energy_max = VHE["e_max"] * 1000000
-                    VHE_col_energy_max = np.delete(VHE_col_energy_max, delete_nan_elements)
-                    VHE_col_energy_max = pyfits.Column(name="energy_max",array= VHE_col_energy_max,format="D",unit="MeV")
-
-                    VHE_col_e2dnde = VHE["e2dnde"] * 1e6  # TeV cm-2 s-1 to MeV cm-2 s-1
-                    VHE_col_e2dnde = np.delete(VHE_col_e2dnde, delete_nan_elements)/VHE_absorption  # Correcting for EBL absorption
-                    VHE_col_e2dnde = pyfits.Column(name="e2dnde_VHE",array= VHE_col_e2dnde,format="D",unit="MeV cm-2 s-1")
-
-                    VHE_col_e2dnde_err = VHE["e2dnde_err"] * 1e6
-                    VHE_col_e2dnde_err = np.delete(VHE_col_e2dnde_err, delete_nan_elements)/VHE_absorption  # Correcting for EBL absorption
-                    VHE_col_e2dnde_err = pyfits.Column(name="e2dnde_VHE_err",array= VHE_col_e2dnde_err,format="D",unit="MeV cm-2 s-1")
-
-                    VHE_col_e2dnde_UL = VHE["e2dnde_ul"] * 1e6
-                    VHE_col_e2dnde_UL = np.delete(VHE_col_e2dnde_UL, delete_nan_elements)/VHE_absorption  # Correcting for EBL absorption
-                    VHE_col_e2dnde_UL = pyfits.Column(name="e2dnde_VHE_UL95",array= VHE_col_e2dnde_UL,format="D",unit="MeV cm-2 s-1")
-
-                    VHE_col_TS = VHE["ts"]
-                    VHE_col_TS = np.delete(VHE_col_TS, delete_nan_elements)
-                    VHE_col_TS = pyfits.Column(name="TS",array= VHE_col_TS,format="D")
-
-                    VHE_table_EBL = pyfits.BinTableHDU.from_columns([VHE_col_energy, VHE_col_energy_min, VHE_col_energy_max, VHE_col_e2dnde, VHE_col_e2dnde_err, VHE_col_e2dnde_UL, VHE_col_TS])
-
-            add_results = open(self.OutputDir+"Target_results.txt","a")
-            add_results.write("\n\nMCMC results:\n")
-            add_results.write("Model: "+self.comboBox_MCMC.currentText()+"\n")
-            samples = sampler.flatchain
-            theta_max = samples[np.argmax(sampler.flatlnprobability)]
-            self.AIC = 2*len(theta_max) - 2*lnlike(theta_max, data[0], data[1], data[2])  # Akaike information criterion
-
-            if self.comboBox_MCMC.currentText() == "LogPar":
-                best_fit_model = LogPar(theta_max, x)
-                N0 = np.quantile(samples[:,0],q=[0.16,0.5,0.84])
-                Alpha = np.quantile(samples[:,1],q=[0.16,0.5,0.84])
-                Beta = np.quantile(samples[:,2],q=[0.16,0.5,0.84])
-                add_results.write(f"N0 (log scale): {N0[1]} - {N0[1]-N0[0]} + {N0[2]-N0[1]}\n")
-                add_results.write(f"Alpha: {Alpha[1]} - {Alpha[1]-Alpha[0]} + {Alpha[2]-Alpha[1]}\n")
-                add_results.write(f"Beta: {Beta[1]} - {Beta[1]-Beta[0]} + {Beta[2]-Beta[1]}\n")
-                add_results.write(f"Akaike information criterion: {self.AIC}\n")
-                c1 = np.array(["N0 (log scale)","Alpha","Beta","Ep=Emin (log scale)", "Akaike_IC"])
-                c2 = np.array([N0[1],Alpha[1],Beta[1],np.log10(self.Emin),self.AIC])
-                c3 = np.array([N0[1]-N0[0],Alpha[1]-Alpha[0],Beta[1]-Beta[0],0,0])
-                c4 = np.array([N0[2]-N0[1],Alpha[2]-Alpha[1],Beta[2]-Beta[1],0,0])
-                c1 = pyfits.Column(name='Parameter', array=c1, format='22A')
-                c2 = pyfits.Column(name='Value', array=c2, format='D')
-                c3 = pyfits.Column(name='error_minus', array=c3, format='D')
-                c4 = pyfits.Column(name='error_plus', array=c4, format='D')
-                table_hdu = pyfits.BinTableHDU.from_columns([c1, c2, c3, c4])
-                c1_posterior = pyfits.Column(name='N0 distribution (log scale)', array=samples[:,0], format='D')
-                c2_posterior = pyfits.Column(name='Alpha distribution', array=samples[:,1], format='D')
-                c3_posterior = pyfits.Column(name='Beta distribution', array=samples[:,2], format='D')
-                table_hdu_posterior = pyfits.BinTableHDU.from_columns([c1_posterior, c2_posterior, c3_posterior])
-
-            elif self.comboBox_MCMC.currentText() == "LogPar_MTT":
-                best_fit_model = LogPar_MTT(theta_max, x)
-                N0 = np.quantile(samples[:,0],q=[0.16,0.5,0.84])
-                Alpha = np.quantile(samples[:,1],q=[0.16,0.5,0.84])
-                Ep = np.quantile(samples[:,2],q=[0.16,0.5,0.84])
-                add_results.write(f"N0 (log scale): {N0[1]} - {N0[1]-N0[0]} + {N0[2]-N0[1]}\n")
-                add_results.write(f"Alpha: {Alpha[1]} - {Alpha[1]-Alpha[0]} + {Alpha[2]-Alpha[1]}\n")
-                add_results.write(f"Ep (log scale): {Ep[1]} - {Ep[1]-Ep[0]} + {Ep[2]-Ep[1]}\n")
-                add_results.write(f"Akaike information criterion: {self.AIC}\n")
-                c1 = np.array(["N0 (log scale)","Alpha","Ep (log scale)", "Akaike_IC"])
-                c2 = np.array([N0[1],Alpha[1],Ep[1],self.AIC])
-                c3 = np.array([N0[1]-N0[0],Alpha[1]-Alpha[0],Ep[1]-Ep[0],0])
-                c4 = np.array([N0[2]-N0[1],Alpha[2]-Alpha[1],Ep[2]-Ep[1],0])
-                c1 = pyfits.Column(name='Parameter', array=c1, format='22A')
-                c2 = pyfits.Column(name='Value', array=c2, format='D')
-                c3 = pyfits.Column(name='error_minus', array=c3, format='D')
-                c4 = pyfits.Column(name='error_plus', array=c4, format='D')
-                table_hdu = pyfits.BinTableHDU.from_columns([c1, c2, c3, c4])
-                c1_posterior = pyfits.Column(name='N0 distribution (log scale)', array=samples[:,0], format='D')
-                c2_posterior = pyfits.Column(name='Alpha distribution', array=samples[:,1], format='D')
-                c3_posterior = pyfits.Column(name='Ep distribution', array=samples[:,2], format='D')
-                table_hdu_posterior = pyfits.BinTableHDU.from_columns([c1_posterior, c2_posterior, c3_posterior])
-
-            elif self.comboBox_MCMC.currentText() == "PLEC":
-                best_fit_model = PLEC(theta_max, x)
-                N0 = np.quantile(samples[:,0],q=[0.16,0.5,0.84])
-                Alpha = np.quantile(samples[:,1],q=[0.16,0.5,0.84])
-                Ec = np.quantile(samples[:,2],q=[0.16,0.5,0.84])
-                b = np.quantile(samples[:,3],q=[0.16,0.5,0.84])
-                add_results.write(f"N0 (log scale): {N0[1]} - {N0[1]-N0[0]} + {N0[2]-N0[1]}\n")
-                add_results.write(f"Alpha: {Alpha[1]} - {Alpha[1]-Alpha[0]} + {Alpha[2]-Alpha[1]}\n")
-                add_results.write(f"Ec: {Ec[1]} - {Ec[1]-Ec[0]} + {Ec[2]-Ec[1]}\n")
-                add_results.write(f"b: {b[1]} - {b[1]-b[0]} + {b[2]-b[1]}\n")
-                add_results.write(f"Akaike information criterion: {self.AIC}\n")
-                c1 = np.array(["N0 (log scale)","Alpha","Ec","b","Ep=Emin (log scale)", "Akaike_IC"])
-                c2 = np.array([N0[1],Alpha[1],Ec[1],b[1],np.log10(self.Emin),self.AIC])
-                c3 = np.array([N0[1]-N0[0],Alpha[1]-Alpha[0],Ec[1]-Ec[0],b[1]-b[0],0,0])
-                c4 = np.array([N0[2]-N0[1],Alpha[2]-Alpha[1],Ec[2]-Ec[1],b[2]-b[1],0,0])
-                c1 = pyfits.Column(name='Parameter', array=c1, format='22A')
-                c2 = pyfits.Column(name='Value', array=c2, format='D')
-                c3 = pyfits.Column(name='error_minus', array=c3, format='D')
-                c4 = pyfits.Column(name='error_plus', array=c4, format='D')
-                table_hdu = pyfits.BinTableHDU.from_columns([c1, c2, c3, c4])
-                c1_posterior = pyfits.Column(name='N0 distribution (log scale)', array=samples[:,0], format='D')
-                c2_posterior = pyfits.Column(name='Alpha distribution', array=samples[:,1], format='D')
-                c3_posterior = pyfits.Column(name='Ec distribution', array=samples[:,2], format='D')
-                c4_posterior = pyfits.Column(name='b distribution', array=samples[:,3], format='D')
-                table_hdu_posterior = pyfits.BinTableHDU.from_columns([c1_posterior, c2_posterior, c3_posterior, c4_posterior])
-            
-            elif self.comboBox_MCMC.currentText() == "PLEC_bfix":
-                best_fit_model = PLEC_bfix(theta_max, x)
-                N0 = np.quantile(samples[:,0],q=[0.16,0.5,0.84])
-                Alpha = np.quantile(samples[:,1],q=[0.16,0.5,0.84])
-                Ec = np.quantile(samples[:,2],q=[0.16,0.5,0.84])
-                add_results.write(f"N0 (log scale): {N0[1]} - {N0[1]-N0[0]} + {N0[2]-N0[1]}\n")
-                add_results.write(f"Alpha: {Alpha[1]} - {Alpha[1]-Alpha[0]} + {Alpha[2]-Alpha[1]}\n")
-                add_results.write(f"Ec: {Ec[1]} - {Ec[1]-Ec[0]} + {Ec[2]-Ec[1]}\n")
-                add_results.write("b: 1\n")
-                add_results.write(f"Akaike information criterion: {self.AIC}\n")
-                c1 = np.array(["N0 (log scale)","Alpha","Ec","b","Ep=Emin (log scale)", "Akaike_IC"])
-                c2 = np.array([N0[1],Alpha[1],Ec[1],1,np.log10(self.Emin),self.AIC])
-                c3 = np.array([N0[1]-N0[0],Alpha[1]-Alpha[0],Ec[1]-Ec[0],0,0,0])
-                c4 = np.array([N0[2]-N0[1],Alpha[2]-Alpha[1],Ec[2]-Ec[1],0,0,0])
-                c1 = pyfits.Column(name='Parameter', array=c1, format='22A')
-                c2 = pyfits.Column(name='Value', array=c2, format='D')
-                c3 = pyfits.Column(name='error_minus', array=c3, format='D')
-                c4 = pyfits.Column(name='error_plus', array=c4, format='D')
-                table_hdu = pyfits.BinTableHDU.from_columns([c1, c2, c3, c4])
-                c1_posterior = pyfits.Column(name='N0 distribution (log scale)', array=samples[:,0], format='D')
-                c2_posterior = pyfits.Column(name='Alpha distribution', array=samples[:,1], format='D')
-                c3_posterior = pyfits.Column(name='Ec distribution', array=samples[:,2], format='D')
-                table_hdu_posterior = pyfits.BinTableHDU.from_columns([c1_posterior, c2_posterior, c3_posterior])
-            
-            elif self.comboBox_MCMC.currentText() == "PLEC_deMenezes":
-                best_fit_model = PLEC_deMenezes(theta_max, x)
-                Sp = np.quantile(samples[:,0],q=[0.16,0.5,0.84])
-                Alpha = np.quantile(samples[:,1],q=[0.16,0.5,0.84])
-                Ep = np.quantile(samples[:,2],q=[0.16,0.5,0.84])
-                b = np.quantile(samples[:,3],q=[0.16,0.5,0.84])
-                add_results.write(f"Sp (log scale): {Sp[1]} - {Sp[1]-Sp[0]} + {Sp[2]-Sp[1]}\n")
-                add_results.write(f"Alpha: {Alpha[1]} - {Alpha[1]-Alpha[0]} + {Alpha[2]-Alpha[1]}\n")
-                add_results.write(f"Ep: {Ep[1]} - {Ep[1]-Ep[0]} + {Ep[2]-Ep[1]}\n")
-                add_results.write(f"b: {b[1]} - {b[1]-b[0]} + {b[2]-b[1]}\n")
-                add_results.write(f"Akaike information criterion: {self.AIC}\n")
-                c1 = np.array(["Sp (log scale)","Alpha","Ep","b", "Akaike_IC"])
-                c2 = np.array([Sp[1],Alpha[1],Ep[1],b[1],self.AIC])
-                c3 = np.array([Sp[1]-Sp[0],Alpha[1]-Alpha[0],Ep[1]-Ep[0],b[1]-b[0],0])
-                c4 = np.array([Sp[2]-Sp[1],Alpha[2]-Alpha[1],Ep[2]-Ep[1],b[2]-b[1],0])
-                c1 = pyfits.Column(name='Parameter', array=c1, format='22A')
-                c2 = pyfits.Column(name='Value', array=c2, format='D')
-                c3 = pyfits.Column(name='error_minus', array=c3, format='D')
-                c4 = pyfits.Column(name='error_plus', array=c4, format='D')
-                table_hdu = pyfits.BinTableHDU.from_columns([c1, c2, c3, c4])
-                c1_posterior = pyfits.Column(name='Sp distribution (log scale)', array=samples[:,0], format='D')
-                c2_posterior = pyfits.Column(name='Alpha distribution', array=samples[:,1], format='D')
-                c3_posterior = pyfits.Column(name='Ep distribution', array=samples[:,2], format='D')
-                c4_posterior = pyfits.Column(name='b distribution', array=samples[:,3], format='D')
-                table_hdu_posterior = pyfits.BinTableHDU.from_columns([c1_posterior, c2_posterior, c3_posterior, c4_posterior])
-
-            elif self.comboBox_MCMC.currentText() == "PowerLaw":
-                best_fit_model = PowerLaw(theta_max, x)
-                N0 = np.quantile(samples[:,0],q=[0.16,0.5,0.84])
-                Alpha = np.quantile(samples[:,1],q=[0.16,0.5,0.84])
-                add_results.write(f"N0 (log scale): {N0[1]} - {N0[1]-N0[0]} + {N0[2]-N0[1]}\n")
-                add_results.write(f"Alpha: {Alpha[1]} - {Alpha[1]-Alpha[0]} + {Alpha[2]-Alpha[1]}\n")
-                add_results.write(f"Akaike information criterion: {self.AIC}\n")
-                c1 = np.array(["N0 (log scale)","Alpha","Ep=Emin (log scale)", "Akaike_IC"])
-                c2 = np.array([N0[1],Alpha[1],np.log10(self.Emin),self.AIC])
-                c3 = np.array([N0[1]-N0[0],Alpha[1]-Alpha[0],0,0])
-                c4 = np.array([N0[2]-N0[1],Alpha[2]-Alpha[1],0,0])
-                c1 = pyfits.Column(name='Parameter', array=c1, format='22A')
-                c2 = pyfits.Column(name='Value', array=c2, format='D')
-                c3 = pyfits.Column(name='error_minus', array=c3, format='D')
-                c4 = pyfits.Column(name='error_plus', array=c4, format='D')
-                table_hdu = pyfits.BinTableHDU.from_columns([c1, c2, c3, c4])
-                c1_posterior = pyfits.Column(name='N0 distribution (log scale)', array=samples[:,0], format='D')
-                c2_posterior = pyfits.Column(name='Alpha distribution', array=samples[:,1], format='D')
-                table_hdu_posterior = pyfits.BinTableHDU.from_columns([c1_posterior, c2_posterior])
-
-            add_results.close()
-            hdul.append(table_hdu)
-            hdul[4].name = "MCMC Parameters"
-            hdul.append(table_hdu_posterior)
-            hdul[5].name = "MCMC Posterior dist."
-            if self.redshift > 0.0 and self.white_box_VHE.text().split('.')[-1] == 'fits':
-                hdul.append(VHE_table_EBL)
-                hdul[6].name = "VHE data corrected for EBL"
-
-            hdul.writeto(SED_file,overwrite=True)
-            hdul.close()
-
-
-            # Corner plot:
-            if self.comboBox_MCMC.currentText() == "LogPar":
-                labels = ["N0", "alpha", "beta"]
-            elif self.comboBox_MCMC.currentText() == "LogPar_MTT":
-                labels = ["Sp_log", "alpha", "Ep_log"]
-            elif self.comboBox_MCMC.currentText() == "PLEC":
-                labels = ["N0", "alpha", "Ec", "b"]
-            elif self.comboBox_MCMC.currentText() == "PLEC_bfix":
-                labels = ["N0", "alpha", "Ec"]
-            elif self.comboBox_MCMC.currentText() == "PLEC_deMenezes":
-                labels = ["Sp_log", "alpha", "Ep", "b"]
-            elif self.comboBox_MCMC.currentText() == "PowerLaw":
-                labels = ["N0", "alpha"]
-
-            corner.corner(
-                samples,
-                show_titles=True,
-                labels=labels,
-                plot_datapoints=True,
-                quantiles=[0.16, 0.5, 0.84],
-            )
-
-            plt.savefig(self.OutputDir+'Quickplot_MCMC_SED_pars.png',bbox_inches='tight')
-
-            # SED plot:
-            f = plt.figure(figsize=(6,5),dpi=250)
-            ax = f.add_subplot(1,1,1)
-            ax.xaxis.set_minor_locator(AutoMinorLocator(2))
-            ax.yaxis.set_minor_locator(AutoMinorLocator(2))
-            ax.tick_params(which='major', length=5, direction='in')
-            ax.tick_params(which='minor', length=2.5, direction='in',bottom=True, top=True, left=True, right=True)
-            ax.tick_params(bottom=True, top=True, left=True, right=True)
-            ax.grid(linestyle=':',which='both')
-
-
-            alpha_original_data = 1
-            color_original_data = "C0"
-            color_original_VHE_data = "C1"
-            if self.redshift > 0.0:
-                # Warnings:
-                if self.include_VHE:
-                    self.e2dnde_SED_warning = dnde_data_points_deabsorbed[:-N_bins_VHE][self.few_photons_warning > 0]
-                else:
-                    self.e2dnde_SED_warning = dnde_data_points_deabsorbed[self.few_photons_warning > 0]
-                # Plots:
-                plt.errorbar(Energy_SED, dnde_data_points_deabsorbed*(Energy_SED**2), xerr=Energy_err_SED, yerr=dnde_error_deabsorbed*(Energy_SED**2), color="C0", markeredgecolor="black", ecolor="black", zorder = 130, fmt="o", label="Fermi-LAT EBL corrected")
-                plt.errorbar(self.Energy_uplims, e2dnde_uplims_deabsorbed, xerr=self.xerr_uplims, yerr=yerr_uplims_deabsorbed, uplims=True, color="C0", markeredgecolor="black", ecolor="black", zorder = 130, fmt="o")
-                if len(self.energy_SED_warning) > 0.0:
-                    plt.plot(self.energy_SED_warning,self.e2dnde_SED_warning*(self.energy_SED_warning**2),"mo", zorder = 131,label="Less than 5 photons")
-                if self.include_VHE:
-                    plt.errorbar(Energy_SED[-N_bins_VHE:], dnde_data_points_deabsorbed[-N_bins_VHE:]*(Energy_SED[-N_bins_VHE:]**2), xerr=[Energy_err_SED[0][-N_bins_VHE:], Energy_err_SED[1][-N_bins_VHE:]], yerr=dnde_error_deabsorbed[-N_bins_VHE:]*(Energy_SED[-N_bins_VHE:]**2), color="C1", markeredgecolor="black", ecolor="black", zorder = 130, fmt="o", label="VHE EBL corrected")
-                    plt.errorbar(self.Energy_uplims[-N_bins_VHE_UL:], e2dnde_uplims_deabsorbed[-N_bins_VHE_UL:], xerr=[self.xerr_uplims[0][-N_bins_VHE_UL:], self.xerr_uplims[1][-N_bins_VHE_UL:]], yerr=yerr_uplims_deabsorbed[-N_bins_VHE_UL:], uplims=True, color="C1", markeredgecolor="black", ecolor="black", zorder = 130, fmt="o")
-                
-                alpha_original_data = 0.4
-                #color_original_data = "gray"
-                #color_original_VHE_data = "gray"
-
-            plt.errorbar(Energy_SED, dnde_SED*(Energy_SED**2), xerr=Energy_err_SED, yerr=dnde_err_SED*(Energy_SED**2), color=color_original_data, alpha = alpha_original_data, zorder = 120, fmt="o", label="Fermi-LAT")
-            if self.include_VHE:
-                plt.errorbar(Energy_SED[-N_bins_VHE:], dnde_SED[-N_bins_VHE:]*(Energy_SED[-N_bins_VHE:]**2), xerr=[Energy_err_SED[0][-N_bins_VHE:], Energy_err_SED[1][-N_bins_VHE:]], yerr=dnde_err_SED[-N_bins_VHE:]*(Energy_SED[-N_bins_VHE:]**2), color=color_original_VHE_data, alpha = alpha_original_data, zorder = 120, fmt="o", label="VHE instrument")
-            if self.redshift == 0.0:
-                if len(self.energy_SED_warning) > 0.0:
-                    plt.plot(self.energy_SED_warning,self.e2dnde_SED_warning,"mo", zorder = 131,label="Less than 5 photons")
-
-
-            plt.errorbar(self.Energy_uplims, self.e2dnde_uplims, xerr=self.xerr_uplims, yerr=self.yerr_uplims, uplims=True, color=color_original_data, alpha = alpha_original_data, zorder = 120, fmt="o")
-            if self.include_VHE:
-                plt.errorbar(self.Energy_uplims[-N_bins_VHE_UL:], self.e2dnde_uplims[-N_bins_VHE_UL:], xerr=[self.xerr_uplims[0][-N_bins_VHE_UL:], self.xerr_uplims[1][-N_bins_VHE_UL:]], yerr=self.yerr_uplims[-N_bins_VHE_UL:], uplims=True, color=color_original_VHE_data, alpha = alpha_original_data, zorder = 120, fmt="o")
-
-            plotter(sampler,x)
-
-            plt.plot(self.E, self.dnde*(self.E**2), color="gray",alpha=0.9, zorder = 119, label="Fermipy fit")
-            if self.comboBox_MCMC.currentText() == "LogPar_MTT" or self.comboBox_MCMC.currentText() == "PLEC_deMenezes":
-                plt.plot(10**x, 10 ** best_fit_model, color="black", zorder = 119, label="Highest Likelihood MCMC")
-            else:
-                plt.plot(10**x, 10 ** (2 * x + best_fit_model), color="black", zorder = 119, label="Highest Likelihood MCMC")
-
-            plt.xscale("log")
-            plt.yscale("log")
-            plt.xlabel("Energy [MeV]")
-            plt.ylabel("E$^2dN/dE$ [MeV cm$^{-2}$ s$^{-1}$]")
-            plt.title(self.sourcename+' - SED - MCMC - '+self.comboBox_MCMC.currentText())
-            plt.grid(which="both", linestyle=":")
-                
-            if len(dnde_SED) > 0:
-                ymax = 2*((dnde_SED + dnde_err_SED)*(Energy_SED**2)).max()
-                ymin = 0.5*((dnde_SED - dnde_err_SED)*(Energy_SED**2)).min()
-                if ymax > 4*(dnde_SED*(Energy_SED**2)).max():
-                    ymax = 4*(dnde_SED*(Energy_SED**2)).max()
-                
-                if self.redshift > 0.0:
-                    EBL_corrected_max = 2*np.max(dnde_data_points_deabsorbed*(Energy_SED**2) + dnde_error_deabsorbed*(Energy_SED**2))
-                    if EBL_corrected_max > ymax:
-                        ymax = EBL_corrected_max
-
-                if ymin < (dnde_SED*(Energy_SED**2)).min()/5.0:
-                    ymin = (dnde_SED*(Energy_SED**2)).min()/5.0
-                    
-                if len(self.e2dnde_uplims) > 0:
-                    if self.redshift > 0.0:
-                        yaux = e2dnde_uplims_deabsorbed.max()
-                    else:
-                        yaux = self.e2dnde_uplims.max()
-                    if yaux > ymax:
-                        ymax = 2*yaux
-                        
-                    yaux = self.e2dnde_uplims.min()
-                    if yaux < ymin:
-                        ymin = 0.5*yaux
-            else:
-                ymax = 2*self.e2dnde_uplims.max()
-                ymin = 0.5*self.e2dnde_uplims.min()
-                
-            
-            plt.ylim(ymin,ymax)
-            plt.xlim(0.8 * 10**x.min(),1.2 * 10**x.max())
-            plt.legend(fontsize=11)
-            plt.tight_layout()
-            plt.savefig(self.OutputDir+'Quickplot_SED_MCMC.'+self.comboBox_output_format.currentText(),bbox_inches='tight')
-
-
-    def compute_Extension(self):
-
-        """This function searches for extended gamma-ray emission from the target. It can use a disk or a 2D Gaussian model.
-
-        Parameters
-        ----------
-        self: instance of the class Ui_mainWindow
-            This parameter contains all the variables read from the Graphical interface.
-
-        Returns
-        -------
-        TARGET_NAME_ext.fits
-            Table containing the extendend emission fit results. File is saved in the output directory read from the graphical interface.
-        TARGET_NAME_ext.npy:
-            Same as above but in the npy format.
-        Quickplot_extension.png or Quickplot_extension.pdf:
-            A plot for quick visualization of the extension radius. File is saved in the output directory read from the graphical interface.
-
-        """
-
-        output_format = self.comboBox_output_format.currentText()
-
-        #Extension:    
-        if self.checkBox_extension.isChecked():
-            self.gta.config['extension']['width_min'] = 0.01
-            if self.radioButton_disk.isChecked(): 
-                exten = self.gta.extension(self.sourcename,width=np.linspace(0.01,self.doubleSpinBox_extension_max_size.value(),20).tolist(), spatial_model='RadialDisk')
-            else:
-                exten = self.gta.extension(self.sourcename,width=np.linspace(0.01,self.doubleSpinBox_extension_max_size.value(),20).tolist(), spatial_model='RadialGaussian')
-                
-            self.gta.write_roi(self.sourcename+'_extension')            
-            f = plt.figure(figsize=(6,5),dpi=250)
-            ax = f.add_subplot(1,1,1)
-            ax.xaxis.set_minor_locator(AutoMinorLocator(2))
-            ax.yaxis.set_minor_locator(AutoMinorLocator(2))
-            ax.tick_params(which='major', length=5, direction='in')
-            ax.tick_params(which='minor', length=2.5, direction='in',bottom=True, top=True, left=True, right=True)
-            ax.tick_params(bottom=True, top=True, left=True, right=True)
-            ax.grid(linestyle=':',which='both')
-            
-            plt.plot(exten['width'],exten['dloglike'],marker='o', markeredgecolor='black')
-            plt.grid(linestyle=':',which='both')
-            plt.gca().set_xlabel('Radius [$^{\circ}$]')
-            plt.gca().set_ylabel('Delta Log-Likelihood')
-            plt.gca().axvline(exten['ext'], color='black', label='Extension radius')
-            plt.gca().axvspan(exten['ext']-exten['ext_err_lo'],exten['ext']+exten['ext_err_hi'], alpha=0.2,color='b')
-
-            plt.annotate(' TS$_{\mathrm{ext}}$ = %.2f\n R$_{68}$ = %.3f $\pm$ %.3f'%
-                (exten['ts_ext'],exten['ext'],exten['ext_err']),xy=(0.05,0.05),xycoords='axes fraction')
-            plt.gca().legend(frameon=False)
-            plt.title(self.sourcename+' - Extension')
-            plt.tight_layout()
-            plt.savefig(self.OutputDir+'Quickplot_extension.'+output_format,bbox_inches='tight')
-
-
-    def compute_LC(self):
-        
-        """
-        This function calls fermipy to compute the target light curve (under request by the user).
-        
-        Parameters
-        ----------
-        self: instance of the class Ui_mainWindow
-            This parameter contains all the variables read from the Graphical interface.
-
-        Returns
-        -------
-        TARGET_NAME_lightcurve.fits and TARGET_NAME_lightcurve.npy:
-            Data files with all the information regarding the energy-flux and photon-flux light curves.
-            
-        """
-        
-        self.Compute_LC = True   
-
-        if os.path.exists(self.OutputDir+"Light_curve_001"):
-            last_LC_directory = np.sort(glob.glob(self.OutputDir+"Light_curve_*"))[-1]
-            last_number_of_bins = np.sort(glob.glob(last_LC_directory+"/lightcurve_*"))
-            if len(last_number_of_bins) == self.spinBox_LC_N_time_bins.value():
-                self.Compute_LC = False
-
-
-            
-        if self.checkBox_LC.isChecked() and self.Compute_LC:
-            #Running the LC in parallel cores is possible only in Linux systems:
-            if OS_name != "Darwin":
-                self.gta.lightcurve(self.sourcename, nbins=self.spinBox_LC_N_time_bins.value(), free_radius=self.freeradius,use_local_ltcube=True, use_scaled_srcmap=True, free_params=['norm','shape'], shape_ts_threshold=9, multithread=True, nthread=self.spinBox_N_cores_LC.value())
-            else:
-                self.gta.lightcurve(self.sourcename, nbins=self.spinBox_LC_N_time_bins.value(), free_radius=self.freeradius,use_local_ltcube=True, use_scaled_srcmap=True, free_params=['norm','shape'], shape_ts_threshold=9, multithread=False)
-            
-            if not os.path.exists(self.OutputDir+"Light_curve_001"):
-                os.mkdir(self.OutputDir+"Light_curve_001")
-                os.system(f"mv {self.OutputDir}*lightcurve* {self.OutputDir}Light_curve_001")
-            else:
-                last_LC = int(np.sort(glob.glob(self.OutputDir+"Light_curve_*"))[-1].split("_")[-1]) + 1  # Taking the number corresponding to the last light curve computed and adding 1
-                last_LC = "{:03d}".format(last_LC)
-                os.mkdir(self.OutputDir+f"Light_curve_{last_LC}")
-                os.system(f"mv {self.OutputDir}*lightcurve* {self.OutputDir}Light_curve_{last_LC}")
-
-
-    def compute_LC_adaptive(self):
-        
-        """
-        This function calls fermipy to compute the target light curve with adaptive binning.
-        
-        Parameters
-        ----------
-        self: instance of the class Ui_mainWindow
-            This parameter contains all the variables read from the Graphical interface.
-
-        Returns
-        -------
-        Adaptive-binning_lightcurve.fits:
-            Data file with all the information regarding the energy-flux and photon-flux adaptive-binning light curves.
-            
-        """
-        
-        
-        if self.checkBox_adaptive_binning.isChecked() and self.checkBox_LC.isChecked():
-            try:
-                TS_Threshold = float(self.white_box_TS_threshold.text())
-                if TS_Threshold > 0.0:
-                    self.adaptive = True
-            except:
-                print("Invalid TS threshold value.")
-        else:
-            self.adaptive = False
-
-
-        if self.adaptive:
-
-            Adaptive_binning_LC_tables = {}
-
-            if os.path.exists(self.OutputDir+"Adaptive-binning_light_curve_001"):
-                last_LC_directory = np.sort(glob.glob(self.OutputDir+"Adaptive-binning_light_curve_*"))[-1]
-            else:
-                last_LC_directory = np.sort(glob.glob(self.OutputDir+"Light_curve_*"))[-1]
-
-            last_LC_bins_directories = np.sort(glob.glob(last_LC_directory+"/lightcurve_*"))
-
-            LC_last_data_file = glob.glob(last_LC_directory+"/*_lightcurve.fits")[0]
-            hdul = pyfits.open(LC_last_data_file)
-            TS_at_each_time_bin = hdul[1].data["ts"]
-            High_TS_bins = np.where(TS_at_each_time_bin > 2*TS_Threshold)[0]
-            if len(High_TS_bins) > 0:
-                for high_TS_index in High_TS_bins:
-                    number_of_subBins = int(TS_at_each_time_bin[high_TS_index]/TS_Threshold)
-                    if number_of_subBins > 1:
-                        os.chdir(last_LC_bins_directories[high_TS_index])  # Here we enter in the directory of each LC bin with TS > 2*TS_Threshold
-                        stream = open("./config.yaml", 'r')
-                        data = yaml.load(stream,Loader)
-                        data["fileio"]["workdir"] = "./"
-                        data["fileio"]["outdir"] = "./Output"
-                        data["fileio"]["logfile"] = "./Output"
-                        data["components"][0]["gtlike"]["srcmap_base"] = "./srcmap_00.fits"
-                        data["components"][0]["gtlike"]["bexpmap_roi_base"] = "./bexpmap_roi_00.fits"
-                        data["components"][0]["gtlike"]["bexpmap_base"] = "./bexpmap_00.fits"
-                        data["components"][0]["data"]["evfile"] = "./ft1_00.fits"
-                        with open("./config.yaml", 'w') as yaml_file:
-                            yaml_file.write( yaml.dump(data, default_flow_style=False))
-
-                        gta = GTAnalysis("./config.yaml",logging={'verbosity': 3})
-                        gta.setup()
-                        if OS_name != "Darwin":
-                            gta.lightcurve(self.sourcename, nbins=number_of_subBins, free_radius=self.roiwidth/2,use_local_ltcube=True, 
-                                                     use_scaled_srcmap=True, free_params=['norm','shape'], shape_ts_threshold=9, multithread=True, nthread=self.spinBox_N_cores_LC.value())
-                        else:
-                            gta.lightcurve(self.sourcename, nbins=number_of_subBins, free_radius=self.roiwidth/2,use_local_ltcube=True, use_scaled_srcmap=True, free_params=['norm','shape'], shape_ts_threshold=9, multithread=False)
-                        
-                        os.chdir(Working_directory)
-
-                # Here we copy/move the adaptive bins to the Adaptive-binning_light_curve directory, leaving a copy of the standard LC files in the Light_curve_XXX directory.
-                if not os.path.exists(self.OutputDir+"Adaptive-binning_light_curve_001"):
-                    os.mkdir(self.OutputDir+"Adaptive-binning_light_curve_001")
-                    last_adaptive_LC = "{:03d}".format(1)
-                    for n,new_lc_bins in enumerate(last_LC_bins_directories):
-                        if n in High_TS_bins:
-                            os.system(f"mv {new_lc_bins}/Output/lightcurve_* {self.OutputDir}Adaptive-binning_light_curve_001")
-                            local_lc_table = glob.glob(f"{new_lc_bins}/Output/*_lightcurve.fits")[0]
-                            Adaptive_binning_LC_tables[n] = Table.read(local_lc_table,format="fits", hdu=1)
-                        else:
-                            os.system(f"cp -r {new_lc_bins} {self.OutputDir}Adaptive-binning_light_curve_001")
-                            local_lc_table = glob.glob(f"{last_LC_directory}/*_lightcurve.fits")[0]
-                            Adaptive_binning_LC_tables[n] = Table.read(local_lc_table,format="fits", hdu=1)[n]
-                else:
-                    last_adaptive_LC = int(np.sort(glob.glob(self.OutputDir+"Adaptive-binning_light_curve_*"))[-1].split("_")[-1]) + 1  # Taking the number corresponding to the last adaptive binning light curve computed and adding 1
-                    last_adaptive_LC = "{:03d}".format(last_adaptive_LC)
-                    os.mkdir(self.OutputDir+f"Adaptive-binning_light_curve_{last_adaptive_LC}")
-                    for n,new_lc_bins in enumerate(last_LC_bins_directories):
-                        if n in High_TS_bins:
-                            os.system(f"mv {new_lc_bins}/Output/lightcurve_* {self.OutputDir}Adaptive-binning_light_curve_{last_adaptive_LC}")
-                            local_lc_table = glob.glob(f"{new_lc_bins}/Output/*_lightcurve.fits")[0]
-                            Adaptive_binning_LC_tables[n] = Table.read(local_lc_table,format="fits", hdu=1)
-                        else:
-                            os.system(f"mv {new_lc_bins} {self.OutputDir}Adaptive-binning_light_curve_{last_adaptive_LC}")
-                            local_lc_table = glob.glob(f"{last_LC_directory}/*_lightcurve.fits")[0]
-                            Adaptive_binning_LC_tables[n] = Table.read(local_lc_table,format="fits", hdu=1)[n]
-                
-                
-                # Saving the final table with the adaptive-binning LC:
-                final_table = Adaptive_binning_LC_tables[0]
-                for n in range((len(Adaptive_binning_LC_tables) - 1)):
-                    final_table = vstack([final_table,Adaptive_binning_LC_tables[n+1]])
-
-                final_table
-                final_table.write(f"{self.OutputDir}Adaptive-binning_light_curve_{last_adaptive_LC}/Adaptive-binning_lightcurve.fits", format="fits",overwrite=True)
-                
-
-
-            else:
-                print(f"No time bins with TS > 2x{TS_Threshold}. Current iteration of adaptive binning LC was not performed.")
-
-
-    def plot_LCs(self,adaptive):
-
-        """
-        This function plots the latest light curves computed.
-        
-        Parameters
-        ----------
-        self: instance of the class Ui_mainWindow
-            This parameter contains all the variables read from the Graphical interface.
-
-        Returns
-        -------
-        Quickplot_adaptive_LC.pdf and Quickplot_adaptive_eLC.pdf:
-            Plots showing the flux light curve and the energy flux light curve. File is saved in the output directory read from the graphical interface.
-
-            
-        """
-
-        # Checking if there is something to plot:
-        if adaptive:
-            if os.path.exists(self.OutputDir+"Adaptive-binning_light_curve_001"):
-                last_LC_directory = np.sort(glob.glob(self.OutputDir+"Adaptive-binning_light_curve_*"))[-1]
-                we_can_plot = True
-            else:
-                we_can_plot = False
-        else:
-            if os.path.exists(self.OutputDir+"Light_curve_001"):
-                last_LC_directory = np.sort(glob.glob(self.OutputDir+"Light_curve_*"))[-1]
-                we_can_plot = True
-            else:
-                we_can_plot = False
-
-
-        # Reading the data and plotting:
-        if we_can_plot and self.checkBox_LC.isChecked():
-
-            TSmin = 9
-            output_format = self.comboBox_output_format.currentText() 
-
-            LC_last_data_file = glob.glob(last_LC_directory+"/*_lightcurve.fits")[0]
-            hdul = pyfits.open(LC_last_data_file)
-            lc = hdul[1].data
-
-            ################################################
-            ########## LC energy flux
-            ################################################
-            f = plt.figure(figsize=(9,4),dpi=250)
-            ax = f.add_subplot(1,1,1)
-            ax.xaxis.set_minor_locator(AutoMinorLocator(2))
-            ax.yaxis.set_minor_locator(AutoMinorLocator(2))
-            ax.tick_params(which='major', length=5, direction='in')
-            ax.tick_params(which='minor', length=2.5, direction='in',bottom=True, top=True, left=True, right=True)
-            ax.tick_params(bottom=True, top=True, left=True, right=True)
-            ax.grid(linestyle=':',which='both')
-
-            
-            if len(lc['eflux'][lc['ts']>TSmin]) > 0:
-                scale = int(np.log10(lc['eflux'][lc['ts']>TSmin].max())) -2
-            else:
-                scale = int(np.log10(lc['eflux_ul95'].max())) -2
-                
-            tmean = (lc['tmin_mjd'] + lc['tmax_mjd'])/2
-
-
-            if len(tmean[lc['ts']>TSmin]) > 9:
-                time_continuum = np.linspace(np.min(lc['tmin_mjd']),np.max(lc['tmax_mjd']),10*len(lc['tmin_mjd']))
-                tck_eflux = interpolate.splrep(tmean[lc['ts']>TSmin], (10**-scale)*lc['eflux'][lc['ts']>TSmin], k=3)
-                tck_eflux_error = interpolate.splrep(tmean[lc['ts']>TSmin], (10**-scale)*lc['eflux_err'][lc['ts']>TSmin],k=3)
-
-                eflux_continuum = interpolate.splev(time_continuum, tck_eflux)
-                eflux_continuum_err = interpolate.splev(time_continuum, tck_eflux_error)
-                ax.plot(time_continuum,eflux_continuum,color="C1", label="Spline")
-                
-                # Saving Spline
-                col_time = pyfits.Column(name="time [MJD]",array=time_continuum,format="D",unit="MJD")
-                col_eflux = pyfits.Column(name="eflux_continuum",array=eflux_continuum,format="D",unit="10^"+str(scale)+" MeV cm-2 s-1")
-                col_eflux_err = pyfits.Column(name="eflux_err_continuum",array=eflux_continuum_err,format="D",unit="10^"+str(scale)+" MeV cm-2 s-1")
-
-            plt.errorbar(tmean[lc['ts']>TSmin], (10**-scale)*lc['eflux'][lc['ts']>TSmin], xerr = [ tmean[lc['ts']>TSmin]- lc['tmin_mjd'][lc['ts']>TSmin], lc['tmax_mjd'][lc['ts']>TSmin] - tmean[lc['ts']>TSmin] ], yerr=(10**-scale)*lc['eflux_err'][lc['ts']>TSmin], markeredgecolor='black', fmt='o', capsize=4)
-            plt.errorbar(tmean[lc['ts']<=TSmin], (10**-scale)*lc['eflux_ul95'][lc['ts']<=TSmin], xerr = [ tmean[lc['ts']<=TSmin]- lc['tmin_mjd'][lc['ts']<=TSmin], lc['tmax_mjd'][lc['ts']<=TSmin] - tmean[lc['ts']<=TSmin] ], yerr=5*np.ones(len(lc['eflux_err'][lc['ts']<=TSmin])), markeredgecolor='black', fmt='o', uplims=True, color='orange', capsize=4)
-            plt.ylabel(r'Energy flux [$10^{'+str(scale)+'}$ MeV cm$^{-2}$ s$^{-1}$]')
-            plt.xlabel('Time [MJD]')
-            plt.title(self.sourcename+' - Energy light curve (free shape)')
-            
-            
-            if len(lc['eflux'][lc['ts']>TSmin]) > 0:
-                y0 = (lc['eflux'][lc['ts']>TSmin]).max()
-                y1 = (lc['eflux'][lc['ts']>TSmin] + lc['eflux_err'][lc['ts']>TSmin]).max()
-                if y1 > 4*y0:
-                    y1 = 4*y0
-                
-                if len(lc['eflux_ul95'][lc['ts']<=TSmin]) > 0:
-                    y2 = (lc['eflux_ul95'][lc['ts']<=TSmin]).max()
-                    if y2 > y1:
-                        y1 = y2
-                
-            else:
-                y1 = (lc['eflux_ul95'][lc['ts']<=TSmin]).max()
-                
-            ymin = -(10**-scale)*0.1*y1
-            plt.ylim(ymin,(10**-scale)*1.1*y1)
-            plt.legend()
-            if adaptive:
-                plt.savefig(self.OutputDir+f'Quickplot_adaptive-binning_eLC_{len(lc["ts"])}_bins.'+output_format,bbox_inches='tight')
-            else:
-                plt.savefig(self.OutputDir+f'Quickplot_eLC_{len(lc["ts"])}_bins.'+output_format,bbox_inches='tight')
-            
-
-            ################################################
-            ########## LC photon flux
-            ################################################
-            f = plt.figure(figsize=(9,4),dpi=250)
-            ax = f.add_subplot(1,1,1)
-            ax.xaxis.set_minor_locator(AutoMinorLocator(2))
-            ax.yaxis.set_minor_locator(AutoMinorLocator(2))
-            ax.tick_params(which='major', length=5, direction='in')
-            ax.tick_params(which='minor', length=2.5, direction='in',bottom=True, top=True, left=True, right=True)
-            ax.tick_params(bottom=True, top=True, left=True, right=True)
-            ax.grid(linestyle=':',which='both')
-            
-            if len(lc['flux'][lc['ts']>TSmin]) > 0:
-                scale = int(np.log10(lc['flux'][lc['ts']>TSmin].max())) -2
-            else:
-                scale = int(np.log10(lc['flux_ul95'].max())) -2
-            
-            if len(tmean[lc['ts']>TSmin]) > 9:
-                tck_flux = interpolate.splrep(tmean[lc['ts']>TSmin], (10**-scale)*lc['flux'][lc['ts']>TSmin], k=3)
-                tck_flux_error = interpolate.splrep(tmean[lc['ts']>TSmin], (10**-scale)*lc['flux_err'][lc['ts']>TSmin],k=3)
-
-                flux_continuum = interpolate.splev(time_continuum, tck_flux)
-                flux_continuum_err = interpolate.splev(time_continuum, tck_flux_error)
-                ax.plot(time_continuum,flux_continuum,color="C1", label="Spline")
-                
-                col_flux = pyfits.Column(name="flux_continuum",array=flux_continuum,format="D",unit="10^"+str(scale)+" ph cm-2 s-1")
-                col_flux_err = pyfits.Column(name="flux_err_continuum",array=flux_continuum_err,format="D",unit="10^"+str(scale)+" ph cm-2 s-1")
-                all_cols = pyfits.BinTableHDU.from_columns([col_time, col_eflux, col_eflux_err, col_flux, col_flux_err])
-                if len(hdul) < 3: 
-                    hdul.append(all_cols)
-                    hdul[2].name = "LC spline data"
-                    hdul.writeto(LC_last_data_file,overwrite=True)
-                    hdul.close()                
-
-                
-            plt.errorbar(tmean[lc['ts']>TSmin], (10**-scale)*lc['flux'][lc['ts']>TSmin], xerr = [ tmean[lc['ts']>TSmin]- lc['tmin_mjd'][lc['ts']>TSmin], lc['tmax_mjd'][lc['ts']>TSmin] - tmean[lc['ts']>TSmin] ], yerr=(10**-scale)*lc['flux_err'][lc['ts']>TSmin], markeredgecolor='black', fmt='o', capsize=4)
-            plt.errorbar(tmean[lc['ts']<=TSmin], (10**-scale)*lc['flux_ul95'][lc['ts']<=TSmin], xerr = [ tmean[lc['ts']<=TSmin]- lc['tmin_mjd'][lc['ts']<=TSmin], lc['tmax_mjd'][lc['ts']<=TSmin] - tmean[lc['ts']<=TSmin] ], yerr=5*np.ones(len(lc['flux_err'][lc['ts']<=TSmin])), markeredgecolor='black', fmt='o', uplims=True, color='orange', capsize=4)
-            plt.ylabel(r'Flux [$10^{'+str(scale)+'}$ cm$^{-2}$ s$^{-1}$]')
-            plt.xlabel('Time [MJD]')
-            plt.title(self.sourcename+' - Light curve (free shape)')
-            
-            
-            if len(lc['flux'][lc['ts']>TSmin]) > 0:
-                y0 = (lc['flux'][lc['ts']>TSmin]).max()
-                y1 = (lc['flux'][lc['ts']>TSmin] + lc['flux_err'][lc['ts']>TSmin]).max()
-                if y1 > 4*y0:
-                    y1 = 4*y0
-                
-                if len(lc['flux_ul95'][lc['ts']<=TSmin]) > 0:
-                    y2 = (lc['flux_ul95'][lc['ts']<=TSmin]).max()
-                    if y2 > y1:
-                        y1 = y2
-                
-            else:
-                y1 = (lc['flux_ul95'][lc['ts']<=TSmin]).max()
-            
-            ymin = -(10**-scale)*0.1*y1               
-            plt.ylim(ymin,(10**-scale)*1.1*y1)
-            plt.legend()
-            
-            if adaptive:
-                plt.savefig(self.OutputDir+f'Quickplot_adaptive-binning_LC_{len(lc["ts"])}_bins.'+output_format,bbox_inches='tight')
-            else:
-                plt.savefig(self.OutputDir+f'Quickplot_LC_{len(lc["ts"])}_bins.'+output_format,bbox_inches='tight')
-
-    
-
-
-
-
-
-#if __name__ == "__main__":
-app = QtWidgets.QApplication(sys.argv)
-mainWindow = QtWidgets.QMainWindow()
-ui = Ui_mainWindow()
-ui.setupUi(mainWindow)
-mainWindow.show()
-sys.exit(app.exec_())
+def main():
 
+    """
+    Opens the easyfermi window.
+    """
 
+    # By default the analysis runs in a separate process. With "--in-thread" it runs in a thread of the easyfermi process, as in the previous versions.
+    in_thread = "--in-thread" in sys.argv
+    app = QtWidgets.QApplication([arg for arg in sys.argv if arg != "--in-thread"])
+    mainWindow = QtWidgets.QMainWindow()
+    ui = Ui_mainWindow()
+    ui.setupUi(mainWindow)
+    ui.run_in_subprocess = not in_thread
+    mainWindow.show()
+    sys.exit(app.exec_())
 
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+EBL absorption models bundled with easyfermi (resources/ebl).
+
+The tables are the same ones read by gammapy's EBLAbsorptionNormSpectralModel.read_builtin(), and they are interpolated
+in the same way (linear in redshift and in log(energy), on the log of the absorption, clipped to [0, 1]), but without importing gammapy.
+Each table is decompressed only once: the decoded grid is saved in ~/.easyfermi/ebl_cache (or in the directory given by
+the environment variable EASYFERMI_EBL_CACHE) and kept in memory, so that analyses of many targets and redshift scans
+do not parse the same gzipped FITS file again and again.
+"""
+
+import os
+from pathlib import Path
+import numpy as np
+import astropy.io.fits as pyfits
+
+
+EBL_DIRECTORY = Path(__file__).parent.resolve() / "resources" / "ebl"
+
+# Names used by gammapy for the bundled models and their files:
+EBL_FILES = {"dominguez": "ebl_dominguez11.fits.gz",
+             "franceschini": "ebl_franceschini.fits.gz",
+             "franceschini17": "ebl_franceschini_2017.fits.gz",
+             "saldana-lopez21": "ebl_saldana-lopez_2021.fits.gz",
+             "finke": "frd_abs.fits.gz"}
+
+TINY = np.finfo(np.float32).tiny  # Smallest absorption before taking the log, as in gammapy
+
+_memory_cache = {}
+
+
+def model_name(label):
+
+    """
+    Converts the name of an EBL model as shown in the easyfermi window (e.g. "Saldana-Lopez et al. (2021)") to the name used by gammapy.
+    """
+
+    author = label.split(" ")[0]
+    if author == "Dominguez":
+        return "dominguez"
+    elif author == "Franceschini":
+        if label.split(" ")[1] == "et":
+            return "franceschini"
+        return "franceschini17"
+    elif author == "Saldana-Lopez":
+        return "saldana-lopez21"
+
+    return "finke"
+
+
+def read_table(filename):
+
+    """
+    Reads an EBL table in the XSPEC format used by gammapy.
+
+    Returns
+    -------
+    redshift: numpy array
+        Redshift grid (duplicated values are removed).
+    energy: numpy array
+        Energy grid in MeV (log-center of the energy bins).
+    absorption: numpy array
+        Absorption factor exp(-tau), with shape (len(redshift), len(energy)).
+    """
+
+    with pyfits.open(filename) as hdul:
+        redshift, index = np.unique(np.array(hdul["PARAMETERS"].data["VALUE"][0], dtype=float), return_index=True)
+        energies = hdul["ENERGIES"].data
+        energy = np.sqrt(np.array(energies["ENERG_LO"], dtype=float)*np.array(energies["ENERG_HI"], dtype=float))/1000  # keV to MeV
+        absorption = np.array(hdul["SPECTRA"].data["INTPSPEC"], dtype=float)[index, :]
+
+    return redshift, energy, absorption
+
+
+class EBLAbsorption:
+
+    """
+    Absorption factor exp(-tau(E, z)) of an EBL model, interpolated on its (redshift, energy) grid.
+
+    Parameters
+    ----------
+    redshift, energy, absorption: numpy array
+        Grid of the model, as returned by read_table().
+
+    Examples
+    --------
+    >>> absorption = load("dominguez")
+    >>> absorption(np.array([1e5, 1e6]), 0.1)  # Energies in MeV
+    """
+
+    def __init__(self, redshift, energy, absorption):
+        self.redshift = redshift
+        self.energy = energy
+        self.absorption = absorption
+        self._log_energy = np.log(energy)
+        self._log_absorption = np.log(np.clip(absorption, TINY, None))
+
+
+    @staticmethod
+    def _bracket(grid, values):
+
+        """
+        Index of the grid node below each value and the linear weight of the node above. Outside the grid,
+        the first or last interval is used, i.e. the interpolation is linearly extrapolated (as in gammapy).
+        """
+
+        index = np.clip(np.searchsorted(grid, values) - 1, 0, len(grid) - 2)
+        weight = (values - grid[index])/(grid[index + 1] - grid[index])
+        return index, weight
+
+
+    def __call__(self, energy, redshift):
+
+        """
+        Evaluates the absorption factor.
+
+        Parameters
+        ----------
+        energy: float or numpy array
+            Energies in MeV.
+        redshift: float or numpy array
+            Redshifts. Arrays are broadcast against energy, e.g. redshift[:, None] and energy give a (redshift, energy) grid.
+
+        Returns
+        -------
+        absorption: float or numpy array
+            Fraction of the photons that are not absorbed by the EBL.
+        """
+
+        redshift, log_energy = np.broadcast_arrays(np.asarray(redshift, dtype=float), np.log(np.clip(np.asarray(energy, dtype=float), TINY, None)))
+        iz, wz = self._bracket(self.redshift, redshift)
+        ie, we = self._bracket(self._log_energy, log_energy)
+        table = self._log_absorption
+        log_absorption = ((1 - wz)*(1 - we)*table[iz, ie] + wz*(1 - we)*table[iz + 1, ie] +
+                          (1 - wz)*we*table[iz, ie + 1] + wz*we*table[iz + 1, ie + 1])
+
+        return np.clip(np.exp(log_absorption), 0, 1)  # The extrapolation outside the energy grid may exceed 1, gammapy clips it too
+
+
+def cache_directory():
+    return os.environ.get("EASYFERMI_EBL_CACHE", str(Path.home() / ".easyfermi" / "ebl_cache"))
+
+
+def load(name):
+
+    """
+    Returns the interpolator of one of the bundled EBL models, reading its table only the first time.
+
+    Parameters
+    ----------
+    name: str
+        Name of the model (a key of EBL_FILES) or its label in the easyfermi window.
+
+    Returns
+    -------
+    absorption: EBLAbsorption
+    """
+
+    if name not in EBL_FILES:
+        name = model_name(name)
+    if name in _memory_cache:
+        return _memory_cache[name]
+
+    filename = EBL_DIRECTORY / EBL_FILES[name]
+    stat = os.stat(filename)
+    cache_file = os.path.join(cache_directory(), f"{name}_{stat.st_size}_{int(stat.st_mtime)}.npz")
+    try:
+        with np.load(cache_file) as cached:
+            grid = (cached["redshift"], cached["energy"], cached["absorption"])
+    except (OSError, KeyError, ValueError):
+        grid = read_table(filename)
+        try:
+            os.makedirs(cache_directory(), exist_ok=True)
+            temporary_file = f"{cache_file}.{os.getpid()}.npz"  # Written apart and renamed, so parallel analyses never read a partial file
+            np.savez(temporary_file, redshift=grid[0], energy=grid[1], absorption=grid[2])
+            os.replace(temporary_file, cache_file)
+        except OSError:
+            pass  # Read-only home directory: the table is kept only in memory
+
+    _memory_cache[name] = EBLAbsorption(*grid)
+    return _memory_cache[name]
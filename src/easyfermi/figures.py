@@ -0,0 +1,111 @@
+"""
+Figure lifecycle of the easyfermi analysis.
+
+All the quick-look plots are drawn with the non-interactive Agg backend and every figure is closed as soon as it is saved,
+so that long sessions of the graphical interface, adaptive light curves and batch analyses do not accumulate open figures.
+Each step of the analysis runs inside managed_figures(), which closes any figure left open by the step and reports the
+peak memory used by the Agg render buffers of the figures.
+"""
+
+import sys
+from contextlib import contextmanager
+
+
+_peak_memory = {"step": 0, "session": 0}  # Peak figure memory (bytes) of the current step and of the whole process
+
+
+def import_pyplot():
+
+    """
+    Imports matplotlib.pyplot (only when the first plot is made) with the easyfermi default font size.
+    If pyplot was not imported before (e.g. by a notebook), the Agg backend is selected, since the plots are only saved to files.
+
+    Returns
+    -------
+    plt: module
+        The matplotlib.pyplot module.
+    """
+
+    if "matplotlib.pyplot" not in sys.modules:
+        import matplotlib
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    plt.rcParams.update({'font.size': 12})
+    return plt
+
+
+def figure_memory():
+
+    """
+    Returns the memory (in bytes) of the Agg render buffers held by the open figures, or 0 if pyplot was never imported.
+    A figure only holds a buffer after it was drawn to a raster format (e.g. saved as png), figures saved as pdf have none.
+    """
+
+    if "matplotlib.pyplot" not in sys.modules:
+        return 0
+
+    from matplotlib._pylab_helpers import Gcf  # Registry of the figures managed by pyplot (does not change the current figure)
+
+    memory = 0
+    for manager in Gcf.get_all_fig_managers():
+        renderer = getattr(manager.canvas, "renderer", None)  # Created by the first draw, get_renderer() would allocate one
+        if renderer is not None and hasattr(renderer, "buffer_rgba"):
+            memory += memoryview(renderer.buffer_rgba()).nbytes
+
+    return memory
+
+
+def _update_peak():
+    memory = figure_memory()
+    _peak_memory["step"] = max(_peak_memory["step"], memory)
+    _peak_memory["session"] = max(_peak_memory["session"], memory)
+
+
+def save_figure(path, **kwargs):
+
+    """
+    Saves the current figure (with bbox_inches='tight', as all the easyfermi plots) and closes it.
+    """
+
+    plt = import_pyplot()
+    figure = plt.gcf()
+    figure.savefig(path, bbox_inches='tight', **kwargs)
+    _update_peak()  # After drawing, before the buffer is released
+    plt.close(figure)
+
+
+@contextmanager
+def managed_figures(step):
+
+    """
+    Context manager closing the figures left open by one step of the analysis and reporting their peak memory.
+
+    Parameters
+    ----------
+    step: str
+        Name of the step, used in the report.
+    """
+
+    plt = sys.modules.get("matplotlib.pyplot")
+    open_before = set(plt.get_fignums()) if plt is not None else set()
+    _peak_memory["step"] = 0
+    try:
+        yield
+    finally:
+        _update_peak()
+        plt = sys.modules.get("matplotlib.pyplot")
+        if plt is not None:
+            for number in set(plt.get_fignums()) - open_before:
+                plt.close(number)
+        if _peak_memory["step"] > 0:
+            print(f"{step}: peak figure memory {_peak_memory['step']/1024**2:.1f} MB.")
+
+
+def peak_figure_memory():
+
+    """
+    Returns the peak memory (in bytes) used by the figures since the process started.
+    """
+
+    return _peak_memory["session"]
@@ -0,0 +1,584 @@
+"""
+Cache of livetime cubes shared by all easyfermi analyses.
+
+Computing a livetime cube (ltcube) takes ~206 s per day of data, but the ltcube only depends on the spacecraft file,
+the time interval, the zenith angle cut, the event type and the binning of the cube, not on the target. The class
+LtcubeCache stores every ltcube computed by easyfermi in a common directory, under a name given by the hash of these
+parameters, so any later analysis with the same parameters reuses it instead of recomputing it.
+
+The cache directory is ~/.easyfermi/ltcube_cache, or the directory given by the environment variable EASYFERMI_LTCUBE_CACHE
+(or by the setting ltcube_cache_directory). The cache has a maximum size (setting ltcube_cache_size, in GB): when it is exceeded,
+the least recently used ltcubes are deleted.
+
+Since the ltcube is additive in time, an ltcube missing in the cache for [t0, t2] can also be built from a cached ltcube for [t0, t1]
+plus a new ltcube computed only for [t1, t2] (see LtcubeCache.extend). This makes the daily re-analysis of monitored sources much faster.
+For the same reason, the ltcube of any time window can be built by summing weekly ltcubes ("tiles") kept in the cache, computing only
+the partial tiles at the edges of the window (see LtcubeCache.tiled).
+"""
+
+import os
+import math
+import time
+import hashlib
+import shutil
+import numpy as np
+from pathlib import Path
+import yaml
+from yaml import Loader
+
+
+# Default binning of the ltcube computed by fermipy (configuration section "ltcube").
+LTCUBE_BINSZ = 1.0
+LTCUBE_DCOSTHETA = 0.025
+
+# Data quality cut recommended for LAT analyses. It is used (with the Sun and Moon cuts) only when easyfermi writes a gtmktime filter:
+# by default, fermipy runs no gtmktime (selection.filter is None), and the ltcubes are then cached with filter=None.
+DATA_QUALITY_FILTER = "DATA_QUAL>0 && LAT_CONFIG==1"
+
+# Weekly tiles of ltcubes, counted from the beginning of the mission (2008-08-04 15:43:36 UTC).
+TILE_START = 239557417.0  # MET
+TILE_LENGTH = 7*86400.0  # s
+
+
+def tile_intervals(tmin, tmax):
+
+    """
+    Splits a time interval in weekly tiles.
+
+    Parameters
+    ----------
+    tmin, tmax: float
+        Time interval in MET.
+
+    Returns
+    -------
+    intervals: list
+        List of (start, stop, whole) covering [tmin, tmax], where "whole" is True for complete weekly tiles
+        and False for the partial tiles at the edges of the interval.
+    """
+
+    first_edge = TILE_START + math.ceil((tmin - TILE_START)/TILE_LENGTH)*TILE_LENGTH
+    last_edge = TILE_START + math.floor((tmax - TILE_START)/TILE_LENGTH)*TILE_LENGTH
+    if first_edge >= last_edge:
+        return [(tmin, tmax, False)]
+
+    intervals = []
+    if tmin < first_edge:
+        intervals.append((tmin, first_edge, False))
+    for start in np.arange(first_edge, last_edge, TILE_LENGTH):
+        intervals.append((float(start), float(start + TILE_LENGTH), True))
+    if last_edge < tmax:
+        intervals.append((last_edge, tmax, False))
+
+    return intervals
+
+
+def spacecraft_fingerprint(scfile, chunk_size=16*1024**2):
+
+    """
+    Computes the sha256 digest of the whole content of a spacecraft file. Since this takes a few seconds for the
+    full mission (hundreds of MB), LtcubeCache computes it only once per version of the file (see LtcubeCache.fingerprint).
+
+    Parameters
+    ----------
+    scfile: str
+        Path to the spacecraft file.
+
+    Returns
+    -------
+    fingerprint: str
+        Hexadecimal sha256 digest.
+    """
+
+    digest = hashlib.sha256()
+    with open(scfile, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class LtcubeCache:
+
+    """
+    Content-addressed cache of livetime cubes.
+
+    Each ltcube is saved as <key>.fits, where the key is the hash of the parameters of the ltcube, together
+    with <key>.yaml describing these parameters.
+
+    The last use of each ltcube is recorded as the modification time of its file, so that the least recently used
+    ltcubes are deleted first when the cache is larger than max_size (see LtcubeCache.evict).
+
+    Parameters
+    ----------
+    directory (optional): str
+        Cache directory. By default, the environment variable EASYFERMI_LTCUBE_CACHE or ~/.easyfermi/ltcube_cache.
+    max_size (optional): float
+        Maximum size of the cache, in GB. None means no limit.
+    """
+
+    FINGERPRINTS_FILE = "spacecraft_fingerprints.yaml"
+
+    def __init__(self, directory=None, max_size=None):
+        if directory is None or directory == "":
+            directory = os.environ.get("EASYFERMI_LTCUBE_CACHE", str(Path.home() / ".easyfermi" / "ltcube_cache"))
+        self.directory = str(directory)
+        self.max_size = max_size
+        self._fingerprints = {}
+
+
+    def fingerprint(self, scfile):
+
+        """
+        Returns the fingerprint of a spacecraft file (see spacecraft_fingerprint). The fingerprints are saved in the cache directory together with
+        the path, size and modification time of the files, so the whole file is hashed again only when it is modified (e.g. extended or reprocessed).
+        """
+
+        path = os.path.abspath(scfile)
+        stat = os.stat(path)
+        version = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+        if path in self._fingerprints and self._fingerprints[path][0] == version:
+            return self._fingerprints[path][1]
+
+        index_file = os.path.join(self.directory, self.FINGERPRINTS_FILE)
+        try:
+            with open(index_file, 'r') as f:
+                index = yaml.load(f, Loader) or {}
+        except (OSError, yaml.YAMLError):
+            index = {}
+
+        entry = index.get(path)
+        if entry is not None and entry.get("size") == version["size"] and entry.get("mtime") == version["mtime"]:
+            fingerprint = entry["sha256"]
+        else:
+            print(f"Computing the fingerprint of the spacecraft file {path}...")
+            fingerprint = spacecraft_fingerprint(path)
+            index[path] = dict(version, sha256=fingerprint)
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(index_file+f".{os.getpid()}.tmp", 'w') as f:
+                    yaml.dump(index, f, default_flow_style=False)
+                os.replace(index_file+f".{os.getpid()}.tmp", index_file)  # Other analyses running at the same time never read a partial file
+            except OSError:
+                pass  # Read-only cache: the fingerprint is computed again in the next analysis
+
+        self._fingerprints[path] = (version, fingerprint)
+        return fingerprint
+
+
+    def parameters(self, scfile, tmin, tmax, zmax, evtype, evclass=128, binsz=LTCUBE_BINSZ, dcostheta=LTCUBE_DCOSTHETA, filter=None):
+
+        """
+        Collects all the parameters defining an ltcube in a dictionary.
+
+        Parameters
+        ----------
+        scfile: str
+            Path to the spacecraft file.
+        tmin, tmax: float
+            Time interval in MET.
+        zmax: float
+            Maximum zenith angle.
+        evtype, evclass: int
+            Event type and event class of the selection.
+        binsz, dcostheta (optional): float
+            Binning of the ltcube.
+        filter (optional): str
+            gtmktime filter defining the good time intervals (e.g. with Sun and Moon cuts), exactly as written in the fermipy configuration.
+            None (the default of fermipy) means that gtmktime is not run.
+
+        Returns
+        -------
+        parameters: dict
+        """
+
+        return {"scfile": self.fingerprint(scfile), "tmin": int(tmin), "tmax": int(tmax), "zmax": float(zmax),
+                "evtype": int(evtype), "evclass": int(evclass), "binsz": float(binsz), "dcostheta": float(dcostheta), "filter": filter}
+
+
+    def key(self, parameters):
+
+        """
+        Returns the hash of the parameters of an ltcube (see LtcubeCache.parameters), used as its name in the cache.
+        """
+
+        text = ",".join(f"{name}={parameters[name]}" for name in sorted(parameters))
+        return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+
+    def lookup(self, parameters):
+
+        """
+        Returns the path to the cached ltcube with these parameters, or None if it is not in the cache.
+        """
+
+        path = os.path.join(self.directory, self.key(parameters)+".fits")
+        if os.path.exists(path):
+            self.touch(path)
+            return path
+
+        return None
+
+
+    def touch(self, path):
+
+        """
+        Marks a cached ltcube as used now (see LtcubeCache.evict).
+        """
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # Read-only cache or ltcube just evicted by another analysis
+
+
+    def store(self, parameters, ltcube_file, evict=True, coverage=None):
+
+        """
+        Copies an ltcube to the cache.
+
+        Parameters
+        ----------
+        parameters: dict
+            Parameters of the ltcube (see LtcubeCache.parameters).
+        ltcube_file: str
+            Path to the ltcube.
+        evict (optional): bool
+            If True, the least recently used ltcubes are deleted if the cache became larger than max_size.
+        coverage (optional): tuple
+            Time interval (MET) covered by the spacecraft and photon files used to compute the ltcube (see data_coverage).
+            It is saved with the parameters (but is not part of the key) and checked by LtcubeCache.find_extendable.
+
+        Returns
+        -------
+        path: str
+            Path to the cached ltcube.
+        """
+
+        os.makedirs(self.directory, exist_ok=True)
+        key = self.key(parameters)
+        path = os.path.join(self.directory, key+".fits")
+        if os.path.exists(path):
+            self.touch(path)
+            return path
+
+        # Copy to a temporary file first, so other analyses running at the same time never see an incomplete ltcube:
+        shutil.copyfile(ltcube_file, path+f".{os.getpid()}.tmp")
+        description = dict(parameters)
+        if coverage is not None:
+            description["coverage_start"], description["coverage_stop"] = float(coverage[0]), float(coverage[1])
+        with open(os.path.join(self.directory, key+".yaml"), 'w') as f:
+            yaml.dump(description, f, default_flow_style=False)
+        os.replace(path+f".{os.getpid()}.tmp", path)
+        if evict:
+            self.evict(keep=[path])
+
+        return path
+
+
+    def evict(self, keep=()):
+
+        """
+        Deletes the least recently used ltcubes until the cache is not larger than max_size.
+
+        Parameters
+        ----------
+        keep (optional): list
+            Paths to cached ltcubes that must not be deleted (e.g. the ltcube just stored).
+        """
+
+        if self.max_size is None or not os.path.isdir(self.directory):
+            return
+
+        cached = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".fits"):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue  # Deleted by another analysis
+                cached.append((stat.st_mtime, stat.st_size, os.path.join(self.directory, name)))
+
+        size = sum(entry[1] for entry in cached)
+        max_size = self.max_size*1024**3
+        keep = [os.path.abspath(path) for path in keep]
+        for last_use, file_size, path in sorted(cached):
+            if size <= max_size:
+                break
+            if os.path.abspath(path) in keep:
+                continue
+            print(f"Removing the ltcube {path} from the cache (last used {time.ctime(last_use)}).")
+            for cache_file in [path, path[:-5]+".yaml"]:
+                try:
+                    os.remove(cache_file)
+                except OSError:
+                    pass
+            size -= file_size
+
+
+    def entries(self):
+
+        """
+        Returns a list of (path to the cached ltcube, parameters) for all the ltcubes in the cache.
+        """
+
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(".yaml") and os.path.exists(os.path.join(self.directory, name[:-5]+".fits")):
+                with open(os.path.join(self.directory, name), 'r') as f:
+                    entries.append((os.path.join(self.directory, name[:-5]+".fits"), yaml.load(f, Loader)))
+
+        return entries
+
+
+    def find_extendable(self, parameters):
+
+        """
+        Looks for the cached ltcube that can be extended in time to obtain an ltcube with the given parameters,
+        i.e. the longest cached ltcube with the same tmin, zenith angle cut, event type, binning and filter, and with tmin < tmax_cached < tmax.
+        The spacecraft file is not compared, since the spacecraft data of past times do not change when the spacecraft file is extended,
+        but the cached ltcube must have been computed from data covering its whole time interval (coverage saved by LtcubeCache.store),
+        so that an ltcube built from an older or truncated spacecraft file is never extended. Ltcubes saved without coverage are not used.
+
+        Returns
+        -------
+        entry: tuple
+            Path to the cached ltcube and its parameters, or None if no cached ltcube can be extended.
+        """
+
+        same = ["tmin", "zmax", "evtype", "evclass", "binsz", "dcostheta", "filter"]
+        best = None
+        for path, cached in self.entries():
+            complete = cached.get("coverage_start", np.inf) <= cached["tmin"] and cached.get("coverage_stop", -np.inf) >= cached["tmax"]
+            if complete and all(cached.get(name) == parameters[name] for name in same) and parameters["tmin"] < cached["tmax"] < parameters["tmax"]:
+                if best is None or cached["tmax"] > best[1]["tmax"]:
+                    best = (path, cached)
+
+        return best
+
+
+    def extend(self, parameters, scfile, evfile, workdir):
+
+        """
+        Builds the ltcube with the given parameters from a cached ltcube covering the beginning of the time interval
+        (see find_extendable), computing a new ltcube only for the remaining time. The result is saved in the cache.
+
+        Parameters
+        ----------
+        parameters: dict
+            Parameters of the requested ltcube (see LtcubeCache.parameters).
+        scfile: str
+            Path to the spacecraft file.
+        evfile: str
+            Photon file, or list of photon files preceded by "@", covering the remaining time interval.
+        workdir: str
+            Directory for the temporary files.
+
+        Returns
+        -------
+        path: str
+            Path to the cached ltcube for the full time interval, or None if no cached ltcube could be extended or if the Fermitools failed.
+        """
+
+        entry = self.find_extendable(parameters)
+        if entry is None:
+            return None
+
+        cached_file, cached = entry
+        print(f"Extending the cached ltcube {cached_file} from MET {cached['tmax']} to {parameters['tmax']}.")
+        key = self.key(parameters)[:12]  # Different for each component (zenith angle cut and event type)
+        new_file = os.path.join(workdir, f"ltcube_extension_{key}_{cached['tmax']}_{parameters['tmax']}.fits")
+        summed_file = os.path.join(workdir, f"ltcube_{key}_{parameters['tmin']}_{parameters['tmax']}.fits")
+        try:
+            compute_ltcube(evfile, scfile, cached["tmax"], parameters["tmax"], parameters["zmax"], parameters["evclass"],
+                           parameters["evtype"], new_file, workdir, binsz=parameters["binsz"], dcostheta=parameters["dcostheta"], filter=parameters["filter"])
+            sum_ltcubes(cached_file, new_file, summed_file)
+        except RuntimeError as error:
+            print(f"The cached ltcube could not be extended: {error}")
+            return None
+
+        path = self.store(parameters, summed_file, coverage=(cached["coverage_start"], data_coverage(scfile, evfile)[1]))
+        for temporary_file in [new_file, summed_file]:
+            os.remove(temporary_file)
+
+        return path
+
+
+    def tiled(self, parameters, scfile, evfile, workdir):
+
+        """
+        Builds the ltcube with the given parameters by summing weekly ltcubes (tiles). Whole tiles are taken from the cache,
+        or computed and saved in the cache if missing, so that they can be reused by any other time window (flares, light curve bins etc).
+        Only the partial tiles at the edges of the time interval are computed and discarded. The result is saved in the cache.
+        A weekly tile is taken from or saved in the cache only if the spacecraft file and the photon files cover the whole week
+        (see data_coverage); otherwise it is computed from the available data and discarded, as a partial tile.
+
+        Parameters
+        ----------
+        parameters: dict
+            Parameters of the requested ltcube (see LtcubeCache.parameters).
+        scfile: str
+            Path to the spacecraft file.
+        evfile: str
+            Photon file, or list of photon files preceded by "@", covering the time interval.
+        workdir: str
+            Directory for the temporary files.
+
+        Returns
+        -------
+        path: str
+            Path to the cached ltcube, or None if the Fermitools failed.
+        """
+
+        intervals = tile_intervals(parameters["tmin"], parameters["tmax"])
+        if len(intervals) == 1:
+            return None  # Shorter than a tile: nothing to reuse
+
+        coverage_start, coverage_stop = data_coverage(scfile, evfile)
+        pieces = []
+        temporary_files = []
+        try:
+            for start, stop, whole in intervals:
+                piece = None
+                whole = whole and coverage_start <= start and stop <= coverage_stop
+                if whole:
+                    # Tiles do not depend on the spacecraft file, since the spacecraft data of past weeks do not change:
+                    tile_parameters = dict(parameters, scfile="weekly tile", tmin=int(start), tmax=int(stop))
+                    piece = self.lookup(tile_parameters)
+                if piece is None:
+                    piece = os.path.join(workdir, f"ltcube_tile_{self.key(parameters)[:12]}_{int(start)}_{int(stop)}.fits")
+                    compute_ltcube(evfile, scfile, start, stop, parameters["zmax"], parameters["evclass"], parameters["evtype"],
+                                   piece, workdir, binsz=parameters["binsz"], dcostheta=parameters["dcostheta"], filter=parameters["filter"])
+                    temporary_files.append(piece)
+                    if whole:
+                        piece = self.store(tile_parameters, piece, evict=False, coverage=(coverage_start, coverage_stop))  # Evicted only after the sum, so no tile of this window is deleted before it is used
+                pieces.append(piece)
+
+            print(f"Summing {len(pieces)} ltcube tiles.")
+            summed_file = pieces[0]
+            for n, piece in enumerate(pieces[1:]):
+                outfile = os.path.join(workdir, f"ltcube_tiles_sum_{self.key(parameters)[:12]}_{n}.fits")
+                sum_ltcubes(summed_file, piece, outfile)
+                temporary_files.append(outfile)
+                summed_file = outfile
+
+            path = self.store(parameters, summed_file, coverage=(coverage_start, coverage_stop))
+        except RuntimeError as error:
+            print(f"The ltcube could not be built from weekly tiles: {error}")
+            path = None
+        finally:
+            for temporary_file in temporary_files:
+                if os.path.exists(temporary_file):
+                    os.remove(temporary_file)
+
+        return path
+
+
+def data_coverage(scfile, evfile):
+
+    """
+    Returns the time interval (MET) covered by both the spacecraft file and the photon files, i.e. from the latest of their
+    first times to the earliest of their last times. Only the first and last rows of the spacecraft file and the headers of
+    the photon files (through photon_index) are read.
+
+    Parameters
+    ----------
+    scfile: str
+        Path to the spacecraft file.
+    evfile: str or list
+        Photon file, list of photon files preceded by "@", or list of paths to photon files.
+
+    Returns
+    -------
+    start, stop: float
+        Covered time interval in MET.
+    """
+
+    from .spacecraft import SpacecraftFile
+    from .photon_index import photon_files_index
+
+    with SpacecraftFile(scfile) as spacecraft_data:
+        start = float(spacecraft_data.data.field("START")[0])
+        stop = float(spacecraft_data.data.field("STOP")[-1])
+
+    if not isinstance(evfile, str):
+        photon_files = list(evfile)
+    elif evfile.startswith("@"):
+        with open(evfile[1:], 'r') as f:
+            photon_files = [line.strip() for line in f if line.strip() != ""]
+    else:
+        photon_files = [evfile]
+
+    summaries = list(photon_files_index(photon_files).values())
+    if len(summaries) == 0:
+        return start, start  # No photons: nothing is covered
+
+    return max(start, min(summary["tstart"] for summary in summaries)), min(stop, max(summary["tstop"] for summary in summaries))
+
+
+def run_fermitool(command):
+
+    """
+    Runs a command of the Fermitools and raises a RuntimeError if it fails.
+    """
+
+    if os.system(command) != 0:
+        raise RuntimeError(f"The command '{command}' failed.")
+
+
+def compute_ltcube(evfile, scfile, tmin, tmax, zmax, evclass, evtype, outfile, workdir, binsz=LTCUBE_BINSZ, dcostheta=LTCUBE_DCOSTHETA, filter=None):
+
+    """
+    Computes an all-sky ltcube with the Fermitools (gtselect, gtmktime if a filter is given, and gtltcube), as done by fermipy during the setup.
+
+    Parameters
+    ----------
+    evfile: str
+        Photon file, or list of photon files preceded by "@".
+    scfile: str
+        Path to the spacecraft file.
+    tmin, tmax: float
+        Time interval in MET.
+    zmax: float
+        Maximum zenith angle.
+    evclass, evtype: int
+        Event class and event type of the selection.
+    outfile: str
+        Path to the output ltcube.
+    workdir: str
+        Directory for the temporary files.
+    binsz, dcostheta (optional): float
+        Binning of the ltcube.
+    filter (optional): str
+        gtmktime filter. If None, gtmktime is not run, as in fermipy without selection.filter.
+    """
+
+    # Named after the output and the process, so components, tiles and extensions computed in the same directory never share them:
+    prefix = os.path.join(workdir, f"{Path(outfile).stem}_{os.getpid()}")
+    selected = prefix+"_ft1.fits"
+    filtered = prefix+"_ft1_gti.fits"
+    try:
+        run_fermitool(f"gtselect infile={evfile} outfile={selected} ra=0 dec=0 rad=180 tmin={tmin} tmax={tmax} "
+                      f"emin=1 emax=10000000 zmax={zmax} evclass={evclass} evtype={evtype} chatter=1")
+        if filter is None:
+            filtered = selected  # No gtmktime, as in fermipy: the good time intervals are the ones of the photon files
+        else:
+            run_fermitool(f"gtmktime scfile={scfile} evfile={selected} outfile={filtered} "
+                          f"filter='{filter}' roicut=no chatter=1")
+        run_fermitool(f"gtltcube evfile={filtered} scfile={scfile} outfile={outfile} dcostheta={dcostheta} binsz={binsz} zmax={zmax} chatter=1")
+    finally:
+        for temporary_file in [selected, filtered]:
+            if os.path.exists(temporary_file):
+                os.remove(temporary_file)
+
+
+def sum_ltcubes(infile1, infile2, outfile):
+
+    """
+    Sums two ltcubes with the same binning and disjoint time intervals (gtltsum).
+    """
+
+    run_fermitool(f"gtltsum infile1={infile1} infile2={infile2} outfile={outfile} chatter=1")
@@ -0,0 +1,125 @@
+"""
+Index of the photon (FT1) files used by easyfermi.
+
+Checking the highest energy photon of a dataset used to read the full ENERGY column of every photon file, every time
+the inputs were validated. The functions below read each file only once (with memory mapping), save a small summary
+(energy range, time span, number of rows) in the file ".easyfermi_photon_index.yaml" in the same directory as the data,
+and reuse it as long as the size and modification time of the photon file do not change.
+"""
+
+import os
+import astropy.io.fits as pyfits
+import yaml
+from yaml import Loader
+
+
+INDEX_NAME = ".easyfermi_photon_index.yaml"
+
+_memory_index = {}  # Summaries already read in this process, keyed by (path, size, mtime)
+
+
+def scan_photon_file(photon_file):
+
+    """
+    Reads the summary of a single photon file.
+
+    Parameters
+    ----------
+    photon_file: str
+        Path to the photon file.
+
+    Returns
+    -------
+    summary: dict
+        Number of rows, minimum and maximum photon energies (MeV) and time span (MET) of the file.
+    """
+
+    with pyfits.open(photon_file, memmap=True) as hdul:
+        header = hdul[1].header
+        summary = {"rows": int(header["NAXIS2"]), "emin": 0.0, "emax": 0.0,
+                   "tstart": float(header.get("TSTART", 0.0)), "tstop": float(header.get("TSTOP", 0.0))}
+        if summary["rows"] > 0:
+            energy = hdul[1].data["ENERGY"]  # Memory mapped: only this column is read from the disk
+            summary["emin"] = float(energy.min())
+            summary["emax"] = float(energy.max())
+            del energy  # Releases the memory map before the file is closed
+
+    return summary
+
+
+def photon_files_index(photon_files):
+
+    """
+    Returns the summaries of a list of photon files, reading only the files that are new or that changed since they were indexed.
+
+    Parameters
+    ----------
+    photon_files: list
+        Paths to the photon files.
+
+    Returns
+    -------
+    index: dict
+        Summary (see scan_photon_file, plus the size and modification time) of each photon file, keyed by its path.
+    """
+
+    index = {}
+    by_directory = {}
+    for photon_file in photon_files:
+        by_directory.setdefault(os.path.dirname(os.path.abspath(photon_file)), []).append(photon_file)
+
+    for directory, files in by_directory.items():
+        index_file = os.path.join(directory, INDEX_NAME)
+        saved = None
+        changed = False
+        for photon_file in files:
+            stat = os.stat(photon_file)
+            memory_key = (os.path.abspath(photon_file), stat.st_size, stat.st_mtime)
+            if memory_key in _memory_index:
+                index[photon_file] = _memory_index[memory_key]
+                continue
+
+            if saved is None:
+                saved = {}
+                if os.path.exists(index_file):
+                    try:
+                        with open(index_file, 'r') as f:
+                            saved = yaml.load(f, Loader) or {}
+                    except (OSError, yaml.YAMLError):
+                        saved = {}
+
+            name = os.path.basename(photon_file)
+            summary = saved.get(name)
+            if summary is None or summary.get("size") != stat.st_size or summary.get("mtime") != stat.st_mtime:
+                summary = scan_photon_file(photon_file)
+                summary["size"] = stat.st_size
+                summary["mtime"] = stat.st_mtime
+                saved[name] = summary
+                changed = True
+
+            _memory_index[memory_key] = summary
+            index[photon_file] = summary
+
+        if changed:
+            try:
+                temporary_file = f"{index_file}.{os.getpid()}.tmp"  # One per process, so parallel analyses never write to the same temporary file
+                with open(temporary_file, 'w') as f:
+                    yaml.dump(saved, f, default_flow_style=False)
+                os.replace(temporary_file, index_file)
+            except OSError:
+                pass  # Read-only data directory: the index is kept only in memory
+
+    return index
+
+
+def max_photon_energy(photon_files):
+
+    """
+    Returns the energy (MeV) of the highest energy photon in a list of photon files, or 0 if the list is empty.
+    """
+
+    index = photon_files_index(photon_files)
+    if len(index) == 0:
+        return 0
+
+    return max(summary["emax"] for summary in index.values())
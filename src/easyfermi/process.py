@@ -0,0 +1,129 @@
+"""
+Execution of the easyfermi analysis in a separate process.
+
+The graphical interface uses the class AnalysisProcess to run the analysis (fermipy fits, MCMC, plots etc) in a child
+process, so that the analysis and the easyfermi window do not compete for the same Python interpreter. The child process
+sends the progress of the analysis back to the window through a pipe. The child process leads its own process group, so
+cancelling a run kills it together with everything it started (pools of fermipy and easyfermi, Fermitools) and frees all their memory.
+"""
+
+import os
+import signal
+import multiprocessing
+import traceback
+from .settings import load_settings
+
+
+def run_analysis_process(settings, connection):
+
+    """
+    Target of the child process: runs the analysis and sends its progress through the pipe.
+
+    The messages are tuples:
+        ("progress", n, state): step n of the analysis is done (see Analysis.run), state is the output of Analysis.progress_state();
+        ("finished", results): the analysis is done, results is the output of Analysis.collect_results();
+        ("failed", message): the analysis raised an exception, message is its traceback.
+
+    Parameters
+    ----------
+    settings: AnalysisSettings
+        Settings of the analysis.
+    connection: multiprocessing.connection.Connection
+        Child end of the pipe.
+    """
+
+    if hasattr(os, "setsid"):
+        os.setsid()  # New process group (with the pid of this process as id), killed at once by AnalysisProcess.cancel()
+
+    from .analysis import Analysis
+
+    analysis = Analysis(settings)
+    try:
+        results = analysis.run(progress=lambda n: connection.send(("progress", n, analysis.progress_state())))
+        connection.send(("finished", results))
+    except Exception:
+        connection.send(("failed", traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+class AnalysisProcess:
+
+    """
+    Runs an analysis in a child process and reads its progress messages.
+
+    Parameters
+    ----------
+    config: AnalysisSettings, dict or str
+        Analysis configuration, as accepted by the class Analysis.
+
+    Examples
+    --------
+    >>> process = AnalysisProcess(settings)
+    >>> process.start()
+    >>> for message in process.messages():
+    ...     print(message)
+    """
+
+    def __init__(self, config):
+        self.settings = load_settings(config)
+        self.cancelled = False
+        self.process = None
+        self.connection = None
+
+
+    def start(self):
+
+        """
+        Starts the child process. The "spawn" method is used so that the child does not inherit the Qt state of the window.
+        """
+
+        context = multiprocessing.get_context("spawn")
+        self.connection, child_connection = context.Pipe(duplex=False)
+        # Not a daemon, so the analysis can start its own pools of processes (light curves, MCMC of several models):
+        self.process = context.Process(target=run_analysis_process, args=(self.settings, child_connection), daemon=False)
+        self.process.start()
+        child_connection.close()  # Only the child keeps the writing end, so recv() fails as soon as the child dies
+
+
+    def messages(self):
+
+        """
+        Yields the messages sent by the child process until it finishes, fails or is cancelled.
+        """
+
+        last_message = None
+        while True:
+            try:
+                last_message = self.connection.recv()
+            except (EOFError, OSError):
+                break
+            yield last_message
+            if last_message[0] != "progress":
+                break
+
+        self.process.join()
+        self.connection.close()
+        if self.cancelled:
+            yield ("cancelled",)
+        elif last_message is None or last_message[0] == "progress":
+            yield ("failed", f"The analysis process stopped unexpectedly (exit code {self.process.exitcode}).")
+
+
+    def cancel(self):
+
+        """
+        Kills the child process and all the processes it started. Everything allocated by the analysis is released by the operating system.
+        """
+
+        if self.process is not None and self.process.is_alive():
+            self.cancelled = True
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (AttributeError, ProcessLookupError, PermissionError):
+                self.process.kill()  # No process groups (Windows), or the child was killed before calling os.setsid()
+            self.process.join()
+
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
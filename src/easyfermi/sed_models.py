@@ -0,0 +1,632 @@
+"""
+Spectral models, priors and likelihood of the MCMC fit of the SED.
+
+All the functions below are vectorized over the walkers: theta may be a single set of parameters, with shape (ndim,),
+or the positions of all the walkers of emcee, with shape (nwalkers, ndim). In the second case the functions are used
+with emcee.EnsembleSampler(..., vectorize=True), so every step of the sampler is a handful of NumPy operations instead of
+one Python call per walker. The data are in log scale: x = log10(E/MeV) and y = log10(dN/dE) or log10(E^2 dN/dE).
+The last functions find the maximum likelihood parameters, run the sampler, measure the convergence of its chains
+and fit several models in parallel, in a pool of processes (which is why everything here is defined at module level).
+The chains can be saved and reused by later runs with the same data (see fit()).
+The function redshift_profile() uses the maximum likelihood fits to constrain the redshift of a source with the EBL absorption of its SED.
+"""
+
+import numpy as np
+
+
+LN10 = np.log(10)
+
+
+def PowerLaw(theta, x, Ep):
+    N0, alpha = (theta[..., i, None] for i in range(2))
+    return N0 - alpha*(x - Ep)
+
+
+def LogPar(theta, x, Ep):
+    N0, alpha, beta = (theta[..., i, None] for i in range(3))
+    return N0 + (-alpha - beta*LN10*(x - Ep))*(x - Ep)
+
+
+def LogPar_MTT(theta, x, Ep=None):
+    Splog, alpha, Ep = (theta[..., i, None] for i in range(3))  # Here the peak energy is a free parameter
+    return Splog - alpha*(x - Ep)**2
+
+
+def PLEC(theta, x, Ep):
+    N0, alpha, Ec, b = (theta[..., i, None] for i in range(4))
+    return N0 - alpha*(x - Ep) - (10**(x - Ec))**b/LN10
+
+
+def PLEC_bfix(theta, x, Ep):
+    N0, alpha, Ec = (theta[..., i, None] for i in range(3))
+    return N0 - alpha*(x - Ep) - 10**(x - Ec)/LN10
+
+
+def PLEC_deMenezes(theta, x, Ep=None):
+    Sp, alpha, Ep, b = (theta[..., i, None] for i in range(4))  # Here the peak energy is a free parameter
+    return Sp + (alpha - 2)*(Ep - x) + ((2 - alpha)/b)*(1 - (10**(x - Ep))**b)/LN10
+
+
+SPECTRAL_MODELS = {"PowerLaw": PowerLaw, "LogPar": LogPar, "LogPar_MTT": LogPar_MTT,
+                   "PLEC": PLEC, "PLEC_bfix": PLEC_bfix, "PLEC_deMenezes": PLEC_deMenezes}
+
+# Models fitted to log10(E^2 dN/dE). The others are fitted to log10(dN/dE).
+E2DNDE_MODELS = ["LogPar_MTT", "PLEC_deMenezes"]
+
+# Flat priors: each parameter must be inside the open interval (lower, upper).
+PRIOR_BOUNDS = {"PowerLaw": ([-15, 0.5], [-7, 5.0]),
+                "LogPar": ([-15, 1.0, -1], [-7, 4.0, 1.0]),
+                "LogPar_MTT": ([-7, -1.0, 2], [-1, 1.0, 7]),
+                "PLEC": ([-15, 1.0, 3.0, 0.2], [-7, 4.0, 7.0, 3.0]),
+                "PLEC_bfix": ([-15, 1.0, 3.0], [-7, 4.0, 7.0]),
+                "PLEC_deMenezes": ([-8, 0, 2.0, 0.01], [-1, 4.0, 7.0, 3.0])}
+
+# Names of the parameters, in the order of theta:
+PARAMETER_NAMES = {"PowerLaw": ["N0", "alpha"],
+                   "LogPar": ["N0", "alpha", "beta"],
+                   "LogPar_MTT": ["Sp_log", "alpha", "Ep_log"],
+                   "PLEC": ["N0", "alpha", "Ec", "b"],
+                   "PLEC_bfix": ["N0", "alpha", "Ec"],
+                   "PLEC_deMenezes": ["Sp_log", "alpha", "Ep", "b"]}
+
+# Default starting point of the walkers, used when the maximum likelihood fit fails.
+INITIAL_POSITIONS = {"PowerLaw": [-13, 2.0],
+                     "LogPar": [-13, 1.7, 0.2],
+                     "LogPar_MTT": [-4.5, 0.2, 3.5],
+                     "PLEC": [-13, 1.7, 5, 1],
+                     "PLEC_bfix": [-13, 1.7, 5],
+                     "PLEC_deMenezes": [-4, 1.7, 5, 1]}
+
+
+def model_data(model_name, x, log_dnde, log_dnde_err):
+
+    """
+    Returns the data (x, y, yerr) fitted by the model: log10(dN/dE) or, for the models in E2DNDE_MODELS, log10(E^2 dN/dE).
+    The errors are the same in both cases, since log10(E^2 dN/dE) = log10(dN/dE) + 2x.
+    """
+
+    if model_name in E2DNDE_MODELS:
+        return x, log_dnde + 2*x, log_dnde_err
+
+    return x, log_dnde, log_dnde_err
+
+
+def log_prior(theta, model_name):
+
+    """
+    Flat prior of the model: 0 inside the box PRIOR_BOUNDS[model_name] and -inf outside.
+
+    Returns
+    -------
+    lnprior: float or numpy array
+        One value per set of parameters, i.e. with shape theta.shape[:-1].
+    """
+
+    lower, upper = PRIOR_BOUNDS[model_name]
+    inside = np.all((theta > np.array(lower)) & (theta < np.array(upper)), axis=-1)
+    return np.where(inside, 0.0, -np.inf)
+
+
+def log_likelihood(theta, model_name, x, y, yerr, Ep):
+
+    """
+    Gaussian log-likelihood of the data (x, y, yerr) given the model.
+
+    Parameters
+    ----------
+    theta: numpy array
+        Parameters of the model, with shape (ndim,) or (nwalkers, ndim).
+    model_name: str
+        One of the keys of SPECTRAL_MODELS.
+    x, y, yerr: numpy array
+        Energies, fluxes and flux errors, all in log scale.
+    Ep: float
+        Log10 of the pivot energy (in MeV) of the models that do not fit it.
+
+    Returns
+    -------
+    lnlike: float or numpy array
+        One value per set of parameters, i.e. with shape theta.shape[:-1].
+    """
+
+    residuals = (y - SPECTRAL_MODELS[model_name](np.asarray(theta), x, Ep))/yerr
+    return -0.5*np.sum(residuals**2, axis=-1)
+
+
+def log_probability(theta, model_name, x, y, yerr, Ep):
+
+    """
+    Log-posterior evaluated for all the walkers at once (use it with emcee.EnsembleSampler(..., vectorize=True)).
+    The likelihood is computed only for the walkers inside the prior box.
+
+    Parameters
+    ----------
+    theta: numpy array
+        Positions of the walkers, with shape (nwalkers, ndim).
+    model_name, x, y, yerr, Ep:
+        See log_likelihood().
+
+    Returns
+    -------
+    lnprob: numpy array
+        Log-posterior of each walker, with shape (nwalkers,).
+    """
+
+    theta = np.atleast_2d(theta)
+    lnprob = log_prior(theta, model_name)
+    inside = np.isfinite(lnprob)
+    if np.any(inside):
+        lnprob[inside] += log_likelihood(theta[inside], model_name, x, y, yerr, Ep)
+
+    return lnprob
+
+
+def prior_box(model_name, margin=1e-6):
+
+    """
+    Returns the lower and upper limits of the prior of the model, shrunk by a small fraction of their width
+    so that the points inside the returned box are strictly inside the prior.
+    """
+
+    lower, upper = (np.array(bounds, dtype=float) for bounds in PRIOR_BOUNDS[model_name])
+    return lower + margin*(upper - lower), upper - margin*(upper - lower)
+
+
+def maximum_likelihood(model_name, x, y, yerr, Ep, start=None):
+
+    """
+    Fits the model to the data with a bounded least squares (the bounds are the prior box), which maximizes the
+    same log-likelihood sampled by the MCMC.
+
+    Parameters
+    ----------
+    model_name, x, y, yerr, Ep:
+        See log_likelihood().
+    start (optional): numpy array
+        Starting point of the fit. By default, INITIAL_POSITIONS[model_name].
+
+    Returns
+    -------
+    theta: numpy array
+        Maximum likelihood parameters.
+    covariance: numpy array
+        Covariance matrix of the parameters (inverse of the Hessian of -lnL around the maximum).
+    """
+
+    from scipy.optimize import least_squares
+
+    lower, upper = prior_box(model_name)
+    start = np.clip(INITIAL_POSITIONS[model_name] if start is None else start, lower, upper)
+    result = least_squares(lambda theta: (y - SPECTRAL_MODELS[model_name](theta, x, Ep))/yerr, start, bounds=(lower, upper))
+    if not result.success:
+        raise ValueError(f"The maximum likelihood fit did not converge: {result.message}")
+
+    covariance = np.linalg.pinv(result.jac.T @ result.jac)
+
+    return result.x, covariance
+
+
+def initial_walkers(theta, covariance, nwalkers, model_name, scale=0.1):
+
+    """
+    Places the walkers in a small Gaussian ball around theta, with a width of scale times the errors of the parameters.
+
+    Returns
+    -------
+    p0: numpy array
+        Initial positions of the walkers, with shape (nwalkers, ndim), all inside the prior box.
+    """
+
+    sigma = np.sqrt(np.abs(np.diag(covariance)))
+    sigma[~np.isfinite(sigma) | (sigma == 0)] = 1e-2
+    lower, upper = prior_box(model_name)
+    p0 = theta + scale*sigma*np.random.randn(nwalkers, len(theta))
+
+    return np.clip(p0, lower, upper)
+
+
+def run_until_converged(sampler, p0, tau_factor=50, max_steps=20000, check_every=100, tau_tolerance=0.01, previous_chain=None):
+
+    """
+    Runs the sampler until the chains are much longer than their integrated autocorrelation time tau.
+
+    Every check_every steps, tau is estimated for every parameter and the sampler stops when the chains are
+    longer than tau_factor*tau and the estimate of tau changed less than tau_tolerance since the previous check.
+
+    Parameters
+    ----------
+    sampler: emcee.EnsembleSampler
+        Sampler (not yet run).
+    p0: numpy array
+        Initial positions of the walkers, with shape (nwalkers, ndim).
+    tau_factor (optional): float
+        Minimum length of the chains, in units of tau.
+    max_steps (optional): int
+        Maximum number of steps per walker (including the steps of previous_chain).
+    previous_chain (optional): numpy array
+        Chain of an earlier run with shape (nsteps, nwalkers, ndim), continued by the sampler (p0 must be its last position).
+        The convergence criterion and the returned burn-in and thinning refer to the whole chain, i.e. previous_chain followed by the new steps.
+
+    Returns
+    -------
+    burnin: int
+        Number of initial steps to be discarded (two times the largest tau).
+    thin: int
+        Thinning factor of the chains (half of the smallest tau).
+    converged: bool
+        False if max_steps was reached before the convergence criterion.
+    """
+
+    from emcee.autocorr import integrated_time
+
+    previous_steps = 0 if previous_chain is None else len(previous_chain)
+
+    def autocorr_time():
+        if previous_steps == 0:
+            return sampler.get_autocorr_time(tol=0)
+        return integrated_time(np.concatenate([previous_chain, sampler.get_chain()]), tol=0)
+
+    old_tau = np.inf
+    converged = False
+    for _ in sampler.sample(p0, iterations=max_steps - previous_steps):
+        steps = previous_steps + sampler.iteration
+        if steps % check_every != 0:
+            continue
+        tau = autocorr_time()
+        converged = bool(np.all(tau_factor*tau < steps) and np.all(np.abs(old_tau - tau) < tau_tolerance*tau))
+        old_tau = tau
+        if converged:
+            break
+
+    tau = autocorr_time()
+    burnin = min(int(2*np.max(tau)), (previous_steps + sampler.iteration)//2)
+    thin = max(1, int(0.5*np.min(tau)))
+
+    return burnin, thin, converged
+
+
+def effective_sample_size(chain):
+
+    """
+    Returns the number of independent samples of each parameter, i.e. nwalkers*nsteps/tau, for a chain with shape (nsteps, nwalkers, ndim).
+    """
+
+    from emcee.autocorr import integrated_time
+
+    tau = integrated_time(chain, tol=0)
+    return chain.shape[1]*chain.shape[0]/tau
+
+
+def chain_key(model_name, data, Ep, nwalkers, burnin, adaptive, tau_factor):
+
+    """
+    Content hash identifying a chain: the model, the fitted data (which already depend on the redshift, EBL model and VHE table)
+    and the options of the sampler. The number of production steps is not included, so a longer run can extend a stored chain.
+    """
+
+    import hashlib
+
+    digest = hashlib.sha256()
+    digest.update(f"{model_name}|{float(Ep)!r}|{nwalkers}|{burnin}|{adaptive}|{tau_factor if adaptive else None}".encode())
+    for array in data:
+        digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+
+    return digest.hexdigest()[:20]
+
+
+def load_chain(chain_file):
+
+    """
+    Reads a chain saved by save_chain(), or returns None if the file does not exist or cannot be read.
+    """
+
+    try:
+        with np.load(chain_file) as stored:
+            return {key: stored[key] for key in stored.files}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_chain(chain_file, **arrays):
+
+    """
+    Saves a chain (compressed npz). The file is written apart and then renamed, so an interrupted run never leaves a partial chain.
+    """
+
+    import os
+
+    os.makedirs(os.path.dirname(chain_file), exist_ok=True)
+    temporary_file = f"{chain_file}.{os.getpid()}.npz"
+    np.savez_compressed(temporary_file, **arrays)
+    os.replace(temporary_file, chain_file)
+
+
+def posterior_band(model_name, samples, x, Ep, n_samples=1000, quantiles=(0.025, 0.16, 0.5, 0.84, 0.975)):
+
+    """
+    Computes the quantiles of the SED predicted by the posterior distribution of the parameters.
+
+    All the sampled models are computed at once, as an array with shape (n_samples, len(x)).
+
+    Parameters
+    ----------
+    model_name: str
+        One of the keys of SPECTRAL_MODELS.
+    samples: numpy array
+        Samples of the posterior, with shape (N, ndim).
+    x: numpy array
+        Log10 of the energies (MeV) where the band is computed.
+    Ep: float
+        Log10 of the pivot energy (in MeV) of the models that do not fit it.
+    n_samples (optional): int
+        Number of random samples used.
+    quantiles (optional): tuple
+        Quantiles computed at each energy. The default gives the median and the 68% and 95% bands.
+
+    Returns
+    -------
+    band: numpy array
+        E^2 dN/dE (MeV cm-2 s-1) at each quantile and energy, with shape (len(quantiles), len(x)).
+    """
+
+    draws = samples[np.random.randint(len(samples), size=n_samples)]
+    models = SPECTRAL_MODELS[model_name](draws, x, Ep)
+    if model_name not in E2DNDE_MODELS:
+        models = models + 2*x
+
+    return 10**np.quantile(models, quantiles, axis=0)  # The quantiles of log10(E^2 dN/dE) are the log10 of the quantiles of E^2 dN/dE
+
+
+def fit(model_name, x, log_dnde, log_dnde_err, Ep, nwalkers=300, niter=500, burnin=50, quick_fit=False, adaptive=False, tau_factor=50, max_steps=20000,
+        chain_directory=None):
+
+    """
+    Fits a spectral model to the SED with emcee.
+
+    Parameters
+    ----------
+    model_name: str
+        One of the keys of SPECTRAL_MODELS.
+    x, log_dnde, log_dnde_err: numpy array
+        Log10 of the energies (MeV), of the differential fluxes (cm-2 s-1 MeV-1) and the errors of log_dnde.
+    Ep: float
+        Log10 of the pivot energy (in MeV) of the models that do not fit it.
+    nwalkers, niter, burnin (optional): int
+        Number of walkers, of production steps and of burn-in steps.
+    quick_fit (optional): bool
+        If True, the MCMC is skipped and the samples are drawn from the Gaussian approximation of the likelihood around its maximum.
+    adaptive, tau_factor, max_steps (optional):
+        If adaptive is True, the chains run until convergence (see run_until_converged()) instead of burnin + niter steps.
+    chain_directory (optional): str
+        If given, the chains are saved in this directory (see chain_key()). A chain already saved for the same data and options
+        is reused instead of running the sampler again. It is extended if more production steps are requested or, with adaptive=True,
+        if it did not converge (until it converges or reaches max_steps).
+
+    Returns
+    -------
+    result: dict
+        Samples of the posterior and their log-posterior, highest likelihood parameters (theta_max), Akaike information
+        criterion (AIC), number of steps per walker, burn-in, convergence flag, effective sample size (ESS) of the chains
+        and whether a saved chain was reused.
+    """
+
+    import os
+    import emcee  # Version: 3.1.4
+
+    data = model_data(model_name, x, log_dnde, log_dnde_err)
+    initial = np.array(INITIAL_POSITIONS[model_name])
+    ndim = len(initial)
+
+    # The walkers start in a small ball around the maximum likelihood parameters, so only a short burn-in is needed:
+    try:
+        theta_ml, covariance_ml = maximum_likelihood(model_name, *data, Ep)
+        p0 = initial_walkers(theta_ml, covariance_ml, nwalkers, model_name)
+        burnin_steps = burnin
+    except (ValueError, np.linalg.LinAlgError) as error:
+        print(f"{model_name}: maximum likelihood fit failed ({error}). The walkers will start from the default positions.")
+        theta_ml = None
+        p0 = initial + 0.3 * np.random.randn(nwalkers, ndim)
+        burnin_steps = 100
+
+    result = {"model": model_name, "quick_fit": quick_fit and theta_ml is not None, "steps": 0, "burnin": 0, "converged": None, "ESS": None, "reused_chain": False}
+
+    chain_file = None
+    stored = None
+    if chain_directory is not None and not result["quick_fit"]:
+        chain_file = os.path.join(chain_directory, f"{model_name}_{chain_key(model_name, data, Ep, nwalkers, burnin_steps, adaptive, tau_factor)}.npz")
+        stored = load_chain(chain_file)
+
+    if result["quick_fit"]:
+        # No MCMC: the posterior is approximated by a Gaussian around the maximum likelihood parameters.
+        print(f"{model_name}: running quick fit...")
+        samples = np.vstack([theta_ml, np.random.multivariate_normal(theta_ml, covariance_ml, size=nwalkers*niter)])
+        lnprobability = log_probability(samples, model_name, *data, Ep)
+        samples = samples[np.isfinite(lnprobability)]
+        lnprobability = lnprobability[np.isfinite(lnprobability)]
+    else:
+        # The log-posterior is evaluated for all the walkers at once, in a single call per step:
+        sampler = emcee.EnsembleSampler(nwalkers, ndim, log_probability, args=(model_name,) + data + (Ep,), vectorize=True)
+        if adaptive:
+            if stored is not None and (bool(stored["converged"]) or len(stored["chain"]) >= max_steps):
+                print(f"{model_name}: reusing the chain {chain_file}")
+                chain, log_prob = stored["chain"], stored["log_prob"]
+                discard, thin, result["converged"] = int(stored["discard"]), int(stored["thin"]), bool(stored["converged"])
+                result["reused_chain"] = True
+            elif stored is not None:
+                # The saved chain did not converge: it continues from the last position of its walkers.
+                print(f"{model_name}: extending the chain {chain_file} ({len(stored['chain'])} steps) until convergence...")
+                discard, thin, result["converged"] = run_until_converged(sampler, stored["chain"][-1], tau_factor=tau_factor, max_steps=max_steps,
+                                                                         previous_chain=stored["chain"])
+                chain = np.concatenate([stored["chain"], sampler.get_chain()])
+                log_prob = np.concatenate([stored["log_prob"], sampler.get_log_prob()])
+                result["reused_chain"] = True
+                save_chain(chain_file, chain=chain, log_prob=log_prob, discard=discard, thin=thin, converged=result["converged"])
+            else:
+                # The chains run until they are much longer than their autocorrelation time, and the burn-in is set from it:
+                print(f"{model_name}: running MCMC until convergence...")
+                discard, thin, result["converged"] = run_until_converged(sampler, p0, tau_factor=tau_factor, max_steps=max_steps)
+                chain, log_prob = sampler.get_chain(), sampler.get_log_prob()
+                if chain_file is not None:
+                    save_chain(chain_file, chain=chain, log_prob=log_prob, discard=discard, thin=thin, converged=result["converged"])
+            samples = chain[discard::thin].reshape(-1, ndim)
+            lnprobability = log_prob[discard::thin].reshape(-1)
+            result["steps"] = len(chain)
+            result["burnin"] = discard
+            result["ESS"] = effective_sample_size(chain[discard:])
+        else:
+            if stored is not None and len(stored["chain"]) >= niter:
+                print(f"{model_name}: reusing the chain {chain_file}")
+                chain, log_prob = stored["chain"][:niter], stored["log_prob"][:niter]
+                result["reused_chain"] = True
+            elif stored is not None:
+                # The saved chain is shorter than requested: it continues from the last position of its walkers.
+                print(f"{model_name}: extending the chain {chain_file} from {len(stored['chain'])} to {niter} steps...")
+                sampler.run_mcmc(stored["chain"][-1], niter - len(stored["chain"]))
+                chain = np.concatenate([stored["chain"], sampler.get_chain()])
+                log_prob = np.concatenate([stored["log_prob"], sampler.get_log_prob()])
+                result["reused_chain"] = True
+            else:
+                print(f"{model_name}: running burn-in...")
+                p0, _, _ = sampler.run_mcmc(p0, burnin_steps)
+                sampler.reset()
+
+                print(f"{model_name}: running production...")
+                sampler.run_mcmc(p0, niter)
+                chain, log_prob = sampler.get_chain(), sampler.get_log_prob()  # Without the burn-in, removed with sampler.reset()
+
+            if chain_file is not None and not (result["reused_chain"] and len(stored["chain"]) >= niter):
+                save_chain(chain_file, chain=chain, log_prob=log_prob)
+            samples = chain.reshape(-1, ndim)
+            lnprobability = log_prob.reshape(-1)
+            result["steps"] = burnin_steps + len(chain)
+            result["burnin"] = burnin_steps
+            result["ESS"] = effective_sample_size(chain)
+
+    result["samples"] = samples
+    result["lnprobability"] = lnprobability
+    result["theta_max"] = samples[np.argmax(lnprobability)]
+    result["AIC"] = 2*ndim - 2*log_likelihood(result["theta_max"], model_name, *data, Ep)  # Akaike information criterion
+
+    return result
+
+
+def fit_in_pool(tasks, processes=1, **options):
+
+    """
+    Runs fit() for several sets of data and/or models, each one in its own process.
+
+    Processes are not used inside daemonic processes (e.g. the workers of easyfermi-batch), which cannot have children:
+    there the fits run one after the other.
+
+    Parameters
+    ----------
+    tasks: list
+        Tuples (model_name, x, log_dnde, log_dnde_err, Ep) with the positional arguments of fit().
+    processes (optional): int
+        Maximum number of fits running at the same time.
+    **options:
+        Any other argument of fit(), shared by all the tasks.
+
+    Returns
+    -------
+    results: list
+        Output of fit() for each task, in the same order as tasks.
+    """
+
+    import multiprocessing
+    from functools import partial
+
+    task = partial(fit, **options)
+    processes = min(processes, len(tasks))
+    if processes > 1 and not multiprocessing.current_process().daemon:
+        with multiprocessing.Pool(processes=processes) as pool:
+            return pool.starmap(task, tasks)
+
+    return [task(*arguments) for arguments in tasks]
+
+
+def fit_models(model_names, x, log_dnde, log_dnde_err, Ep, processes=1, **options):
+
+    """
+    Fits several spectral models to the same SED, in parallel (see fit_in_pool()).
+
+    Returns
+    -------
+    results: dict
+        Output of fit() for each model, keyed by the model name.
+    """
+
+    results = fit_in_pool([(model_name, x, log_dnde, log_dnde_err, Ep) for model_name in model_names], processes=processes, **options)
+    return {result["model"]: result for result in results}
+
+
+def aic_ranking(results):
+
+    """
+    Sorts the fitted models from the lowest (best) to the highest Akaike information criterion.
+
+    Returns
+    -------
+    ranking: list
+        Tuples (model name, AIC, AIC - lowest AIC).
+    """
+
+    ranking = sorted((result["AIC"], name) for name, result in results.items())
+    return [(name, aic, aic - ranking[0][0]) for aic, name in ranking]
+
+
+def redshift_profile(model_name, energy, dnde, dnde_err, Ep, absorption, redshifts, delta_lnL_ul=1.355):
+
+    """
+    Likelihood profile of the redshift of a source whose (LAT + VHE) SED is absorbed by the EBL.
+
+    The SED is corrected for the EBL absorption at all the redshifts of the grid at once and, for each redshift, the intrinsic
+    spectral model is fitted by maximum likelihood. Above the true redshift, the corrected VHE spectrum becomes too hard to be
+    described by the intrinsic model and the likelihood drops, which gives an upper limit on the redshift.
+
+    Parameters
+    ----------
+    model_name: str
+        Intrinsic spectral model (one of the keys of SPECTRAL_MODELS).
+    energy, dnde, dnde_err: numpy array
+        Energies (MeV), observed differential fluxes and their errors (cm-2 s-1 MeV-1).
+    Ep: float
+        Log10 of the pivot energy (in MeV) of the models that do not fit it.
+    absorption: easyfermi.ebl.EBLAbsorption
+        EBL model.
+    redshifts: numpy array
+        Redshift grid.
+    delta_lnL_ul (optional): float
+        Decrease of the log-likelihood defining the upper limit (1.355, i.e. 2.71/2, for a one-sided 95% upper limit).
+
+    Returns
+    -------
+    profile: dict
+        Redshift grid, maximum log-likelihood at each redshift (NaN where the fit failed), redshift of the highest likelihood
+        and upper limit on the redshift (NaN if the likelihood does not drop enough inside the grid).
+    """
+
+    x = np.log10(energy)
+    log_dnde = np.log10(dnde/absorption(energy, redshifts[:, None]))  # All the redshifts at once, with shape (len(redshifts), len(energy))
+    log_dnde_err = dnde_err/(dnde*LN10)  # The correction scales the fluxes and their errors in the same way
+
+    lnL = np.full(len(redshifts), np.nan)
+    theta = None
+    for i in range(len(redshifts)):
+        data = model_data(model_name, x, log_dnde[i], log_dnde_err)
+        try:
+            theta, _ = maximum_likelihood(model_name, *data, Ep, start=theta)  # Starts from the result of the previous redshift
+        except (ValueError, np.linalg.LinAlgError):
+            continue
+        lnL[i] = log_likelihood(theta, model_name, *data, Ep)
+
+    profile = {"redshift": redshifts, "lnL": lnL, "z_best": np.nan, "z_ul95": np.nan}
+    if np.any(np.isfinite(lnL)):
+        best = np.nanargmax(lnL)
+        profile["z_best"] = redshifts[best]
+        excluded = np.nonzero(lnL[best:] < lnL[best] - delta_lnL_ul)[0]
+        if len(excluded) > 0:
+            i = best + excluded[0]  # First excluded redshift: the limit is interpolated between it and the previous one
+            profile["z_ul95"] = np.interp(lnL[best] - delta_lnL_ul, [lnL[i], lnL[i-1]], [redshifts[i], redshifts[i-1]])
+
+    return profile
@@ -0,0 +1,197 @@
+"""
+Frozen settings of an easyfermi analysis.
+
+The class AnalysisSettings holds a snapshot of all the options of the easyfermi window (the same keys
+saved in GUI_status.yaml). The snapshot is taken once, when the "Go!" button is pressed (or when the
+class Analysis is created), so the steps of the analysis never read the widgets while they are running.
+"""
+
+from dataclasses import dataclass, fields, asdict
+from pathlib import Path
+import yaml
+from yaml import Loader
+
+
+TRUE_STRINGS = ["true", "yes", "1"]
+FALSE_STRINGS = ["false", "no", "0"]
+
+
+def parse_bool(value):
+
+    """
+    Converts a boolean option to bool. Besides True and False (and the integers 1 and 0), the strings
+    "true", "yes", "1", "false", "no" and "0" (in any case) are accepted, e.g. from a column of a batch table.
+    Any other value raises ValueError, instead of being taken as True (as bool("False") would be).
+    """
+
+    if hasattr(value, "item"):
+        value = value.item()  # numpy scalars, e.g. numpy.bool_
+    if isinstance(value, int) and value in [0, 1]:  # Includes True and False
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in TRUE_STRINGS + FALSE_STRINGS:
+        return value.strip().lower() in TRUE_STRINGS
+
+    raise ValueError(f"{value!r} is not a boolean.")
+
+
+@dataclass(frozen=True)
+class AnalysisSettings:
+
+    """
+    Immutable and typed snapshot of the easyfermi configuration.
+
+    The attribute names are the keys of the dictionary returned by Ui_mainWindow.get_GUIstate() and saved in GUI_status.yaml,
+    and the default values are the ones shown in the easyfermi window when it is opened.
+    Use AnalysisSettings.from_dict() or AnalysisSettings.from_yaml() to build it from a (partial) configuration.
+    """
+
+    # Basic configuration:
+    Standard: bool = True
+    Coords: str = ""
+    Energ: str = "100, 300000"
+    date: str = "04/08/2008 15:43:36"
+    date2: str = "14/10/2008 15:43:00"
+    spacecraft: str = ""
+    diffuse: str = ""
+    dir_photon: str = ""
+    Use_external_ltcube: bool = False
+    external_ltcube: str = ""
+    Use_ltcube_cache: bool = True
+    Use_ltcube_tiles: bool = False
+    ltcube_cache_directory: str = ""
+    ltcube_cache_size: float = 20.0
+    catalog: str = "4FGL-DR4"
+    cataloged: str = "Yes"
+    configfile: str = ""
+    nickname: str = "Target name"
+    High_resolution: bool = False
+    High_sensitivity: bool = False
+    Exclude_Sun_Moon: bool = False
+    Sun_exclusion_angle: float = 15.0
+    Moon_exclusion_angle: float = 5.0
+
+    # Fit options:
+    change_minimizer: bool = False
+    which_minimizer: str = "NEWMINUIT"
+    change_model: bool = False
+    which_model: str = "Select..."
+    delete_sources: bool = False
+    which_sources_deleted: str = ""
+    fit_TS_cut: str = "16"
+    Free_radius_standard: bool = True
+    Free_radius_custom: bool = False
+    free_radius: str = ""
+    Only_norm: bool = False
+    Freeze_Gal: bool = False
+    Freeze_Iso: bool = False
+    Freeze_targ_shape: bool = False
+    find_sources: bool = True
+    min_sig: float = 5.0
+    min_sep: float = 0.5
+    diagnostic: bool = True
+    output_format: str = "pdf"
+
+    # Light curve, SED, extension, relocalization and TS map:
+    LC: bool = False
+    LC_Nbins: int = 20
+    LC_Ncores: int = 1
+    adaptive_binning: bool = False
+    TS_threshold: str = "50.0"
+    N_iter: int = 1
+    SED: bool = True
+    SED_Nbins: int = 10
+    VHE: str = "Add VHE data?"
+    use_local_index: bool = False
+    which_MCMC_model: str = "LogPar"
+    MCMC_all_models: bool = False
+    MCMC_burnin: int = 50
+    MCMC_quick_fit: bool = False
+    MCMC_adaptive: bool = False
+    MCMC_tau_factor: float = 50.0
+    MCMC_max_steps: int = 20000
+    MCMC_reuse_chains: bool = True
+    redshift_value: str = "0.0"
+    EBL_model: str = "Saldana-Lopez et al. (2021)"
+    EBL_comparison: bool = False
+    redshift_scan: bool = False
+    redshift_scan_max: float = 2.0
+    redshift_scan_step: float = 0.01
+    extension: bool = False
+    Disk: bool = True
+    Gauss2D: bool = False
+    max_size: float = 1.0
+    reloc: bool = False
+    TS_map: bool = True
+    test_source_index: float = 2.0
+    remove_targ_from_model: bool = True
+    output: str = "./Output"
+
+
+    @classmethod
+    def from_dict(cls, config):
+
+        """
+        Builds the settings from a configuration dictionary.
+
+        Parameters
+        ----------
+        config: dict
+            Configuration with (some of) the keys of GUI_status.yaml. Missing keys take the default values.
+
+        Returns
+        -------
+        settings: AnalysisSettings
+            Frozen settings, with every value converted to the type of its attribute.
+        """
+
+        types = {field.name: field.type for field in fields(cls)}
+        unknown_keys = set(config) - set(types)
+        if len(unknown_keys) > 0:
+            raise ValueError(f"Unknown configuration key(s): {', '.join(sorted(unknown_keys))}.")
+
+        values = {}
+        for key, value in config.items():
+            if value is None:
+                continue  # Keeps the default value
+            try:
+                values[key] = parse_bool(value) if types[key] is bool else types[key](value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid value for the configuration key '{key}': {value!r} (expected {types[key].__name__}).")
+
+        return cls(**values)
+
+
+    @classmethod
+    def from_yaml(cls, path):
+
+        """
+        Builds the settings from a yaml file, e.g. a GUI_status.yaml saved by the graphical interface.
+        """
+
+        with open(path, 'r') as stream:
+            config = yaml.load(stream, Loader)
+
+        return cls.from_dict(config or {})
+
+
+    def to_dict(self):
+
+        """
+        Returns the settings as a plain dictionary, with the same keys as GUI_status.yaml.
+        """
+
+        return asdict(self)
+
+
+def load_settings(config):
+
+    """
+    Converts any accepted configuration (AnalysisSettings, dictionary or path to a yaml file) to AnalysisSettings.
+    """
+
+    if isinstance(config, AnalysisSettings):
+        return config
+    if isinstance(config, (str, Path)):
+        return AnalysisSettings.from_yaml(config)
+
+    return AnalysisSettings.from_dict(config)
@@ -0,0 +1,34 @@
+"""
+Vectorized sky geometry used by easyfermi.
+
+These functions replace astropy's SkyCoord.separation() in loops over many positions (photons, spacecraft rows),
+where building SkyCoord objects costs much more than the calculation itself.
+"""
+
+import numpy as np
+
+
+def angular_separation(ra1, dec1, ra2, dec2):
+
+    """
+    Computes the angular separation between two (arrays of) positions with the haversine formula,
+    which is accurate also for very small separations.
+
+    Parameters
+    ----------
+    ra1, dec1, ra2, dec2: float or numpy array
+        Coordinates in degrees. Arrays are broadcast against each other.
+
+    Returns
+    -------
+    separation: float or numpy array
+        Angular separation in degrees.
+    """
+
+    ra1 = np.radians(ra1)
+    dec1 = np.radians(dec1)
+    ra2 = np.radians(ra2)
+    dec2 = np.radians(dec2)
+    haversine = np.sin((dec2 - dec1)/2)**2 + np.cos(dec1)*np.cos(dec2)*np.sin((ra2 - ra1)/2)**2
+
+    return np.degrees(2*np.arcsin(np.sqrt(np.clip(haversine, 0, 1))))
@@ -0,0 +1,206 @@
+"""
+Fast reader of Fermi-LAT spacecraft (FT2) files.
+
+A spacecraft file has one row every 30 s (about 16 million rows for the full mission), but most easyfermi steps only need
+a few columns within a time window, sometimes decimated. The class SpacecraftFile opens the file with memory mapping, finds
+the time window with a binary search on the sorted START/STOP columns and reads only the requested (strided) rows.
+"""
+
+import numpy as np
+import astropy.io.fits as pyfits
+from .sky import angular_separation
+
+
+def nearest_index(sorted_array, value):
+
+    """
+    Same as Analysis.find_nearest, but with a binary search (O(log n)) on a sorted array.
+
+    Parameters
+    ----------
+    sorted_array: numpy array
+        Array sorted in ascending order.
+    value: float
+        The number that you are looking for.
+
+    Returns
+    -------
+    idx: int
+        The index corresponding to the element in 'sorted_array' which is closest to 'value'.
+    """
+
+    idx = int(np.searchsorted(sorted_array, value))
+    if idx == 0:
+        return 0
+    if idx == len(sorted_array):
+        return len(sorted_array) - 1
+    if abs(sorted_array[idx] - value) < abs(value - sorted_array[idx-1]):
+        return idx
+
+    return idx - 1
+
+
+class SpacecraftFile:
+
+    """
+    Memory-mapped access to a spacecraft file.
+
+    Parameters
+    ----------
+    scfile: str
+        Path to the spacecraft file.
+
+    Examples
+    --------
+    >>> with SpacecraftFile("SC00.fits") as sc:
+    ...     first, last = sc.window(tmin, tmax)
+    ...     rows = sc.read(["START", "RA_SUN", "DEC_SUN"], first, last, step=1000)
+    """
+
+    def __init__(self, scfile):
+        self.hdul = pyfits.open(scfile, memmap=True)
+        self.data = self.hdul[1].data
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def close(self):
+        self.data = None
+        self.hdul.close()
+
+
+    def window(self, tmin, tmax):
+
+        """
+        Finds the rows closest to the beginning and the end of a time window.
+
+        Parameters
+        ----------
+        tmin, tmax: float
+            Time window in MET.
+
+        Returns
+        -------
+        first, last: int
+            Index of the row whose START is closest to tmin and index of the row whose STOP is closest to tmax.
+        """
+
+        first = nearest_index(self.data.field("START"), tmin)  # Binary search: only a few pages of the file are read
+        last = nearest_index(self.data.field("STOP"), tmax)
+
+        return first, last
+
+
+    def read(self, columns, first, last, step=1):
+
+        """
+        Reads some columns of the rows first, first+step, ..., up to last (excluded).
+
+        Parameters
+        ----------
+        columns: list
+            Names of the columns, e.g. ["START", "RA_SUN", "DEC_SUN"].
+        first, last: int
+            Rows delimiting the time window (see SpacecraftFile.window).
+        step (optional): int
+            Decimation factor.
+
+        Returns
+        -------
+        rows: dict
+            One numpy array per column. The arrays are copies, so they stay valid after the file is closed.
+        """
+
+        return {column: np.array(self.data.field(column)[first:last:step]) for column in columns}
+
+
+def mask_to_intervals(start, stop, mask):
+
+    """
+    Converts the rows selected by a boolean mask into time intervals, joining consecutive rows without gaps between them.
+
+    Parameters
+    ----------
+    start, stop: numpy array
+        START and STOP columns of the spacecraft file.
+    mask: numpy array
+        Boolean array, True for the selected rows.
+
+    Returns
+    -------
+    interval_start, interval_stop: numpy array
+        Beginning and end (MET) of each interval.
+    """
+
+    idx = np.flatnonzero(mask)
+    if len(idx) == 0:
+        return np.zeros(0), np.zeros(0)
+
+    breaks = np.flatnonzero((np.diff(idx) != 1) | (start[idx[1:]] != stop[idx[:-1]]))
+    first_rows = np.concatenate([idx[:1], idx[breaks+1]])
+    last_rows = np.concatenate([idx[breaks], idx[-1:]])
+
+    return start[first_rows], stop[last_rows]
+
+
+def merge_intervals(interval_start, interval_stop):
+
+    """
+    Joins time intervals (sorted in time) that touch each other.
+    """
+
+    if len(interval_start) == 0:
+        return interval_start, interval_stop
+
+    breaks = np.flatnonzero(interval_start[1:] != interval_stop[:-1])
+    return interval_start[np.concatenate([[0], breaks+1])], interval_stop[np.concatenate([breaks, [len(interval_stop)-1]])]
+
+
+def proximity_intervals(scfile, tmin, tmax, ra, dec, sun_angle=15.0, moon_angle=5.0, chunk_size=1000000):
+
+    """
+    Finds when the Sun or the Moon is close to a target, using all the rows (30 s each) of the spacecraft file.
+
+    Parameters
+    ----------
+    scfile: str
+        Path to the spacecraft file.
+    tmin, tmax: float
+        Time window in MET.
+    ra, dec: float
+        Coordinates of the target in degrees.
+    sun_angle, moon_angle (optional): float
+        Minimum angular separation (degrees) between the target and the Sun/Moon. Use 0 to ignore the Sun or the Moon.
+    chunk_size (optional): int
+        Number of rows read at once, which limits the memory used for the full mission.
+
+    Returns
+    -------
+    good: tuple
+        Arrays with the beginning and the end (MET) of the good time intervals, when both the Sun and the Moon are far from the target.
+    excluded: tuple
+        Arrays with the beginning and the end (MET) of the intervals when the Sun or the Moon is close to the target.
+    """
+
+    good_start, good_stop, excluded_start, excluded_stop = [np.zeros(0)], [np.zeros(0)], [np.zeros(0)], [np.zeros(0)]
+    with SpacecraftFile(scfile) as sc:
+        first, last = sc.window(tmin, tmax)
+        for chunk_first in range(first, last+1, chunk_size):
+            rows = sc.read(["START", "STOP", "RA_SUN", "DEC_SUN", "RA_MOON", "DEC_MOON"], chunk_first, min(chunk_first+chunk_size, last+1))
+            close = angular_separation(rows["RA_SUN"], rows["DEC_SUN"], ra, dec) < sun_angle
+            close |= angular_separation(rows["RA_MOON"], rows["DEC_MOON"], ra, dec) < moon_angle
+            for mask, interval_start, interval_stop in [(~close, good_start, good_stop), (close, excluded_start, excluded_stop)]:
+                chunk_start, chunk_stop = mask_to_intervals(rows["START"], rows["STOP"], mask)
+                interval_start.append(chunk_start)
+                interval_stop.append(chunk_stop)
+
+    good = merge_intervals(np.concatenate(good_start), np.concatenate(good_stop))
+    excluded = merge_intervals(np.concatenate(excluded_start), np.concatenate(excluded_stop))
+
+    return good, excluded
@@ -0,0 +1,92 @@
+import sys
+import types
+from pathlib import Path
+
+import pytest
+import yaml
+
+pytest.importorskip("astropy")
+
+from easyfermi import batch
+
+
+def test_safe_name():
+    assert batch.safe_name("PKS 2155-304") == "PKS_2155-304"
+    assert batch.safe_name(" 4FGL J0000.1+6545 ") == "4FGL_J0000.1+6545"
+    assert batch.safe_name("Mrk 421/flare") == "Mrk_421_flare"
+
+
+def test_output_directory_adds_suffix_on_collision():
+    used = set()
+    first = batch.output_directory("/out", "PKS 2155-304", used)
+    second = batch.output_directory("/out", "PKS_2155-304", used)
+    third = batch.output_directory("/out", "pks 2155-304", used)  # Same directory on case-insensitive file systems
+
+    assert first == str(Path("/out") / "PKS_2155-304")
+    assert second == str(Path("/out") / "PKS_2155-304_2")
+    assert third == str(Path("/out") / "pks_2155-304_3")
+
+
+def write_fermipy_config(path):
+    config = {"data": {"evfile": "ft1.fits", "scfile": "ft2.fits"},
+              "selection": {"emin": 100, "emax": 300000, "ra": 166.11, "dec": 38.21, "tmin": 0, "tmax": 86400},
+              "binning": {"roiwidth": 10}}
+    with open(path, "w") as f:
+        yaml.dump(config, f)
+
+
+def test_targets_from_directory_fermipy_configs(tmp_path):
+    configs = tmp_path / "configs"
+    configs.mkdir()
+    write_fermipy_config(configs / "Mrk421.yaml")
+    write_fermipy_config(configs / "Mrk501.yaml")
+    with open(configs / "BLLac.yaml", "w") as f:
+        yaml.dump({"Coords": "330.68, 42.28", "redshift_value": "0.069"}, f)
+
+    targets = dict(batch.targets_from_directory(str(configs), {}, str(tmp_path / "out")))
+
+    assert set(targets) == {"Mrk421", "Mrk501", "BLLac"}
+    assert targets["BLLac"]["Coords"] == "330.68, 42.28"
+    assert "configfile" not in targets["BLLac"]
+    for name in ["Mrk421", "Mrk501"]:
+        assert targets[name]["Standard"] is False
+        assert targets[name]["configfile"] == str((configs / f"{name}.yaml").resolve())
+    assert len({config["output"] for config in targets.values()}) == 3
+
+
+class FakeGTAnalysis:
+
+    calls = []
+
+    def __init__(self, config, **kwargs):
+        FakeGTAnalysis.calls.append((config, kwargs))
+        self.config = {"binning": {"roiwidth": 10},
+                       "selection": {"emin": 100, "emax": 300000, "ra": 166.11, "dec": 38.21, "tmin": 0, "tmax": 86400},
+                       "data": {"scfile": "ft2.fits", "ltcube": None}}
+        self.roi = types.SimpleNamespace(sources=[types.SimpleNamespace(name="4FGL J1104.4+3812")])
+        self.components = [self]
+
+
+def test_fermipy_config_target_writes_to_its_output_directory(tmp_path, monkeypatch):
+    from easyfermi.analysis import Analysis
+
+    fermipy = types.ModuleType("fermipy")
+    gtanalysis = types.ModuleType("fermipy.gtanalysis")
+    gtanalysis.GTAnalysis = FakeGTAnalysis
+    monkeypatch.setitem(sys.modules, "fermipy", fermipy)
+    monkeypatch.setitem(sys.modules, "fermipy.gtanalysis", gtanalysis)
+    FakeGTAnalysis.calls = []
+
+    configs = tmp_path / "configs"
+    configs.mkdir()
+    write_fermipy_config(configs / "Mrk421.yaml")
+    write_fermipy_config(configs / "Mrk501.yaml")
+    targets = batch.targets_from_directory(str(configs), {}, str(tmp_path / "out"))
+
+    for name, config in targets:
+        analysis = Analysis(config)
+        analysis.setFermipy()
+        assert analysis.OutputDir == str(Path(config["output"]).resolve())+"/"
+
+    outdirs = [kwargs["fileio"]["outdir"] for config, kwargs in FakeGTAnalysis.calls]
+    assert outdirs == [str((tmp_path / "out" / name).resolve())+"/" for name in ["Mrk421", "Mrk501"]]
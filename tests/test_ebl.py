@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from easyfermi import ebl
+
+try:
+    import astropy.units as u
+    from gammapy.modeling.models import EBLAbsorptionNormSpectralModel
+except ImportError:
+    pytest.skip("gammapy is not available.", allow_module_level=True)
+
+
+@pytest.fixture(autouse=True)
+def ebl_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("EASYFERMI_EBL_CACHE", str(tmp_path))
+    monkeypatch.setattr(ebl, "_memory_cache", {})
+
+
+@pytest.mark.parametrize("name", list(ebl.EBL_FILES))
+@pytest.mark.parametrize("redshift", [0.01, 0.1, 0.537, 1.2])
+def test_absorption_matches_gammapy(name, redshift):
+    energy = np.logspace(2, 6.5, 60)  # MeV
+    model = EBLAbsorptionNormSpectralModel.read(str(ebl.EBL_DIRECTORY / ebl.EBL_FILES[name]), redshift=redshift)
+
+    expected = model.evaluate(energy*u.MeV, redshift, alpha_norm=1).to_value("")
+
+    np.testing.assert_allclose(ebl.load(name)(energy, redshift), expected, rtol=1e-5, atol=1e-12)  # gammapy interpolates the float32 tables in float32
+
+
+def test_redshift_grid_broadcast():
+    absorption = ebl.load("dominguez")
+    energy = np.logspace(4, 6, 5)
+    redshifts = np.array([0.05, 0.3, 1.0])
+
+    grid = absorption(energy, redshifts[:, None])
+
+    assert grid.shape == (3, 5)
+    for row, redshift in zip(grid, redshifts):
+        np.testing.assert_allclose(row, absorption(energy, redshift))
+    assert np.all(np.diff(grid, axis=0) <= 0)  # More absorption at higher redshift
+
+
+def test_load_uses_the_decoded_table(tmp_path):
+    first = ebl.load("Saldana-Lopez et al. (2021)")
+
+    assert ebl.load("saldana-lopez21") is first
+    assert len(list(tmp_path.glob("saldana-lopez21_*.npz"))) == 1
+    ebl._memory_cache.clear()
+    np.testing.assert_array_equal(ebl.load("saldana-lopez21").absorption, first.absorption)
+
+
+@pytest.mark.parametrize("label, name", [("Dominguez et al. (2011)", "dominguez"), ("Franceschini et al. (2008)", "franceschini"),
+                                         ("Franceschini & Rodighiero (2017)", "franceschini17"),
+                                         ("Saldana-Lopez et al. (2021)", "saldana-lopez21"), ("Finke et al. (2010)", "finke")])
+def test_model_name(label, name):
+    assert ebl.model_name(label) == name
@@ -0,0 +1,98 @@
+import os
+
+from easyfermi.ltcube_cache import LtcubeCache, tile_intervals, TILE_START, TILE_LENGTH
+
+
+def test_tile_intervals_cover_the_interval():
+    tmin = TILE_START + 2.5*TILE_LENGTH
+    tmax = TILE_START + 6.25*TILE_LENGTH
+
+    intervals = tile_intervals(tmin, tmax)
+
+    assert intervals[0] == (tmin, TILE_START + 3*TILE_LENGTH, False)
+    assert intervals[-1] == (TILE_START + 6*TILE_LENGTH, tmax, False)
+    assert [whole for start, stop, whole in intervals] == [False, True, True, True, False]
+    for (start, stop, whole), (next_start, next_stop, next_whole) in zip(intervals[:-1], intervals[1:]):
+        assert stop == next_start
+    for start, stop, whole in intervals:
+        if whole:
+            assert stop - start == TILE_LENGTH
+            assert (start - TILE_START) % TILE_LENGTH == 0
+
+
+def test_tile_intervals_aligned_and_short():
+    tmin = TILE_START + 10*TILE_LENGTH
+    assert tile_intervals(tmin, tmin + 2*TILE_LENGTH) == [(tmin, tmin + TILE_LENGTH, True), (tmin + TILE_LENGTH, tmin + 2*TILE_LENGTH, True)]
+    assert tile_intervals(tmin + 100, tmin + 200) == [(tmin + 100, tmin + 200, False)]  # Inside one tile
+    assert tile_intervals(tmin - 100, tmin + 100) == [(tmin - 100, tmin + 100, False)]  # Across an edge, without a whole tile
+
+
+def fill_cache(cache, n_files, size):
+    paths = []
+    for i in range(n_files):
+        path = os.path.join(cache.directory, f"{i:032x}.fits")
+        with open(path, 'wb') as f:
+            f.write(b"\0"*size)
+        with open(path[:-5]+".yaml", 'w') as f:
+            f.write("tmin: 0\n")
+        os.utime(path, (1000 + i, 1000 + i))  # Last use: file 0 is the least recently used
+        paths.append(path)
+
+    return paths
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    cache = LtcubeCache(str(tmp_path), max_size=2.5*1000/1024**3)  # Room for 2 files of 1000 bytes
+    paths = fill_cache(cache, 4, 1000)
+    cache.touch(paths[0])  # Used now: becomes the most recently used
+
+    cache.evict()
+
+    assert [os.path.exists(path) for path in paths] == [True, False, False, True]
+    assert [os.path.exists(path[:-5]+".yaml") for path in paths] == [True, False, False, True]
+
+
+def test_evict_keeps_requested_files_and_no_limit(tmp_path):
+    cache = LtcubeCache(str(tmp_path), max_size=1.5*1000/1024**3)
+    paths = fill_cache(cache, 3, 1000)
+
+    cache.evict(keep=[paths[0]])
+
+    assert [os.path.exists(path) for path in paths] == [True, False, False]
+
+    unlimited = LtcubeCache(str(tmp_path / "unlimited"), max_size=None)
+    os.makedirs(unlimited.directory)
+    paths = fill_cache(unlimited, 3, 1000)
+    unlimited.evict()
+    assert all(os.path.exists(path) for path in paths)
+
+
+def test_store_lookup_and_find_extendable(tmp_path):
+    scfile = tmp_path / "SC00.fits"
+    scfile.write_bytes(b"spacecraft")
+    ltcube = tmp_path / "ltcube.fits"
+    ltcube.write_bytes(b"ltcube")
+    cache = LtcubeCache(str(tmp_path / "cache"))
+
+    week = cache.parameters(str(scfile), 1000, 1000 + TILE_LENGTH, 90, 3)
+    truncated = cache.parameters(str(scfile), 1000, 1000 + 2*TILE_LENGTH, 90, 3)
+    assert cache.lookup(week) is None
+    path = cache.store(week, str(ltcube), coverage=(0, 1000 + TILE_LENGTH))
+    cache.store(truncated, str(ltcube), coverage=(0, 1000 + 1.5*TILE_LENGTH))  # Data did not cover the whole interval
+
+    assert cache.lookup(week) == path
+    longer = cache.parameters(str(scfile), 1000, 1000 + 3*TILE_LENGTH, 90, 3)
+    assert cache.find_extendable(longer) == (path, dict(week, coverage_start=0.0, coverage_stop=1000 + TILE_LENGTH))
+    assert cache.find_extendable(dict(longer, zmax=100.0)) is None
+
+
+def test_fingerprint_follows_file_content(tmp_path):
+    scfile = tmp_path / "SC00.fits"
+    scfile.write_bytes(b"spacecraft")
+    cache = LtcubeCache(str(tmp_path / "cache"))
+    first = cache.fingerprint(str(scfile))
+
+    assert LtcubeCache(str(tmp_path / "cache")).fingerprint(str(scfile)) == first  # Read from the fingerprints file
+    scfile.write_bytes(b"spacecraft, extended")
+    os.utime(scfile, ns=(os.stat(scfile).st_mtime_ns + 10**9,)*2)
+    assert cache.fingerprint(str(scfile)) != first
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from easyfermi import sed_models
+
+
+# Closed forms of the spectral models of the original (one walker at a time) MCMC fit:
+def PowerLaw(theta, x, Ep):
+    N0, alpha = theta
+    return N0 - alpha*(x - Ep)
+
+def LogPar(theta, x, Ep):
+    N0, alpha, beta = theta
+    return N0 + (-alpha - beta * np.log((10**x) / (10**Ep))) * (x - Ep)
+
+def LogPar_MTT(theta, x, Ep):
+    Splog, alpha, Ep = theta
+    return Splog + (-alpha*(np.log10((10**x)/(10**Ep))**2))
+
+def PLEC(theta, x, Ep):
+    N0, alpha, Ec, b = theta
+    return N0 - alpha * (x - Ep) + np.log10(np.exp(-((10**x / (10**Ec)) ** b)))
+
+def PLEC_bfix(theta, x, Ep):
+    N0, alpha, Ec = theta
+    return N0 - alpha * (x - Ep) + np.log10(np.exp(-((10**x / (10**Ec)) ** 1)))
+
+def PLEC_deMenezes(theta, x, Ep):
+    Sp, alpha, Ep, b = theta
+    return Sp + (alpha - 2)*(Ep - x) + np.log10(np.exp(((2-alpha)/b)*(1 - ((10**x)/(10**Ep))**b) ))
+
+BASELINE_MODELS = {"PowerLaw": PowerLaw, "LogPar": LogPar, "LogPar_MTT": LogPar_MTT,
+                   "PLEC": PLEC, "PLEC_bfix": PLEC_bfix, "PLEC_deMenezes": PLEC_deMenezes}
+
+X = np.linspace(2, 5.5, 12)  # log10(E/MeV)
+EP = 2.0
+
+
+def random_walkers(model_name, nwalkers, seed=0):
+    lower, upper = sed_models.prior_box(model_name)
+    return np.random.default_rng(seed).uniform(lower, upper, size=(nwalkers, len(lower)))
+
+
+@pytest.mark.parametrize("model_name", list(sed_models.SPECTRAL_MODELS))
+def test_vectorized_models_match_closed_forms(model_name):
+    walkers = random_walkers(model_name, 20)
+    model = sed_models.SPECTRAL_MODELS[model_name]
+
+    vectorized = model(walkers, X, EP)
+    assert vectorized.shape == (20, len(X))
+    for theta, row in zip(walkers, vectorized):
+        with np.errstate(all="ignore"):
+            expected = BASELINE_MODELS[model_name](theta, X, EP)
+        finite = np.isfinite(expected)  # log10(exp(t)) of the closed forms under/overflows for large |t|, the vectorized models do not
+        np.testing.assert_allclose(row[finite], expected[finite], rtol=1e-10, atol=1e-10)
+        assert np.all(np.isfinite(row))
+        assert np.all(np.abs(row[~finite]) > 300)
+        np.testing.assert_allclose(model(theta, X, EP), row, rtol=1e-12)
+
+
+@pytest.mark.parametrize("model_name", list(sed_models.SPECTRAL_MODELS))
+def test_log_probability_matches_per_walker_likelihood(model_name):
+    y = BASELINE_MODELS[model_name](np.array(sed_models.INITIAL_POSITIONS[model_name]), X, EP)
+    assert np.all(np.isfinite(y))
+    yerr = np.full(len(X), 0.1)
+    walkers = random_walkers(model_name, 10, seed=2)
+    walkers[0] = np.array(sed_models.PRIOR_BOUNDS[model_name][1]) + 1  # Outside the prior
+
+    lnprob = sed_models.log_probability(walkers, model_name, X, y, yerr, EP)
+
+    assert lnprob[0] == -np.inf
+    for theta, value in zip(walkers[1:], lnprob[1:]):
+        with np.errstate(all="ignore"):
+            expected = -0.5*np.sum(((y - BASELINE_MODELS[model_name](theta, X, EP))/yerr)**2)
+        if np.isfinite(expected):
+            assert value == pytest.approx(expected, rel=1e-10)
+        else:
+            assert value < -1e5  # Under/overflow of the closed form, see above
+
+
+@pytest.mark.parametrize("model_name", ["PowerLaw", "LogPar", "LogPar_MTT", "PLEC_bfix"])
+def test_maximum_likelihood_recovers_parameters(model_name):
+    truth = np.array(sed_models.INITIAL_POSITIONS[model_name]) + 0.1
+    y = BASELINE_MODELS[model_name](truth, X, EP)
+    yerr = np.full(len(X), 0.05)
+
+    theta, covariance = sed_models.maximum_likelihood(model_name, X, y, yerr, EP, start=sed_models.INITIAL_POSITIONS[model_name])
+
+    np.testing.assert_allclose(theta, truth, atol=1e-5)
+    assert covariance.shape == (len(truth), len(truth))
+    assert np.all(np.diag(covariance) > 0)
+
+
+def test_aic_of_fit_and_ranking():
+    np.random.seed(3)
+    truth = np.array([-11.0, 2.0, 0.15])
+    log_dnde = LogPar(truth, X, EP) + np.random.normal(0, 0.03, len(X))
+    log_dnde_err = np.full(len(X), 0.03)
+
+    results = sed_models.fit_models(["PowerLaw", "LogPar"], X, log_dnde, log_dnde_err, EP, nwalkers=20, niter=50, quick_fit=True)
+
+    for name, result in results.items():
+        data = sed_models.model_data(name, X, log_dnde, log_dnde_err)
+        ndim = len(sed_models.PARAMETER_NAMES[name])
+        lnlike = -0.5*np.sum(((data[1] - BASELINE_MODELS[name](result["theta_max"], X, EP))/data[2])**2)
+        assert result["AIC"] == pytest.approx(2*ndim - 2*lnlike)
+
+    ranking = sed_models.aic_ranking(results)
+    assert [name for name, aic, delta in ranking] == ["LogPar", "PowerLaw"]
+    assert ranking[0][2] == 0
+    assert ranking[1][2] == pytest.approx(results["PowerLaw"]["AIC"] - results["LogPar"]["AIC"])
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from easyfermi.settings import AnalysisSettings, load_settings, parse_bool
+
+
+@pytest.mark.parametrize("value, expected", [(True, True), (False, False), (1, True), (0, False),
+                                             ("True", True), ("false", False), (" YES ", True), ("no", False), ("1", True), ("0", False),
+                                             (np.bool_(True), True), (np.bool_(False), False), (np.int64(1), True)])
+def test_parse_bool(value, expected):
+    assert parse_bool(value) is expected
+
+
+@pytest.mark.parametrize("value", ["Flase", "", "2", 2, -1, 0.5, None, [True]])
+def test_parse_bool_rejects_other_values(value):
+    with pytest.raises(ValueError):
+        parse_bool(value)
+
+
+def test_from_dict_converts_types():
+    settings = AnalysisSettings.from_dict({"LC": "False", "SED": "yes", "LC_Nbins": "12", "min_sig": "4.5", "Coords": 1.5,
+                                           "MCMC_quick_fit": np.bool_(True), "redshift_value": None})
+
+    assert settings.LC is False
+    assert settings.SED is True
+    assert settings.LC_Nbins == 12
+    assert settings.min_sig == 4.5
+    assert settings.Coords == "1.5"
+    assert settings.MCMC_quick_fit is True
+    assert settings.redshift_value == AnalysisSettings().redshift_value  # None keeps the default
+
+
+def test_from_dict_errors():
+    with pytest.raises(ValueError, match="Unknown configuration key"):
+        AnalysisSettings.from_dict({"LC_bins": 10})
+    with pytest.raises(ValueError, match="'LC'"):
+        AnalysisSettings.from_dict({"LC": "maybe"})
+    with pytest.raises(ValueError, match="'LC_Nbins'"):
+        AnalysisSettings.from_dict({"LC_Nbins": "ten"})
+
+
+def test_yaml_round_trip(tmp_path):
+    import yaml
+
+    settings = AnalysisSettings.from_dict({"Coords": "166.11, 38.21", "LC": True, "LC_Nbins": 5})
+    with open(tmp_path / "GUI_status.yaml", 'w') as f:
+        yaml.dump(settings.to_dict(), f)
+
+    assert load_settings(str(tmp_path / "GUI_status.yaml")) == settings
+    assert load_settings(settings.to_dict()) == settings
+    assert load_settings(settings) is settings
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from easyfermi.sky import angular_separation
+
+
+def test_angular_separation_matches_skycoord():
+    from astropy.coordinates import SkyCoord
+
+    rng = np.random.default_rng(0)
+    ra = rng.uniform(0, 360, 1000)
+    dec = np.degrees(np.arcsin(rng.uniform(-1, 1, 1000)))
+    target = SkyCoord(166.11, 38.21, frame='icrs', unit='deg')
+
+    expected = SkyCoord(ra, dec, frame='icrs', unit='deg').separation(target).value
+
+    np.testing.assert_allclose(angular_separation(ra, dec, 166.11, 38.21), expected, rtol=0, atol=1e-9)
+
+
+def test_angular_separation_special_cases():
+    assert angular_separation(10.0, 20.0, 10.0, 20.0) == 0
+    assert angular_separation(0.0, 0.0, 180.0, 0.0) == pytest.approx(180)
+    assert angular_separation(0.0, 90.0, 123.0, 90.0) == pytest.approx(0, abs=1e-12)
+    assert angular_separation(359.9, 0.0, 0.1, 0.0) == pytest.approx(0.2)  # Across RA = 0
+    assert angular_separation(0.0, 0.0, 0.0, 1e-7) == pytest.approx(1e-7, rel=1e-6)  # Small separations
+
+
+def test_angular_separation_broadcasts():
+    separation = angular_separation(np.array([0.0, 90.0])[:, None], 0.0, np.array([0.0, 10.0, 20.0]), 0.0)
+    np.testing.assert_allclose(separation, [[0, 10, 20], [90, 80, 70]])
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+import astropy.io.fits as pyfits
+
+from easyfermi.spacecraft import nearest_index, proximity_intervals
+
+
+def find_nearest(array, value):  # Analysis.find_nearest
+    array = np.asarray(array)
+    return (np.abs(array - value)).argmin()
+
+
+def test_nearest_index_matches_find_nearest():
+    rng = np.random.default_rng(0)
+    array = np.sort(rng.uniform(0, 100, 500))
+    for value in np.concatenate([rng.uniform(-10, 110, 500), array[:20], [array[0], array[-1]]]):
+        assert nearest_index(array, value) == find_nearest(array, value)
+
+
+def test_nearest_index_ties_and_edges():
+    array = np.array([0.0, 1.0, 2.0, 3.0])
+    assert nearest_index(array, 1.5) == find_nearest(array, 1.5) == 1
+    assert nearest_index(array, -5) == 0
+    assert nearest_index(array, 50) == 3
+    assert nearest_index(np.array([7.0]), 3) == 0
+
+
+def write_spacecraft_file(path, n_rows=2000, t0=0.0):
+    start = t0 + 30.0*np.arange(n_rows)
+    stop = start + 30.0
+    ra_sun = np.linspace(0, 360, n_rows, endpoint=False)  # The Sun crosses the whole sky once in the file
+    dec_sun = np.zeros(n_rows)
+    ra_moon = (ra_sun*13) % 360  # The Moon crosses it 13 times
+    dec_moon = np.full(n_rows, 2.0)
+    columns = [pyfits.Column(name=name, array=array, format='D') for name, array in
+               [("START", start), ("STOP", stop), ("RA_SUN", ra_sun), ("DEC_SUN", dec_sun), ("RA_MOON", ra_moon), ("DEC_MOON", dec_moon)]]
+    pyfits.HDUList([pyfits.PrimaryHDU(), pyfits.BinTableHDU.from_columns(columns, name="SC_DATA")]).writeto(path)
+
+    return start, stop, ra_sun, dec_sun, ra_moon, dec_moon
+
+
+def baseline_intervals(start, stop, close):
+
+    """
+    Time intervals of consecutive rows with the same value of "close", built one row at a time.
+    """
+
+    good, excluded = [], []
+    for i in range(len(start)):
+        intervals = excluded if close[i] else good
+        if len(intervals) > 0 and intervals[-1][1] == start[i]:
+            intervals[-1][1] = stop[i]
+        else:
+            intervals.append([start[i], stop[i]])
+
+    return good, excluded
+
+
+@pytest.mark.parametrize("chunk_size", [1000000, 77])
+def test_proximity_intervals_matches_skycoord(tmp_path, chunk_size):
+    from astropy.coordinates import SkyCoord
+
+    scfile = str(tmp_path / "SC00.fits")
+    start, stop, ra_sun, dec_sun, ra_moon, dec_moon = write_spacecraft_file(scfile)
+    target = SkyCoord(100.0, 1.0, frame='icrs', unit='deg')
+    close = SkyCoord(ra_sun, dec_sun, frame='icrs', unit='deg').separation(target).value < 15.0
+    close |= SkyCoord(ra_moon, dec_moon, frame='icrs', unit='deg').separation(target).value < 5.0
+    expected_good, expected_excluded = baseline_intervals(start, stop, close)
+
+    good, excluded = proximity_intervals(scfile, start[0], stop[-1], 100.0, 1.0, chunk_size=chunk_size)
+
+    np.testing.assert_array_equal(np.transpose(good), expected_good)
+    np.testing.assert_array_equal(np.transpose(excluded), expected_excluded)
+    assert len(expected_excluded) > 1
+
+
+def test_proximity_intervals_time_window(tmp_path):
+    scfile = str(tmp_path / "SC00.fits")
+    start, stop = write_spacecraft_file(scfile)[:2]
+
+    good, excluded = proximity_intervals(scfile, start[100], stop[199], 250.0, -60.0)  # Far from the Sun and the Moon
+
+    np.testing.assert_array_equal(good[0], [start[100]])
+    np.testing.assert_array_equal(good[1], [stop[199]])
+    assert len(excluded[0]) == 0